@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure the per-board solve time of batches of random boards.
+
+Every board keeps a seeded random subset of the pieces of one solution and is
+solved from there. The packaged placement tables are loaded once and shared by
+all boards, as in a batch solving service. The run fails if the median solve
+time per board exceeds the target of the mode.
+
+Usage:
+    PYTHONPATH=src python benchmarks/batch_solve.py --mode rectangle
+"""
+
+import random
+import statistics
+import sys
+import time
+
+import click
+
+from iq_puzzler.backtracking_solver import BacktrackingSolver
+from iq_puzzler.diamonds_model import DiamondsModel
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY, load_library
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.pyramid_model import PyramidModel
+from iq_puzzler.rectangle_model import RectangleModel
+
+MODELS = {
+    "diamonds": DiamondsModel,
+    "pyramid": PyramidModel,
+    "rectangle": RectangleModel,
+}
+
+# Median milliseconds per board with the default of 4 kept pieces
+TARGET_MS = {"diamonds": 15.0, "pyramid": 15.0, "rectangle": 10.0}
+
+
+@click.command()
+@click.option(
+    "--mode", type=click.Choice(sorted(MODELS)), default="rectangle", help="Board"
+)
+@click.option("--solver", type=click.Choice(["dlx", "backtracking"]), default="dlx")
+@click.option("--boards", default=200, help="Number of boards")
+@click.option("--keep", default=4, help="Pieces kept on every board")
+@click.option("--seed", default=0, help="Seed of the kept pieces")
+@click.option("--target-ms", type=float, help="Median target, default per mode")
+def main(mode: str, solver: str, boards: int, keep: int, seed: int, target_ms):
+    """Solve a batch of random boards and compare with the target time."""
+    model = MODELS[mode]()
+    library, catalog = load_library(STANDARD_LIBRARY, model)
+    solved = PuzzleState(model)
+    DLXSolver(solved, library, catalog=catalog).solve()
+    solution = solved.to_compact(catalog)
+
+    rng = random.Random(seed)
+    times = []
+    for _ in range(boards):
+        compact = dict(solution, placements=rng.sample(solution["placements"], keep))
+        state = PuzzleState(model)
+        state.from_compact(compact, library)
+        start = time.perf_counter()
+        if solver == "dlx":
+            result = DLXSolver(state, library, catalog=catalog).solve()
+        else:
+            result = BacktrackingSolver(state, library, catalog).solve()
+        times.append((time.perf_counter() - start) * 1000)
+        assert result is not None
+
+    times.sort()
+    median = statistics.median(times)
+    target = target_ms if target_ms is not None else TARGET_MS[mode]
+    click.echo(f"{boards} {mode} boards with {keep} kept pieces, {solver} solver")
+    click.echo(
+        f"median {median:.1f} ms, p95 {times[int(0.95 * (boards - 1))]:.1f} ms, "
+        f"max {times[-1]:.1f} ms, {1000 * boards / sum(times):.0f} boards/s"
+    )
+    click.echo(
+        f"target median {target:.1f} ms: {'met' if median <= target else 'MISSED'}"
+    )
+    if median > target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Compare the DLX column and row strategies on a corpus of pyramid puzzles.
+
+The corpus holds the initial states shipped with the visualization
+(``puzzle_vis/public/data/puzzle-*.json``) and partial states of a solution of
+the first of them, keeping a seeded random subset of its pieces. Every strategy
+combination solves (or with --count, counts) all puzzles of the corpus.
+
+Usage:
+    PYTHONPATH=src python benchmarks/branching_heuristics.py [--count]
+"""
+
+import random
+import time
+from pathlib import Path
+
+import click
+
+from iq_puzzler.branching import COLUMN_STRATEGIES, ROW_ORDERS
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.precomputed_tables import load_library
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.pyramid_model import PyramidModel
+
+DATA_DIR = Path(__file__).parent.parent / "puzzle_vis" / "public" / "data"
+
+
+def load_corpus(model, library, catalog, partial: int, keep: int, seed: int):
+    """Create the compact forms of the corpus puzzles.
+
+    Args:
+        model: Pyramid model.
+        library: Piece library.
+        catalog: Placement catalog of the library in the model.
+        partial: Number of partial states of a solution.
+        keep: Number of pieces kept in every partial state.
+        seed: Seed of the kept pieces.
+
+    Returns:
+        List of (name, compact state) pairs.
+    """
+    corpus = []
+    for path in sorted(DATA_DIR.glob("puzzle-*.json")):
+        state = PuzzleState(model)
+        state.load_from_json(str(path), catalog)
+        corpus.append((path.stem, state.to_compact(catalog)))
+
+    solved = PuzzleState(model)
+    solved.from_compact(corpus[0][1], library)
+    DLXSolver(solved, library, catalog=catalog, rows="awkwardness").solve()
+    solution = solved.to_compact(catalog)
+
+    rng = random.Random(seed)
+    for i in range(partial):
+        placements = rng.sample(solution["placements"], keep)
+        corpus.append((f"partial-{i}", dict(solution, placements=placements)))
+    return corpus
+
+
+@click.command()
+@click.option("--partial", default=20, help="Number of partial solution states")
+@click.option("--keep", default=4, help="Pieces kept in every partial state")
+@click.option("--seed", default=0, help="Seed of the partial states")
+@click.option("--count", is_flag=True, help="Count all solutions instead of one")
+def main(partial: int, keep: int, seed: int, count: bool):
+    """Benchmark every column strategy and row order on the corpus."""
+    model = PyramidModel()
+    library, catalog = load_library(DATA_DIR / "piece_library.json", model)
+    corpus = load_corpus(model, library, catalog, partial, keep, seed)
+    click.echo(f"{len(corpus)} puzzles, {'counting' if count else 'first solution'}")
+    click.echo(f"{'columns':<18} {'rows':<12} {'nodes':>10} {'seconds':>9}")
+
+    for columns in COLUMN_STRATEGIES:
+        for rows in ROW_ORDERS:
+            nodes = 0
+            start = time.perf_counter()
+            for _, compact in corpus:
+                state = PuzzleState(model)
+                state.from_compact(compact, library)
+                solver = DLXSolver(
+                    state, library, catalog=catalog, columns=columns, rows=rows
+                )
+                if count:
+                    solver.count_solutions()
+                else:
+                    solver.solve()
+                nodes += solver.iterations
+            seconds = time.perf_counter() - start
+            click.echo(f"{columns:<18} {rows:<12} {nodes:>10} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
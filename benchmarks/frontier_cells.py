@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Compare the cell rules of the frontier solver.
+
+Random pyramid boards keep a seeded random subset of the pieces of one
+solution. Every rule of frontier_solver.CELL_RULES counts the completions of
+all boards; the counts must agree, the expanded states and the time differ.
+
+Usage:
+    PYTHONPATH=src python benchmarks/frontier_cells.py --keep 3,3,2
+"""
+
+import random
+import time
+
+import click
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.frontier_solver import CELL_RULES, FrontierSolver
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY, load_library
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.pyramid_model import PyramidModel
+
+
+def parse_counts(ctx, param, value: str):
+    """Parse a comma separated list of kept piece counts."""
+    return [int(count) for count in value.split(",") if count.strip()]
+
+
+@click.command()
+@click.option(
+    "--keep",
+    default="3,3,2",
+    callback=parse_counts,
+    help="Comma separated pieces kept on every board",
+)
+@click.option("--seed", default=0, help="Seed of the kept pieces")
+def main(keep, seed: int):
+    """Count the completions of the boards with every cell rule."""
+    model = PyramidModel()
+    library, catalog = load_library(STANDARD_LIBRARY, model)
+    solved = PuzzleState(model)
+    DLXSolver(solved, library, catalog=catalog).solve()
+    solution = solved.to_compact(catalog)
+    rng = random.Random(seed)
+    boards = [
+        dict(solution, placements=rng.sample(solution["placements"], count))
+        for count in keep
+    ]
+
+    click.echo(f"{len(boards)} pyramid boards keeping {keep} pieces")
+    for cells in CELL_RULES:
+        total = expanded = 0
+        start = time.perf_counter()
+        for board in boards:
+            state = PuzzleState(model)
+            state.from_compact(board, library)
+            solver = FrontierSolver(state, library, catalog, cells=cells)
+            total += solver.count_solutions()
+            expanded += solver.iterations
+        elapsed = time.perf_counter() - start
+        click.echo(
+            f"{cells:>7}: {total} solutions, {expanded} states expanded, "
+            f"{elapsed:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Measure how setup and search scale with the size of the board.
+
+Two series of lattice boards are measured:
+
+- Pyramids of growing size with the standard library: building the model,
+  the piece variants and placement catalog and the feasibility checker, and
+  one feasibility check of the empty board.
+- 4 x n strips for n straight pieces of 4 balls, with every column hinted
+  except the last --free ones. Counting the completions runs the bitmask
+  paths of the DLX and frontier solvers on boards of up to several words.
+
+Usage:
+    PYTHONPATH=src python benchmarks/lattice_scaling.py [--sizes 5,6,7,8]
+"""
+
+import time
+from math import factorial
+
+import click
+
+from iq_puzzler import bitset
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.feasibility import FeasibilityChecker
+from iq_puzzler.frontier_solver import FrontierSolver
+from iq_puzzler.lattice_model import LatticeModel
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY
+from iq_puzzler.puzzle_state import PuzzleState
+
+
+def parse_sizes(ctx, param, value: str):
+    """Parse a comma separated list of sizes."""
+    return [int(size) for size in value.split(",") if size.strip()]
+
+
+def pyramid_series(sizes):
+    """Time the setup of pyramids with the standard library."""
+    click.echo(
+        f"{'pyramid':<8} {'cells':>6} {'words':>5} {'placements':>10} "
+        f"{'model ms':>9} {'catalog ms':>10} {'checker ms':>10} {'check ms':>9}"
+    )
+    for size in sizes:
+        start = time.perf_counter()
+        model = LatticeModel.pyramid(size)
+        model_time = time.perf_counter()
+        library = PieceLibrary(STANDARD_LIBRARY, model)
+        catalog = PlacementCatalog(library, model)
+        catalog_time = time.perf_counter()
+        checker = FeasibilityChecker(catalog)
+        checker_time = time.perf_counter()
+        checker.check(PuzzleState(model))
+        check_time = time.perf_counter()
+
+        cells = len(model.get_all_indices())
+        click.echo(
+            f"{size:<8} {cells:>6} {bitset.num_words(cells):>5} {len(catalog):>10} "
+            f"{(model_time - start) * 1000:>9.1f} "
+            f"{(catalog_time - model_time) * 1000:>10.1f} "
+            f"{(checker_time - catalog_time) * 1000:>10.1f} "
+            f"{(check_time - checker_time) * 1000:>9.2f}"
+        )
+
+
+def strip_series(lengths, free: int):
+    """Time counting the completions of partially hinted strips."""
+    click.echo(
+        f"{'strip':<8} {'cells':>6} {'words':>5} {'solutions':>10} "
+        f"{'dlx ms':>9} {'frontier ms':>11}"
+    )
+    for length in lengths:
+        model = LatticeModel.from_layers([(4, length)], "flat", f"strip-{length}")
+        colors = [f"#{k:06x}" for k in range(length)]
+        library = PieceLibrary(None, model)
+        library.add_pieces_from_json(
+            [
+                {"name": f"Line {k}", "color": color, "grid": [True] * 4 + [False] * 12}
+                for k, color in enumerate(colors)
+            ]
+        )
+        catalog = PlacementCatalog(library, model)
+        state = PuzzleState(model)
+        for index in model.get_all_indices():
+            if index % length < length - free:
+                state.color_hints[index] = colors[index % length]
+
+        start = time.perf_counter()
+        count = DLXSolver(state, library, catalog=catalog).count_solutions()
+        dlx_time = time.perf_counter()
+        frontier = FrontierSolver(state, library, catalog).count_solutions()
+        frontier_time = time.perf_counter()
+        assert count == frontier == factorial(free)
+
+        cells = len(model.get_all_indices())
+        click.echo(
+            f"{length:<8} {cells:>6} {bitset.num_words(cells):>5} {count:>10} "
+            f"{(dlx_time - start) * 1000:>9.1f} "
+            f"{(frontier_time - dlx_time) * 1000:>11.1f}"
+        )
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="5,6,7,8,10",
+    callback=parse_sizes,
+    help="Comma separated bottom layer sizes of the pyramids",
+)
+@click.option(
+    "--lengths",
+    default="8,16,32,48",
+    callback=parse_sizes,
+    help="Comma separated lengths of the strips, below 63 for the frontier solver",
+)
+@click.option("--free", default=4, help="Unhinted columns of every strip")
+def main(sizes, lengths, free: int):
+    """Benchmark setup and search across board sizes."""
+    pyramid_series(sizes)
+    click.echo()
+    strip_series(lengths, free)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure the time from CLI startup until the search starts.
+
+The CLI is run in a fresh interpreter for every sample, solving the
+puzzle-120 board with --timing. The time to first search is taken from the
+timing report, which counts from the import of the CLI module; the wall time
+of the whole run includes the interpreter startup and the search. The run
+fails if the median time to first search exceeds the target.
+
+With PYTHONDONTWRITEBYTECODE set, every run compiles the package again, which
+adds tens of milliseconds that an installed package does not pay.
+
+Usage:
+    PYTHONPATH=src python benchmarks/startup_time.py --runs 10
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+DATA_DIR = Path(__file__).parent.parent / "puzzle_vis" / "public" / "data"
+FIRST_SEARCH = re.compile(r"Timing: first search\s+([\d.]+) ms")
+
+
+@click.command()
+@click.option("--runs", default=10, help="Number of CLI runs")
+@click.option("--solver", type=click.Choice(["dlx", "backtracking"]), default="dlx")
+@click.option("--target-ms", default=100.0, help="Median time to first search")
+def main(runs: int, solver: str, target_ms: float):
+    """Run the CLI repeatedly and compare the time to first search with the target."""
+    first_search = []
+    wall = []
+    with tempfile.TemporaryDirectory() as tmp:
+        command = [
+            sys.executable,
+            "-m",
+            "iq_puzzler.cli",
+            "--initial",
+            str(DATA_DIR / "puzzle-120.json"),
+            "--solver",
+            solver,
+            "--output",
+            str(Path(tmp) / "solution.json"),
+            "--timing",
+        ]
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(command, capture_output=True, text=True)
+            wall.append((time.perf_counter() - start) * 1000)
+            match = FIRST_SEARCH.search(result.stderr)
+            if result.returncode != 0 or match is None:
+                click.echo(result.stderr, err=True)
+                sys.exit(2)
+            first_search.append(float(match.group(1)))
+
+    median = statistics.median(first_search)
+    click.echo(f"{runs} runs of the {solver} solver on puzzle-120")
+    click.echo(
+        f"first search: median {median:.1f} ms, min {min(first_search):.1f} ms; "
+        f"whole run: median {statistics.median(wall):.1f} ms"
+    )
+    click.echo(
+        f"target median {target_ms:.1f} ms: {'met' if median <= target_ms else 'MISSED'}"
+    )
+    if median > target_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure how batch solving scales with the number of threads.
+
+A batch of random boards, each keeping a seeded random subset of the pieces
+of one solution, is solved by solve_api.solve_batch with growing thread
+counts. All threads share one set of tables. With the GIL the throughput stays
+flat; free-threaded builds should scale with the number of cores.
+
+Usage:
+    PYTHONPATH=src python benchmarks/thread_scaling.py --threads 1,2,4,8
+"""
+
+import random
+import sys
+import time
+
+import click
+
+from iq_puzzler.diamonds_model import DiamondsModel
+from iq_puzzler.pyramid_model import PyramidModel
+from iq_puzzler.rectangle_model import RectangleModel
+from iq_puzzler.solve_api import Board, SolverTables, solve, solve_batch
+
+MODELS = {
+    "diamonds": DiamondsModel,
+    "pyramid": PyramidModel,
+    "rectangle": RectangleModel,
+}
+
+
+def parse_counts(ctx, param, value: str):
+    """Parse a comma separated list of thread counts."""
+    return [int(count) for count in value.split(",") if count.strip()]
+
+
+@click.command()
+@click.option(
+    "--mode", type=click.Choice(sorted(MODELS)), default="pyramid", help="Board"
+)
+@click.option("--solver", type=click.Choice(["dlx", "frontier"]), default="dlx")
+@click.option("--boards", default=400, help="Number of boards")
+@click.option("--keep", default=4, help="Pieces kept on every board")
+@click.option("--seed", default=0, help="Seed of the kept pieces")
+@click.option(
+    "--threads",
+    default="1,2,4,8",
+    callback=parse_counts,
+    help="Comma separated thread counts",
+)
+def main(mode: str, solver: str, boards: int, keep: int, seed: int, threads):
+    """Solve one batch of boards with every thread count."""
+    tables = SolverTables.load(MODELS[mode]())
+    solution = solve(Board(), tables, solver)
+    rng = random.Random(seed)
+    batch = [
+        Board(tuple(sorted(rng.sample(solution.placement_ids, keep))))
+        for _ in range(boards)
+    ]
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    click.echo(f"{boards} {mode} boards, {solver} solver, GIL {'on' if gil else 'off'}")
+    baseline = None
+    for count in threads:
+        start = time.perf_counter()
+        results = solve_batch(batch, tables, solver, max_workers=count)
+        elapsed = time.perf_counter() - start
+        assert all(result is not None for result in results)
+        rate = boards / elapsed
+        baseline = baseline or rate
+        click.echo(
+            f"{count:>3} threads: {rate:8.0f} boards/s, speedup {rate / baseline:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,54 @@
 """Backtracking solver for the IQ Puzzler game."""
 
-from typing import Optional, Set
+from typing import Dict, List, Optional, Set
 import logging
 from .puzzle_state import PuzzleState
 from .piece_library import PieceLibrary
+from .feasibility import FeasibilityChecker
+from .placement_catalog import PlacementCatalog
+from .transposition_table import TranspositionTable
 
 
 class BacktrackingSolver:
     """Solves the IQ Puzzler game using backtracking search."""
 
-    def __init__(self, state: PuzzleState, library: PieceLibrary):
+    def __init__(
+        self,
+        state: PuzzleState,
+        library: PieceLibrary,
+        catalog: Optional[PlacementCatalog] = None,
+        transposition_table: Optional[TranspositionTable] = None,
+        precheck: bool = True,
+    ):
         """Initialize the solver.
 
         Args:
             state: The initial puzzle state.
             library: Library containing all available pieces and their variants.
+            catalog: Placement catalog of the library in the state's model. It is
+                built on demand if not given.
+            transposition_table: Optional memo of dead sub-boards, consulted
+                before branching. It may be shared between solvers using the
+                same catalog.
+            precheck: Whether to reject states that fail the cheap necessary
+                conditions of :class:`FeasibilityChecker` before searching.
         """
         self.state = state
         self.library = library
+        self._catalog = catalog
+        self.transposition_table = transposition_table
+        self.precheck = precheck
         self.logger = logging.getLogger(__name__)
+        # Placement ids covering each position index
+        self._covering: Dict[int, List[int]] = {}
+        self._piece_bits: Dict[str, int] = {}
+
+    @property
+    def catalog(self) -> PlacementCatalog:
+        """Placement catalog the placements are taken from."""
+        if self._catalog is None:
+            self._catalog = PlacementCatalog(self.library, self.state._model)
+        return self._catalog
 
     def solve(self) -> Optional[PuzzleState]:
         """Find a solution using backtracking search.
@@ -36,12 +66,40 @@ class BacktrackingSolver:
             self.state.get_placements().keys()
         )
 
+        if self.precheck:
+            reason = FeasibilityChecker.for_catalog(self.catalog).check(self.state)
+            if reason is not None:
+                self.logger.info(f"Puzzle cannot be solved: {reason}")
+                return None
+
         self.logger.debug("Starting backtracking search")
         self.logger.debug(f"Target indices: {target_indices}")
         self.logger.debug(f"Available pieces: {available_pieces}")
 
+        # Placements that fit and respect the color hints of the state
+        hint_masks = self.state.color_hint_masks(self.library)
+        self._covering = {idx: [] for idx in target_indices}
+        for placement_id, entry in enumerate(self.catalog.entries):
+            if (
+                entry.piece_name in available_pieces
+                and entry.indices <= target_indices
+                and not entry.mask & hint_masks[entry.piece_name]
+            ):
+                for idx in entry.indices:
+                    self._covering[idx].append(placement_id)
+
+        self._piece_bits = {
+            name: 1 << i for i, name in enumerate(self.catalog.piece_names)
+        }
+        piece_mask = 0
+        for piece_name in available_pieces:
+            piece_mask |= self._piece_bits.get(piece_name, 0)
+
         # Try to find a solution
-        if self._solve_recursive(target_indices, available_pieces):
+        remaining_mask = 0
+        for idx in target_indices:
+            remaining_mask |= 1 << idx
+        if self._solve_recursive(remaining_mask, available_pieces, piece_mask):
             self.logger.info("Solution found!")
             return self.state
         else:
@@ -49,63 +107,58 @@ class BacktrackingSolver:
             return None
 
     def _solve_recursive(
-        self, remaining_indices: Set[int], available_pieces: Set[str]
+        self, remaining_mask: int, available_pieces: Set[str], piece_mask: int
     ) -> bool:
         """Recursive helper for the backtracking search.
 
+        The lowest remaining index has to be covered by one of the available
+        pieces, so only the placements covering it are tried. Attempts go through
+        the state's placement id API and are rejected with a single bitmask test.
+
         Args:
-            remaining_indices: Set of position indices that still need to be filled.
+            remaining_mask: Bitmask of the position indices that still need to be
+                filled.
             available_pieces: Set of piece names that are still available to use.
+            piece_mask: Bitmask of the available pieces in catalog piece order.
 
         Returns:
             True if a solution is found, False otherwise.
         """
         # Base case: if no indices remain, we found a solution
-        if not remaining_indices:
+        if not remaining_mask:
             return True
 
         # Base case: if no pieces remain but indices do, no solution possible
         if not available_pieces:
             return False
 
-        for index in sorted(remaining_indices):  # Sort for deterministic order
-            self.logger.debug(
-                f"{index}: Remaining number of pieces: {len(available_pieces)}"
-            )
-            for piece_name in available_pieces:
-                for variant_idx, piece_variant in enumerate(
-                    self.library.pieces[piece_name]
-                ):
-                    self.logger.debug(
-                        f"Trying to place {piece_name} variant {variant_idx} at index {index}"
-                    )
-
-                    if placement := self.state.place_piece(piece_variant, index):
-                        self.logger.info(
-                            f"Successfully placed {piece_name} variant {variant_idx} at index {index}"
-                        )
-
-                        # Recursively try to solve the remaining puzzle
-                        new_remaining_indices = (
-                            remaining_indices - placement.occupied_indices
-                        )
-                        new_available_pieces = available_pieces.copy()
-                        new_available_pieces.remove(piece_name)
-
-                        if self._solve_recursive(
-                            new_remaining_indices, new_available_pieces
-                        ):
-                            return True
-
-                        # If no solution found, backtrack by removing the piece
-                        self.state.remove_piece(piece_name)
-                        self.logger.warning(
-                            f"Backtracking: removed {piece_name} variant {variant_idx} from index {index}"
-                        )
-
-            self.logger.debug(
-                f"No valid placement found for piece {piece_name}, continuing with next index"
-            )
+        # Skip sub-boards already proven dead
+        table = self.transposition_table
+        if table is not None and table.get((remaining_mask, piece_mask)) == 0:
+            return False
+
+        index = (remaining_mask & -remaining_mask).bit_length() - 1
+        for placement_id in self._covering[index]:
+            entry = self.catalog.entries[placement_id]
+            if entry.piece_name not in available_pieces or not self.state.place_by_id(
+                placement_id, self.catalog
+            ):
+                continue
+
+            # Recursively try to solve the remaining puzzle
+            available_pieces.remove(entry.piece_name)
+            if self._solve_recursive(
+                remaining_mask & ~entry.mask,
+                available_pieces,
+                piece_mask & ~self._piece_bits[entry.piece_name],
+            ):
+                return True
+
+            # If no solution found, backtrack by removing the piece
+            available_pieces.add(entry.piece_name)
+            self.state.remove_piece(entry.piece_name)
 
         # If we get here, no solution was found
+        if table is not None:
+            table.store((remaining_mask, piece_mask), 0)
         return False
@@ -0,0 +1,112 @@
+"""Multi-word bitsets for vectorized position masks of any board size.
+
+Position masks are Python integers, which have no size limit. Vectorized code
+stores them in NumPy arrays instead, as rows of uint64 words: word w of a row
+holds the bits 64 * w to 64 * w + 63 of the mask. Boards with up to 64
+positions use a single word, so the common case costs no more than a plain
+uint64 array, while larger boards keep the same bitwise operations.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+WORD_BITS = 64
+_WORD_MASK = (1 << WORD_BITS) - 1
+
+
+def num_words(num_bits: int) -> int:
+    """Get the number of words holding a bitset.
+
+    Args:
+        num_bits: Number of bits of the bitset, e.g. the highest position index
+            plus one.
+
+    Returns:
+        The number of uint64 words, at least one.
+    """
+    return max(1, -(-num_bits // WORD_BITS))
+
+
+def to_words(masks: Iterable[int], words: int) -> np.ndarray:
+    """Convert masks to rows of words.
+
+    Args:
+        masks: Non-negative masks with fewer than ``words * 64`` bits.
+        words: Number of words per row.
+
+    Returns:
+        (N, words) uint64 array.
+    """
+    masks = list(masks)
+    result = np.zeros((len(masks), words), dtype=np.uint64)
+    for word in range(words):
+        shift = word * WORD_BITS
+        result[:, word] = [mask >> shift & _WORD_MASK for mask in masks]
+    return result
+
+
+def from_words(row: np.ndarray) -> int:
+    """Convert a row of words back to a mask.
+
+    Args:
+        row: (words,) array of uint64 words.
+
+    Returns:
+        The mask.
+    """
+    mask = 0
+    for word, value in enumerate(row.tolist()):
+        mask |= int(value) << (word * WORD_BITS)
+    return mask
+
+
+def disjoint(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Check which rows of two broadcastable word arrays share no bit.
+
+    Args:
+        a: (..., words) uint64 array.
+        b: (..., words) uint64 array.
+
+    Returns:
+        Boolean array over the broadcast leading dimensions.
+    """
+    return ~np.any(a & b, axis=-1)
+
+
+def equal(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Check which rows of two broadcastable word arrays are equal.
+
+    Args:
+        a: (..., words) uint64 array.
+        b: (..., words) uint64 array.
+
+    Returns:
+        Boolean array over the broadcast leading dimensions.
+    """
+    return np.all(a == b, axis=-1)
+
+
+def unpack(words: np.ndarray) -> np.ndarray:
+    """Expand rows of words into their bits.
+
+    Args:
+        words: (..., words) uint64 array.
+
+    Returns:
+        (..., words * 64) uint8 array of zeros and ones, bit i at column i.
+    """
+    little = np.ascontiguousarray(words, dtype="<u8")
+    return np.unpackbits(little.view(np.uint8), axis=-1, bitorder="little")
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the set bits of rows of words.
+
+    Args:
+        words: (..., words) uint64 array.
+
+    Returns:
+        int64 array over the leading dimensions.
+    """
+    return unpack(words).sum(axis=-1, dtype=np.int64)
@@ -0,0 +1,214 @@
+"""Column and row selection strategies of the DLX search.
+
+A column strategy ranks the columns once when the matrix is built. The matrix
+keeps its columns in buckets by size and rank, so the search picks the next
+column without scanning all of them. A row order decides in which order the
+rows of the chosen column are tried.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Type, Union
+
+import numpy as np
+
+from .feasibility import FeasibilityChecker
+from .placement_catalog import PlacementCatalog
+from .puzzle_model import PuzzleModel
+
+
+class ColumnStrategy:
+    """Minimum remaining values (Knuth's S heuristic): the column with the fewest
+    rows, ties broken arbitrarily.
+
+    Subclasses rank the columns. With ``size_major``, the column with the fewest
+    rows is chosen and ties are broken by the lowest rank; otherwise the lowest
+    rank is chosen first and ties are broken by the fewest rows. Columns without
+    rows always come first, as they end the branch immediately.
+    """
+
+    name = "mrv"
+    size_major = True
+
+    def ranks(
+        self,
+        positions: Sequence[Optional[int]],
+        incidence: np.ndarray,
+        model: PuzzleModel,
+    ) -> List[int]:
+        """Rank the columns of a matrix.
+
+        Args:
+            positions: Position index of every column, None for piece columns.
+            incidence: Boolean (rows, columns) incidence matrix.
+            model: Puzzle model of the positions.
+
+        Returns:
+            Small non-negative rank of every column, lower ranks first.
+        """
+        return [0] * len(positions)
+
+
+class PositionsFirst(ColumnStrategy):
+    """Minimum remaining values, ties broken by position before piece columns."""
+
+    name = "mrv-position"
+
+    def ranks(self, positions, incidence, model):
+        return [0 if idx is not None else 1 for idx in positions]
+
+
+class BottomLayerFirst(ColumnStrategy):
+    """Fill the layers bottom up, the position with the fewest rows first."""
+
+    name = "bottom-layer"
+    size_major = False
+
+    def ranks(self, positions, incidence, model):
+        layers = {
+            idx: float(model.index_to_coord(idx)[2])
+            for idx in positions
+            if idx is not None
+        }
+        order = {z: rank for rank, z in enumerate(sorted(set(layers.values())))}
+        return [
+            order[layers[idx]] if idx is not None else len(order) for idx in positions
+        ]
+
+
+class MostConstraining(ColumnStrategy):
+    """Minimum remaining values, ties broken by the most constraining position.
+
+    A position constrains the columns its rows share with it. Among the
+    columns with the fewest rows, the position sharing rows with the most other
+    columns is chosen first.
+    """
+
+    name = "most-constraining"
+
+    def ranks(self, positions, incidence, model):
+        weights = incidence.astype(np.float32)
+        shared = (weights.T @ weights) > 0
+        reach = shared.sum(axis=1).tolist()
+        levels = sorted(
+            {reach[c] for c, idx in enumerate(positions) if idx is not None},
+            reverse=True,
+        )
+        order = {value: rank for rank, value in enumerate(levels)}
+        return [
+            order[reach[c]] if idx is not None else len(order)
+            for c, idx in enumerate(positions)
+        ]
+
+
+class RowOrder:
+    """Try the rows in catalog order."""
+
+    name = "catalog"
+
+    def order(
+        self, placement_ids: Sequence[int], catalog: PlacementCatalog
+    ) -> List[int]:
+        """Order the rows of a matrix.
+
+        Args:
+            placement_ids: Catalog placement id of every row.
+            catalog: Placement catalog of the ids.
+
+        Returns:
+            The row numbers in the order they are added to the matrix.
+        """
+        return list(range(len(placement_ids)))
+
+
+class AwkwardFirst(RowOrder):
+    """Try the most awkward placements first, see :func:`awkwardness`."""
+
+    name = "awkwardness"
+
+    def order(self, placement_ids, catalog):
+        scores = awkwardness(catalog)[np.asarray(placement_ids, dtype=np.int64)]
+        return np.argsort(scores, kind="stable").tolist()
+
+
+COLUMN_STRATEGIES: Dict[str, Type[ColumnStrategy]] = {
+    cls.name: cls
+    for cls in (ColumnStrategy, PositionsFirst, BottomLayerFirst, MostConstraining)
+}
+ROW_ORDERS: Dict[str, Type[RowOrder]] = {
+    cls.name: cls for cls in (RowOrder, AwkwardFirst)
+}
+
+
+def column_strategy(strategy: Union[str, ColumnStrategy]) -> ColumnStrategy:
+    """Get a column strategy by name.
+
+    Args:
+        strategy: Name of a strategy in COLUMN_STRATEGIES, or a strategy.
+
+    Returns:
+        The strategy.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(strategy, ColumnStrategy):
+        return strategy
+    if strategy not in COLUMN_STRATEGIES:
+        raise ValueError(f"Unknown column strategy: {strategy}")
+    return COLUMN_STRATEGIES[strategy]()
+
+
+def row_order(order: Union[str, RowOrder]) -> RowOrder:
+    """Get a row order by name.
+
+    Args:
+        order: Name of an order in ROW_ORDERS, or an order.
+
+    Returns:
+        The row order.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(order, RowOrder):
+        return order
+    if order not in ROW_ORDERS:
+        raise ValueError(f"Unknown row order: {order}")
+    return ROW_ORDERS[order]()
+
+
+def awkwardness(catalog: PlacementCatalog) -> np.ndarray:
+    """Get the awkwardness rank of every placement of a catalog.
+
+    Placements of pieces with few placements are the most awkward, as they
+    have the fewest alternatives. Among the placements of a piece, those
+    touching few other positions are more awkward, as they fill corners and
+    edges that are hard to fill otherwise. The ranks are computed on first use
+    and cached per catalog.
+
+    Args:
+        catalog: Placement catalog.
+
+    Returns:
+        Rank of every placement id, 0 for the most awkward one.
+    """
+    ranks = catalog.derived.get("awkwardness")
+    if ranks is None:
+        neighbours = FeasibilityChecker.for_catalog(catalog).neighbours
+        placements: Dict[str, int] = {}
+        for entry in catalog.entries:
+            placements[entry.piece_name] = placements.get(entry.piece_name, 0) + 1
+
+        alternatives = []
+        exposure = []
+        for entry in catalog.entries:
+            touching = 0
+            for idx in entry.indices:
+                touching |= neighbours[idx]
+            alternatives.append(placements[entry.piece_name])
+            exposure.append(bin(touching & ~entry.mask).count("1"))
+
+        ranks = np.empty(len(catalog.entries), dtype=np.int64)
+        ranks[np.lexsort((exposure, alternatives))] = np.arange(len(ranks))
+        catalog.derived["awkwardness"] = ranks
+    return ranks
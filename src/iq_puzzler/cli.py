@@ -1,20 +1,16 @@
 #!/usr/bin/env python3
-import click
-import logging
-from pathlib import Path
-from typing import Optional
-import colorama
-from colorama import init as init_colorama
+import time
 
-from iq_puzzler.piece_library import PieceLibrary
-from iq_puzzler.puzzle_state import PuzzleState
-from iq_puzzler.pyramid_model import PyramidModel
-from iq_puzzler.rectangle_model import RectangleModel
-from iq_puzzler.diamonds_model import DiamondsModel
-from iq_puzzler.backtracking_solver import BacktrackingSolver
-from iq_puzzler.dlx_solver import DLXSolver
+_START_TIME = time.perf_counter()
 
-init_colorama()
+import click  # noqa: E402
+import logging  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import List, Optional, Tuple  # noqa: E402
+
+# Models, solvers and NumPy are imported lazily where they are needed, so each
+# invocation only pays for the modules it actually uses.
 
 
 class ColorStreamHandler(logging.StreamHandler):
@@ -22,6 +18,9 @@ class ColorStreamHandler(logging.StreamHandler):
 
     def __init__(self, stream=None):
         super().__init__(stream)
+        import colorama
+
+        colorama.init()
         self.color_map = {
             logging.DEBUG: colorama.Fore.CYAN,
             logging.INFO: colorama.Fore.GREEN,
@@ -31,13 +30,48 @@ class ColorStreamHandler(logging.StreamHandler):
         }
 
     def format(self, record: logging.LogRecord):
+        import colorama
+
         record.msg = (
             self.color_map[record.levelno] + str(record.msg) + colorama.Style.RESET_ALL
         )
         return super().format(record)
 
 
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
+DATA_DIR = Path(__file__).parent / "data"
+
+
+class PhaseTimer:
+    """Measures the wall clock time of consecutive startup and solving phases."""
+
+    def __init__(self):
+        """Start timing at the import of the CLI module."""
+        self.phases: List[Tuple[str, float]] = []
+        self._last = _START_TIME
+
+    def lap(self, name: str) -> None:
+        """End the current phase.
+
+        Args:
+            name: Name of the phase that just ended.
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self, logger: logging.Logger, first_search: Optional[float]) -> None:
+        """Log the duration of all phases.
+
+        Args:
+            logger: Logger to report to.
+            first_search: Seconds from startup until the search started, if known.
+        """
+        for name, seconds in self.phases:
+            logger.info(f"Timing: {name:<16} {seconds * 1000:9.1f} ms")
+        if first_search is not None:
+            logger.info(f"Timing: {'first search':<16} {first_search * 1000:9.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        logger.info(f"Timing: {'total':<16} {total * 1000:9.1f} ms")
 
 
 def setup_logging(verbose: bool):
@@ -50,10 +84,87 @@ def setup_logging(verbose: bool):
     )
 
 
-# Use Colorama to support colored output on Windows
+def parse_indices(ctx, param, value: Optional[str]) -> Optional[List[int]]:
+    """Parse a comma separated list of position indices option."""
+    if value is None:
+        return None
+    try:
+        return [int(index) for index in value.split(",") if index.strip()]
+    except ValueError:
+        raise click.BadParameter("Expected comma separated position indices")
+
+
+def load_puzzle(
+    mode: str,
+    piece_library: Path,
+    initial: Optional[str],
+    timer: PhaseTimer,
+    logger: logging.Logger,
+    shape: Optional[Path] = None,
+):
+    """Create the model, piece library and initial state of a command.
+
+    Args:
+        mode: Game mode determining the final shape.
+        piece_library: Piece library JSON file.
+        initial: Optional initial puzzle state JSON file.
+        timer: Timer the loading phases are recorded with.
+        logger: Logger to report to.
+        shape: Optional shape definition JSON file, see
+            :class:`~iq_puzzler.lattice_model.LatticeModel`. It replaces the
+            shape of the mode.
+
+    Returns:
+        The initial state, the library and its placement catalog, or None if the
+        initial state or the shape definition is invalid.
+    """
+    if shape is not None:
+        from iq_puzzler.lattice_model import LatticeModel
+
+        try:
+            puzzle_model = LatticeModel.from_json(shape)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Invalid shape definition {shape}: {e}")
+            return None
+    elif mode == "pyramid":
+        from iq_puzzler.pyramid_model import PyramidModel
+
+        puzzle_model = PyramidModel()
+    elif mode == "rectangle":
+        from iq_puzzler.rectangle_model import RectangleModel
+
+        puzzle_model = RectangleModel()
+    elif mode == "diamonds":
+        from iq_puzzler.diamonds_model import DiamondsModel
+
+        puzzle_model = DiamondsModel()
+    else:
+        raise ValueError(f"Invalid mode: {mode}")
+    timer.lap("model")
+
+    # Load piece library, from the packaged precomputed tables when possible
+    from iq_puzzler.precomputed_tables import load_library
+
+    piece_manager, catalog = load_library(piece_library, puzzle_model)
+    logger.debug(f"Loaded {len(piece_manager.pieces)} pieces from library")
+    timer.lap("library")
+
+    # Initialize puzzle state
+    from iq_puzzler.puzzle_state import PuzzleState
+
+    puzzle_state = PuzzleState(puzzle_model)
+    if initial:
+        try:
+            puzzle_state.load_from_json(initial, catalog)
+        except ValueError as e:
+            logger.error(f"Invalid initial state {initial}: {e}")
+            return None
+    timer.lap("initial state")
+    return puzzle_state, piece_manager, catalog
 
 
-@click.command()
+@click.group(invoke_without_command=True)
+@click.pass_context
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
 @click.option(
     "--initial", type=click.Path(exists=True), help="Initial puzzle state JSON file"
@@ -71,66 +182,305 @@ def setup_logging(verbose: bool):
     default="pyramid",
     help="Game mode determining the final shape",
 )
+@click.option(
+    "--shape",
+    type=click.Path(exists=True, path_type=Path),
+    help="Shape definition JSON file of a custom board, replacing --mode",
+)
 @click.option(
     "--solver",
-    type=click.Choice(["backtracking", "dlx"], case_sensitive=False),
+    type=click.Choice(["backtracking", "dlx", "frontier"], case_sensitive=False),
     default="backtracking",
     help="Solver algorithm to use",
 )
 @click.option("--output", type=click.Path(), help="Output file path for the solution")
+@click.option(
+    "--output-format",
+    type=click.Choice(["grid", "compact"], case_sensitive=False),
+    default="grid",
+    help="Write the full position grid or only the piece placements",
+)
+@click.option(
+    "--store",
+    type=click.Path(path_type=Path),
+    help="Enumerate all solutions (dlx solver) and append them to a solution store",
+)
+@click.option(
+    "--index",
+    "index_path",
+    type=click.Path(exists=True, path_type=Path),
+    help="Precomputed solution index consulted before searching (dlx solver)",
+)
+@click.option(
+    "--count",
+    is_flag=True,
+    help="Count all solutions with a decision diagram of the solutions (dlx solver) "
+    "or by vectorized frontier expansion (frontier solver)",
+)
+@click.option(
+    "--memo-size",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Entries of the transposition table of dead sub-boards, 0 to disable",
+)
+@click.option(
+    "--columns",
+    type=click.Choice(
+        ["mrv", "mrv-position", "bottom-layer", "most-constraining"],
+        case_sensitive=False,
+    ),
+    default="mrv",
+    help="Column strategy of the dlx solver, see branching.COLUMN_STRATEGIES",
+)
+@click.option(
+    "--rows",
+    type=click.Choice(["catalog", "awkwardness"], case_sensitive=False),
+    default="awkwardness",
+    help="Row order of the dlx solver, see branching.ROW_ORDERS",
+)
+@click.option(
+    "--optional-pieces",
+    is_flag=True,
+    help="Allow pieces to be left unused (dlx solver)",
+)
+@click.option(
+    "--region",
+    callback=parse_indices,
+    help="Comma separated position indices that must be filled, the other "
+    "positions may stay empty (dlx solver)",
+)
+@click.option("--timing", is_flag=True, help="Report the duration of each phase")
+@click.option(
+    "--serve-stdio",
+    is_flag=True,
+    help="Keep running and answer JSON line solve requests from stdin with JSON "
+    "line events on stdout, see iq_puzzler.stdio_worker",
+)
 def main(
+    ctx: click.Context,
     verbose: bool,
     initial: Optional[str],
     piece_library: Path,
     mode: str,
+    shape: Optional[Path],
     solver: str,
     output: Optional[str],
+    output_format: str,
+    store: Optional[Path],
+    index_path: Optional[Path],
+    count: bool,
+    memo_size: int,
+    columns: str,
+    rows: str,
+    optional_pieces: bool,
+    region: Optional[List[int]],
+    timing: bool,
+    serve_stdio: bool,
 ):
     """IQ Puzzler Pro solver CLI.
 
     This tool helps solve different configurations of the IQ Puzzler Pro game
-    using various solving strategies.
+    using various solving strategies. Without a command, the puzzle is solved.
     """
+    if ctx.invoked_subcommand is not None:
+        # Commands take their own options; those of the solver would be ignored
+        given = [
+            param.opts[0]
+            for param in ctx.command.params
+            if ctx.get_parameter_source(param.name)
+            not in (None, click.core.ParameterSource.DEFAULT)
+        ]
+        if given:
+            raise click.UsageError(
+                f"{', '.join(given)} must be given after the "
+                f"{ctx.invoked_subcommand} command"
+            )
+        return
+
+    if serve_stdio:
+        import json
+
+        from iq_puzzler.stdio_worker import StdioWorker
+
+        unsupported = {
+            "--output": output is not None,
+            "--store": store is not None,
+            "--index": index_path is not None,
+            "--memo-size": memo_size != 0,
+            "--columns": columns != "mrv",
+            "--rows": rows != "awkwardness",
+            "--optional-pieces": optional_pieces,
+            "--region": region is not None,
+            "--timing": timing,
+        }
+        given = [name for name, used in unsupported.items() if used]
+        if given:
+            raise click.UsageError(
+                f"{', '.join(given)} cannot be combined with --serve-stdio"
+            )
+        defaults = {}
+        for name, path in [("shape", shape), ("initial", initial)]:
+            if path is not None:
+                with open(path, "r") as f:
+                    defaults[name] = json.load(f)
+        level = logging.DEBUG if verbose else logging.INFO
+        StdioWorker(
+            sys.stdin,
+            sys.stdout,
+            mode,
+            piece_library,
+            solver,
+            level,
+            count=count,
+            output_format=output_format,
+            **defaults,
+        ).serve()
+        return
+
+    timer = PhaseTimer()
+    timer.lap("imports")
+
     # Setup logging
     setup_logging(verbose)
     logger = logging.getLogger(__name__)
+    timer.lap("logging")
 
     logger.info(f"Starting IQ Puzzler solver in {mode} mode using {solver} algorithm")
 
-    if mode == "pyramid":
-        puzzle_model = PyramidModel()
-    elif mode == "rectangle":
-        puzzle_model = RectangleModel()
-    elif mode == "diamonds":
-        puzzle_model = DiamondsModel()
-    else:
-        raise ValueError(f"Invalid mode: {mode}")
-    # Load piece library
-    piece_manager = PieceLibrary(piece_library, puzzle_model)
-    logger.debug(f"Loaded {len(piece_manager.pieces)} pieces from library")
+    loaded = load_puzzle(mode, piece_library, initial, timer, logger, shape)
+    if loaded is None:
+        return 1
+    puzzle_state, piece_manager, catalog = loaded
 
-    # Initialize puzzle state
-    puzzle_state = PuzzleState(puzzle_model)
-    if initial:
-        puzzle_state.load_from_json(initial)
-        # Sanity check initial placements
-        for piece_name, placement in puzzle_state.get_placements().items():
-            if len(placement.piece.positions) != len(
-                piece_manager.pieces[piece_name][0].positions
-            ):
-                logger.error(
-                    f"Initial placement of {piece_name} is invalid: {placement}"
-                )
-                return 1
+    table = None
+    if memo_size:
+        from iq_puzzler.transposition_table import TranspositionTable
+
+        table = TranspositionTable(memo_size)
+
+    if (optional_pieces or region is not None) and solver != "dlx":
+        logger.error("Optional pieces and regions require the dlx solver")
+        return 1
+
+    if count:
+        if solver == "frontier":
+            from iq_puzzler.frontier_solver import FrontierSolver
+
+            total = FrontierSolver(
+                puzzle_state, piece_manager, catalog
+            ).count_solutions()
+            logger.info(f"Found {total} solutions")
+            timer.lap("counting")
+            if timing:
+                timer.report(logger, None)
+            return
+        if solver != "dlx":
+            logger.error("Counting all solutions requires the dlx or frontier solver")
+            return 1
+        from iq_puzzler.dlx_solver import DLXSolver
+
+        try:
+            counter = DLXSolver(
+                puzzle_state,
+                piece_manager,
+                catalog=catalog,
+                columns=columns,
+                rows=rows,
+                optional_pieces=optional_pieces,
+                region=region,
+            )
+        except ValueError as e:
+            logger.error(f"Invalid region: {e}")
+            return 1
+        zdd = counter.build_zdd()
+        logger.info(f"Found {zdd.count()} solutions")
+        timer.lap("counting")
+        if timing:
+            timer.report(logger, None)
+        return
+
+    if store:
+        if solver != "dlx":
+            logger.error("Enumerating all solutions requires the dlx solver")
+            return 1
+        from iq_puzzler.dlx_solver import DLXSolver
+        from iq_puzzler.solution_store import SolutionStoreWriter, placement_ids_of
+
+        try:
+            enumerator = DLXSolver(
+                puzzle_state,
+                piece_manager,
+                catalog=catalog,
+                transposition_table=table,
+                columns=columns,
+                rows=rows,
+                optional_pieces=optional_pieces,
+                region=region,
+            )
+        except ValueError as e:
+            logger.error(f"Invalid region: {e}")
+            return 1
+        logger.info(f"Enumerating all solutions into {store}")
+        initial_ids = placement_ids_of(puzzle_state, catalog)
+        with SolutionStoreWriter(store, catalog) as writer:
+
+            def on_solution(rows):
+                writer.append(initial_ids + [row["placement_id"] for row in rows])
+
+            try:
+                enumerator.solve_all(on_solution)
+            except KeyboardInterrupt:
+                logger.warning("Enumeration interrupted by user")
+        logger.info(f"Wrote {writer.count} solutions to {store}")
+        timer.lap("enumeration")
+        if timing:
+            timer.report(logger, None)
+        return
 
     # Solve puzzle
     logger.info("Solving puzzle...")
     if solver == "backtracking":
-        solver = BacktrackingSolver(puzzle_state, piece_manager)
+        from iq_puzzler.backtracking_solver import BacktrackingSolver
+
+        solver = BacktrackingSolver(puzzle_state, piece_manager, catalog, table)
     elif solver == "dlx":
-        solver = DLXSolver(puzzle_state, piece_manager)
+        from iq_puzzler.dlx_solver import DLXSolver
+
+        index = None
+        if index_path:
+            from iq_puzzler.solution_index import SolutionIndex
+
+            try:
+                index = SolutionIndex.load(index_path, catalog)
+            except ValueError as e:
+                logger.warning(f"Ignoring solution index {index_path}: {e}")
+        try:
+            solver = DLXSolver(
+                puzzle_state,
+                piece_manager,
+                index,
+                catalog,
+                table,
+                columns=columns,
+                rows=rows,
+                optional_pieces=optional_pieces,
+                region=region,
+            )
+        except ValueError as e:
+            logger.error(f"Invalid region: {e}")
+            return 1
+    elif solver == "frontier":
+        from iq_puzzler.frontier_solver import FrontierSolver
+
+        try:
+            solver = FrontierSolver(puzzle_state, piece_manager, catalog)
+        except ValueError as e:
+            logger.error(f"Frontier solver not applicable: {e}")
+            return 1
     else:
         raise ValueError(f"Invalid solver: {solver}")
+    timer.lap("solver setup")
+    startup = time.perf_counter() - _START_TIME
 
     try:
         solution = solver.solve()
@@ -140,14 +490,252 @@ def main(
             logger.error("No solution found")
     except KeyboardInterrupt:
         logger.warning("Solving interrupted by user")
+    timer.lap("solve")
+    build_time = getattr(solver, "build_time", 0.0)
 
     # Save solution if output path is provided
     if output:
         logger.info(f"Saving solution to {output}")
-        puzzle_state.export_to_json(output)
+        if output_format == "compact":
+            puzzle_state.export_compact(output, catalog)
+        else:
+            puzzle_state.export_to_json(output)
+        timer.lap("output")
 
+    if timing:
+        timer.report(logger, startup + build_time)
     return
 
 
+@main.command()
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
+@click.option(
+    "--initial", type=click.Path(exists=True), help="Initial puzzle state JSON file"
+)
+@click.option(
+    "--library",
+    "piece_library",
+    type=click.Path(exists=True, path_type=Path),
+    default=DATA_DIR / "piece_library.json",
+    help="Piece library JSON file",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["pyramid", "rectangle", "diamonds"], case_sensitive=False),
+    default="pyramid",
+    help="Game mode determining the final shape",
+)
+@click.option(
+    "--shape",
+    type=click.Path(exists=True, path_type=Path),
+    help="Shape definition JSON file of a custom board, replacing --mode",
+)
+@click.option(
+    "--probes",
+    type=click.IntRange(min=1),
+    default=1000,
+    help="Number of random root-to-leaf probes",
+)
+@click.option("--seed", type=int, help="Seed of the random probes")
+@click.option(
+    "--columns",
+    type=click.Choice(
+        ["mrv", "mrv-position", "bottom-layer", "most-constraining"],
+        case_sensitive=False,
+    ),
+    default="mrv",
+    help="Column strategy of the dlx solver, see branching.COLUMN_STRATEGIES",
+)
+@click.option(
+    "--rows",
+    type=click.Choice(["catalog", "awkwardness"], case_sensitive=False),
+    default="awkwardness",
+    help="Row order of the dlx solver, see branching.ROW_ORDERS",
+)
+def estimate(
+    verbose: bool,
+    initial: Optional[str],
+    piece_library: Path,
+    mode: str,
+    shape: Optional[Path],
+    probes: int,
+    seed: Optional[int],
+    columns: str,
+    rows: str,
+):
+    """Estimate the size and duration of the DLX search of a puzzle."""
+    import random
+
+    timer = PhaseTimer()
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+
+    loaded = load_puzzle(mode, piece_library, initial, timer, logger, shape)
+    if loaded is None:
+        sys.exit(1)
+    puzzle_state, piece_manager, catalog = loaded
+
+    from iq_puzzler.dlx_solver import DLXSolver
+
+    solver = DLXSolver(
+        puzzle_state, piece_manager, catalog=catalog, columns=columns, rows=rows
+    )
+    result = solver.estimate_tree_size(probes, random.Random(seed))
+    click.echo(
+        f"nodes: {result.nodes:.0f}\n"
+        f"standard error: {result.standard_error:.0f}\n"
+        f"eta: {result.eta:.2f}s"
+    )
+
+
+@main.command()
+@click.argument(
+    "paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path)
+)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
+@click.option(
+    "--initial",
+    type=click.Path(exists=True),
+    help="Initial puzzle state JSON file every solution has to complete",
+)
+@click.option(
+    "--library",
+    "piece_library",
+    type=click.Path(exists=True, path_type=Path),
+    default=DATA_DIR / "piece_library.json",
+    help="Piece library JSON file",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["pyramid", "rectangle", "diamonds"], case_sensitive=False),
+    default="pyramid",
+    help="Game mode determining the final shape",
+)
+@click.option(
+    "--shape",
+    type=click.Path(exists=True, path_type=Path),
+    help="Shape definition JSON file of a custom board, replacing --mode",
+)
+@click.option(
+    "--max-failures",
+    type=click.IntRange(min=0),
+    default=20,
+    help="Number of failed records reported per file",
+)
+def verify(
+    paths: Tuple[Path, ...],
+    verbose: bool,
+    initial: Optional[str],
+    piece_library: Path,
+    mode: str,
+    shape: Optional[Path],
+    max_failures: int,
+):
+    """Verify the solutions of .jsonl files and solution stores.
+
+    Exits with status 1 if any record fails verification.
+    """
+    timer = PhaseTimer()
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+
+    loaded = load_puzzle(mode, piece_library, initial, timer, logger, shape)
+    if loaded is None:
+        sys.exit(1)
+    puzzle_state, _, catalog = loaded
+
+    import numpy as np
+
+    from iq_puzzler.solution_verifier import SolutionVerifier, describe
+
+    try:
+        verifier = SolutionVerifier(catalog, puzzle_state)
+    except ValueError as e:
+        logger.error(f"Invalid initial state {initial}: {e}")
+        sys.exit(1)
+
+    failed = 0
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            flags = verifier.verify_file(path)
+        except ValueError as e:
+            logger.error(f"Cannot verify {path}: {e}")
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        failures = np.flatnonzero(flags)
+        failed += len(failures)
+        for record in failures[:max_failures].tolist():
+            click.echo(f"{path}:{record}: {', '.join(describe(int(flags[record])))}")
+        click.echo(
+            f"{path}: {len(flags)} records, {len(failures)} failed "
+            f"in {elapsed:.2f}s"
+        )
+    if failed:
+        sys.exit(1)
+
+
+@main.command("build-index")
+@click.argument("store", type=click.Path(exists=True, path_type=Path))
+@click.argument("output", type=click.Path(path_type=Path))
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
+@click.option(
+    "--library",
+    "piece_library",
+    type=click.Path(exists=True, path_type=Path),
+    default=DATA_DIR / "piece_library.json",
+    help="Piece library JSON file",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["pyramid", "rectangle", "diamonds"], case_sensitive=False),
+    default="pyramid",
+    help="Game mode determining the final shape",
+)
+@click.option(
+    "--shape",
+    type=click.Path(exists=True, path_type=Path),
+    help="Shape definition JSON file of a custom board, replacing --mode",
+)
+@click.option(
+    "--complete",
+    is_flag=True,
+    help="The store holds every solution of the board, so lookups without a "
+    "match prove a board unsolvable",
+)
+def build_index(
+    store: Path,
+    output: Path,
+    verbose: bool,
+    piece_library: Path,
+    mode: str,
+    shape: Optional[Path],
+    complete: bool,
+):
+    """Build a solution index from a solution store.
+
+    The store is enumerated with --store; the index is used with --index.
+    """
+    timer = PhaseTimer()
+    setup_logging(verbose)
+    logger = logging.getLogger(__name__)
+
+    loaded = load_puzzle(mode, piece_library, None, timer, logger, shape)
+    if loaded is None:
+        sys.exit(1)
+    _, _, catalog = loaded
+
+    from iq_puzzler.solution_index import SolutionIndex
+    from iq_puzzler.solution_store import SolutionStore
+
+    try:
+        index = SolutionIndex.from_store(SolutionStore(store), catalog, complete)
+    except ValueError as e:
+        logger.error(f"Cannot index {store}: {e}")
+        sys.exit(1)
+    index.save(output)
+    click.echo(f"{output}: {len(index)} solutions indexed")
+
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,14 @@
 from __future__ import annotations
+from functools import lru_cache
 import numpy as np
-from .coordinates import XY_DIST, Z_DIST
+from .coordinates import LATTICE_STEP, XY_DIST, Z_DIST, to_lattice
 from .puzzle_piece import PuzzlePiece, Location3D, RotationMatrix
 
+# Basis of the grid lattice in (2x, 2y, layer) coordinates. Valid positions have
+# 2x, 2y and layer of equal parity, so every position is an integer combination
+# of one step in x, one step in y and one diagonal step up to the next layer.
+LATTICE_BASIS = np.array([[2, 0, 1], [0, 2, 1], [0, 0, 1]], dtype=np.int64)
+
 
 def is_rotation_matrix_orthogonal(rotation_matrix: RotationMatrix) -> bool:
     """Test that generated rotation matrices are proper orthogonal matrices."""
@@ -85,6 +91,119 @@ def rotate(piece: PuzzlePiece, rotation_matrix: RotationMatrix) -> PuzzlePiece:
     )
 
 
+def to_lattice_basis(lattice: np.ndarray) -> np.ndarray:
+    """Express lattice coordinates as integer coefficients of LATTICE_BASIS.
+
+    Args:
+        lattice: Array of (2x, 2y, layer) lattice coordinates with shape (..., 3).
+
+    Returns:
+        int64 array of basis coefficients with the same shape.
+
+    Raises:
+        ValueError: If a coordinate is not a valid grid position.
+    """
+    lattice = np.asarray(lattice, dtype=np.int64)
+    offsets = lattice[..., :2] - lattice[..., 2:]
+    if np.any(offsets % 2):
+        raise ValueError("Positions are not valid grid positions")
+    return np.concatenate((offsets // 2, lattice[..., 2:]), axis=-1)
+
+
+def from_lattice_basis(coefficients: np.ndarray) -> np.ndarray:
+    """Convert basis coefficients back to (2x, 2y, layer) lattice coordinates."""
+    return np.asarray(coefficients, dtype=np.int64) @ LATTICE_BASIS.T
+
+
+@lru_cache(maxsize=None)
+def lattice_rotation_matrix(yaw: float, pitch: float, roll: float) -> np.ndarray:
+    """Get the exact integer form of a rotation in the lattice basis.
+
+    The float rotation matrix is evaluated once per angle combination and
+    converted; applying the result only needs integer arithmetic.
+
+    Args:
+        yaw: Rotation around Z-axis in degrees.
+        pitch: Rotation around Y-axis in degrees.
+        roll: Rotation around X-axis in degrees.
+
+    Returns:
+        3x3 int64 matrix acting on lattice basis coefficients.
+
+    Raises:
+        ValueError: If the rotation does not map the grid onto itself.
+    """
+    to_world = np.diag(LATTICE_STEP) @ LATTICE_BASIS
+    matrix = np.linalg.inv(to_world) @ rotation_matrix(yaw, pitch, roll) @ to_world
+    integer_matrix = np.rint(matrix)
+    if not np.allclose(matrix, integer_matrix, atol=1e-10):
+        raise ValueError(
+            f"Rotation (yaw={yaw}, pitch={pitch}, roll={roll}) does not map the "
+            "grid onto itself"
+        )
+    integer_matrix = integer_matrix.astype(np.int64)
+    integer_matrix.setflags(write=False)
+    return integer_matrix
+
+
+def rotate_lattice(lattice: np.ndarray, lattice_rotation: np.ndarray) -> np.ndarray:
+    """Rotate lattice coordinates exactly.
+
+    Args:
+        lattice: Nx3 array of (2x, 2y, layer) lattice coordinates.
+        lattice_rotation: Integer rotation from :func:`lattice_rotation_matrix`.
+
+    Returns:
+        Nx3 int64 array of rotated lattice coordinates.
+    """
+    return from_lattice_basis(to_lattice_basis(lattice) @ lattice_rotation.T)
+
+
+def rotate_lattice_batch(
+    lattice: np.ndarray, lattice_rotations: np.ndarray
+) -> np.ndarray:
+    """Rotate a batch of point sets by a batch of rotations in one operation.
+
+    Args:
+        lattice: (P, K, 3) array of lattice coordinates, e.g. P pieces padded to
+            K balls.
+        lattice_rotations: (R, 3, 3) stack of integer lattice rotations.
+
+    Returns:
+        (P, R, K, 3) int64 array with every point set rotated by every rotation.
+    """
+    coefficients = to_lattice_basis(lattice)
+    rotated = np.einsum("rij,pkj->prki", lattice_rotations, coefficients)
+    return from_lattice_basis(rotated)
+
+
+def rotate_exact(
+    piece: PuzzlePiece, yaw: float, pitch: float, roll: float
+) -> PuzzlePiece:
+    """Create a new piece by applying a rotation with integer lattice arithmetic.
+
+    Unlike :func:`rotate`, no floating point error has to be repaired; the
+    float path remains for visualisation of arbitrary matrices.
+
+    Args:
+        piece: The piece to rotate; its positions must be valid grid positions.
+        yaw: Rotation around Z-axis in degrees.
+        pitch: Rotation around Y-axis in degrees.
+        roll: Rotation around X-axis in degrees.
+
+    Returns:
+        A new piece with rotated positions.
+
+    Raises:
+        ValueError: If the piece or the rotation is not aligned with the grid.
+    """
+    lattice = to_lattice(piece.positions)
+    if not np.allclose(lattice * LATTICE_STEP, piece.positions, atol=1e-10):
+        raise ValueError("Positions cannot be aligned to the grid")
+    rotated = rotate_lattice(lattice, lattice_rotation_matrix(yaw, pitch, roll))
+    return PuzzlePiece(piece.name, piece.color, rotated * LATTICE_STEP)
+
+
 def rotation_matrix_roll(angle_deg: float) -> RotationMatrix:
     angle = np.radians(angle_deg)
     return np.array(
@@ -5,6 +5,7 @@ from typing import NamedTuple
 
 # Global constants
 FLOAT_TOLERANCE = 1e-6  # Tolerance for floating point comparisons
+HASH_PRECISION = int(-np.log10(FLOAT_TOLERANCE))  # Decimals kept when hashing
 
 
 class Location3D(NamedTuple):
@@ -33,12 +34,11 @@ class Location3D(NamedTuple):
     def __hash__(self) -> int:
         """Hash the location using rounded coordinates."""
         # Round to the same precision as our tolerance
-        precision = int(-np.log10(FLOAT_TOLERANCE))
         return hash(
             (
-                round(self.x, precision),
-                round(self.y, precision),
-                round(self.z, precision),
+                round(self.x, HASH_PRECISION),
+                round(self.y, HASH_PRECISION),
+                round(self.z, HASH_PRECISION),
             )
         )
 
@@ -51,3 +51,20 @@ XY_DIST = 1.0  # Base distance between points in the x-y plane
 Z_DIST = 0.5 * np.sqrt(2 * XY_DIST * XY_DIST)  # Vertical distance between layers
 # This is half the height of a regular tetrahedron with edge length XY_DIST
 # This ensures that points in adjacent layers form equilateral triangles
+
+# Integer lattice spacing: every valid grid position is an integer multiple of
+# these steps, so (2x, 2y, layer) identifies a position exactly.
+LATTICE_STEP = np.array([XY_DIST / 2, XY_DIST / 2, Z_DIST])
+
+
+def to_lattice(positions) -> np.ndarray:
+    """Convert float grid positions to integer lattice coordinates.
+
+    Args:
+        positions: A single (x, y, z) position or an Nx3 array of positions.
+
+    Returns:
+        Nx3 int64 array of lattice coordinates (2x/XY_DIST, 2y/XY_DIST, z/Z_DIST).
+    """
+    scaled = np.asarray(positions, dtype=np.float64).reshape(-1, 3) / LATTICE_STEP
+    return np.rint(scaled).astype(np.int64)
@@ -2,37 +2,104 @@
 
 from typing import List, Optional, Tuple
 
-from .coordinates import Location3D
-from .puzzle_model import PuzzleModel
+import numpy as np
 
+from .coordinate_transformations import lattice_rotation_matrix
+from .coordinates import Location3D, XY_DIST, Z_DIST, to_lattice
+from .lattice_model import ROTATION_SETS, LatticeModel
 
-class DiamondsModel(PuzzleModel):
-    """Model for the diamonds game board configuration."""
+# Radius of the diamond of every layer from bottom to top, in XY_DIST
+RADII = (0, 1, 2, 3, 2)
+# Offset of the centre of every layer from the origin, in XY_DIST
+CENTRE = max(RADII)
+
+
+def _diamond_positions() -> List[Tuple[float, float, float]]:
+    """List the positions layer by layer, row by row.
+
+    Layer positions satisfy |dx| + |dy| <= radius around the centre. Odd
+    layers are shifted by half a step, so their diamonds have an even number
+    of positions.
+
+    Returns:
+        (x, y, z) coordinates in index order.
+    """
+    positions = []
+    for layer, radius in enumerate(RADII):
+        shift = 0.5 if layer % 2 else 0.0
+        for row in range(-radius - 1, radius + 1):
+            for col in range(-radius - 1, radius + 1):
+                dx, dy = col + shift, row + shift
+                if abs(dx) + abs(dy) <= radius:
+                    positions.append(
+                        (
+                            (CENTRE + dx) * XY_DIST,
+                            (CENTRE + dy) * XY_DIST,
+                            layer * Z_DIST,
+                        )
+                    )
+    return positions
+
+
+POSITIONS = _diamond_positions()
+
+# Lattice coordinates of the positions and the dense map back to indices
+LATTICE = to_lattice(POSITIONS)
+LATTICE.setflags(write=False)
+INDEX_GRID = np.full(tuple(LATTICE.max(axis=0) + 1), -1, dtype=np.int64)
+INDEX_GRID[tuple(LATTICE.T)] = np.arange(len(POSITIONS))
+INDEX_GRID.setflags(write=False)
+
+# Every standard rotation maps the pyramid lattice onto itself, so all 24 are
+# valid orientations. Their integer forms are derived once per process.
+LATTICE_ROTATIONS = np.stack(
+    [lattice_rotation_matrix(*rotation) for rotation in ROTATION_SETS["all"]]
+)
+LATTICE_ROTATIONS.setflags(write=False)
+
+
+class DiamondsModel(LatticeModel):
+    """Model for the cut diamond standing on its tip.
+
+    Every layer is a diamond of positions with |dx| + |dy| <= radius around
+    the vertical axis through (CENTRE, CENTRE). The radii of RADII grow from a
+    single tip ball to the widest layer of radius 3, the girdle, and the top
+    layer of radius 2 is the flat table, for 55 positions in 5 layers.
+    Pieces lie flat or stand diagonally across layers like in the pyramid.
+    Coordinates are converted through a dense lattice index grid, and the
+    rotations are given as exact integer lattice matrices.
+    """
+
+    def __init__(self):
+        """Initialize the board with its 55 positions."""
+        super().__init__(POSITIONS, "all", "diamonds")
+        self._lattice_table = (np.arange(len(POSITIONS), dtype=np.int64), LATTICE)
+        self._lattice_rotations = LATTICE_ROTATIONS
 
     def coord_to_index(self, coord: Location3D) -> Optional[int]:
-        """Convert coordinates to index."""
-        raise NotImplementedError("Diamonds mode not implemented yet")
+        """Convert 3D coordinates to a position index.
 
-    def index_to_coord(self, index: int) -> Optional[Location3D]:
-        """Convert index to coordinates."""
-        raise NotImplementedError("Diamonds mode not implemented yet")
+        Args:
+            coord: (x, y, z) coordinates.
 
-    def is_valid_index(self, index: int) -> bool:
-        """Check if index is valid."""
-        raise NotImplementedError("Diamonds mode not implemented yet")
+        Returns:
+            Position index if the coordinates are valid, None otherwise.
+        """
+        point = to_lattice(coord)[0]
+        if np.any(point < 0) or np.any(point >= INDEX_GRID.shape):
+            return None
+        index = int(INDEX_GRID[tuple(point)])
+        if index < 0 or not np.allclose(POSITIONS[index], coord, atol=1e-6):
+            return None
+        return index
 
     def is_valid_coord(self, coord: Location3D) -> bool:
-        """Check if coordinates are valid."""
-        raise NotImplementedError("Diamonds mode not implemented yet")
-
-    def get_all_indices(self) -> List[int]:
-        """Get all valid indices."""
-        raise NotImplementedError("Diamonds mode not implemented yet")
+        """Check if 3D coordinates are on the board.
 
-    def get_valid_rotations(self) -> List[Tuple[float, float, float]]:
-        """Get all valid rotation angle combinations.
+        Args:
+            coord: (x, y, z) coordinates to validate.
 
         Returns:
-            List of tuples (yaw, pitch, roll) in degrees.
+            True if the coordinates are valid, False otherwise.
         """
-        raise NotImplementedError("Diamonds mode not implemented yet")
+        return self.coord_to_index(coord) is not None
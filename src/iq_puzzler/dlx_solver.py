@@ -1,12 +1,37 @@
 """DLX solver for the IQ Puzzler game using Dancing Links algorithm."""
 
 from __future__ import annotations
-from typing import List, Optional, Set, Any
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 import logging
+import math
+import random
 import time
+
+import numpy as np
 from .puzzle_state import PuzzleState
 from .piece_library import PieceLibrary
-from . import coordinate_transformations
+from .placement_catalog import PlacementCatalog
+
+# Strategies, checks, propagation and diagrams are imported where they are
+# used, keeping them out of the startup of every solver run
+if TYPE_CHECKING:
+    from .branching import ColumnStrategy, RowOrder
+    from .propagation import Reduction
+    from .solution_index import SolutionIndex
+    from .solution_zdd import SolutionZDD
+    from .transposition_table import TranspositionTable
 
 
 class DLXNode:
@@ -70,17 +95,48 @@ class DLXColumnHeader(DLXNode):
         self.name = name
         self.size = 0  # Number of nodes in this column
         self.column_header = self
+        self.rank = 0  # Tie-break of the column selection, lower first
+        self.bucket = -1  # Selection bucket of the column, -1 if not in any
+        self.offset = 0  # Bucket of a small column is offset + size * step
+        self.primary = True  # Whether the column must be covered
 
 
 class DLXMatrix:
-    """Dancing Links matrix for the exact cover problem."""
+    """Dancing Links matrix for the exact cover problem.
+
+    Columns with fewer than ``small_size`` rows are kept in buckets ordered by
+    size and rank, which are updated as their nodes are removed and restored.
+    The search mostly branches on such columns, so choosing one takes the first
+    column of the lowest non-empty bucket. Only while all columns are large, the
+    header list is scanned. Updates of large columns cost a single comparison.
+
+    As in Knuth's generalized exact cover, the matrix may have secondary
+    columns, which are covered at most once instead of exactly once. They are
+    not linked into the header list, so they are never chosen and the matrix is
+    solved once all primary columns are covered.
+    """
+
+    small_size = 4  # Columns with fewer rows are kept in buckets
 
-    def __init__(self, num_columns: int, column_names: List[str]):
+    def __init__(
+        self,
+        num_columns: int,
+        column_names: List[str],
+        ranks: Optional[List[int]] = None,
+        size_major: bool = True,
+        primary: Optional[int] = None,
+    ):
         """Initialize the matrix.
 
         Args:
             num_columns: Number of columns in the matrix.
             column_names: Names of the columns.
+            ranks: Small non-negative rank of every column, all 0 if None.
+            size_major: Whether to choose the column with the fewest rows, ties
+                broken by rank, or the column with the lowest rank, ties broken
+                by the fewest rows. Columns without rows always come first.
+            primary: Number of primary columns, which come first. The remaining
+                columns are secondary. All columns are primary if None.
         """
         # Create the root node
         self.root = DLXNode(-1, -1)
@@ -91,7 +147,13 @@ class DLXMatrix:
 
         for col, name in enumerate(column_names):
             header = DLXColumnHeader(col, name)
+            if ranks is not None:
+                header.rank = ranks[col]
             self.column_headers.append(header)
+            if primary is not None and col >= primary:
+                # Secondary columns stay linked to themselves only
+                header.primary = False
+                continue
 
             # Link horizontally
             prev_header.right = header
@@ -105,6 +167,14 @@ class DLXMatrix:
         # Row data for mapping back to puzzle pieces
         self.row_data: List[Any] = []
 
+        # Column selection buckets, built on the first choice
+        self.size_major = size_major
+        self._num_ranks = max(ranks, default=0) + 1 if ranks is not None else 1
+        self._buckets: Optional[List[Dict[DLXColumnHeader, None]]] = None
+        self._step = 0  # Bucket offset of one more row in a column
+        self._lowest = 0  # No bucket below this one holds a column
+        self._rank_counts: List[int] = []  # Uncovered columns of every rank
+
     def add_row(self, cols: List[int], row_data: Any) -> None:
         """Add a row to the matrix.
 
@@ -117,6 +187,7 @@ class DLXMatrix:
 
         row = len(self.row_data)
         self.row_data.append(row_data)
+        self._buckets = None
 
         # Create nodes for this row
         prev_node = None
@@ -160,15 +231,51 @@ class DLXMatrix:
         """
         # Remove the column header from the header list
         col_header.remove_horizontal()
+        buckets = self._buckets
+        if buckets is None:
+            # Remove all rows that have a 1 in this column
+            i = col_header.down
+            while i is not col_header:
+                j = i.right
+                while j is not i:
+                    j.up.down = j.down
+                    j.down.up = j.up
+                    j.column_header.size -= 1
+                    j = j.right
+                i = i.down
+            return
 
-        # Remove all rows that have a 1 in this column
+        if col_header.bucket >= 0:
+            del buckets[col_header.bucket][col_header]
+            col_header.bucket = -1
+        if col_header.primary:
+            self._rank_counts[col_header.rank] -= 1
+
+        # Remove all rows, moving small columns to the bucket of their new size
+        small = self.small_size
+        step = self._step
+        lowest = self._lowest
         i = col_header.down
-        while i != col_header:
+        while i is not col_header:
             j = i.right
-            while j != i:
-                j.remove_vertical()
+            while j is not i:
+                j.up.down = j.down
+                j.down.up = j.up
+                header = j.column_header
+                size = header.size - 1
+                header.size = size
+                if size < small and header.primary:
+                    bucket = header.bucket
+                    if bucket >= 0:
+                        del buckets[bucket][header]
+                    bucket = header.offset + size * step if size else 0
+                    header.bucket = bucket
+                    buckets[bucket][header] = None
+                    if bucket < lowest:
+                        lowest = bucket
                 j = j.right
             i = i.down
+        self._lowest = lowest
 
     def uncover_column(self, col_header: DLXColumnHeader) -> None:
         """Uncover a column in the matrix.
@@ -178,55 +285,265 @@ class DLXMatrix:
         Args:
             col_header: The column header to uncover.
         """
-        # Restore all rows that have a 1 in this column
+        buckets = self._buckets
+        if buckets is None:
+            # Restore all rows that have a 1 in this column
+            i = col_header.up
+            while i is not col_header:
+                j = i.left
+                while j is not i:
+                    j.up.down = j
+                    j.down.up = j
+                    j.column_header.size += 1
+                    j = j.left
+                i = i.up
+            col_header.restore_horizontal()
+            return
+
+        # Restore all rows, moving small columns to the bucket of their new size
+        small = self.small_size
+        step = self._step
         i = col_header.up
-        while i != col_header:
+        while i is not col_header:
             j = i.left
-            while j != i:
-                j.restore_vertical()
+            while j is not i:
+                j.up.down = j
+                j.down.up = j
+                header = j.column_header
+                size = header.size + 1
+                header.size = size
+                bucket = header.bucket
+                if bucket >= 0:
+                    del buckets[bucket][header]
+                    if size < small:
+                        bucket = header.offset + size * step
+                        buckets[bucket][header] = None
+                    else:
+                        bucket = -1
+                    header.bucket = bucket
                 j = j.left
             i = i.up
 
         # Restore the column header to the header list
         col_header.restore_horizontal()
+        if col_header.primary:
+            self._rank_counts[col_header.rank] += 1
+            self._add_to_bucket(col_header)
+
+    def _add_to_bucket(self, header: DLXColumnHeader) -> None:
+        """Put a column into the bucket of its size, if it is small."""
+        size = header.size
+        if size >= self.small_size:
+            header.bucket = -1
+            return
+        header.bucket = bucket = header.offset + size * self._step if size else 0
+        self._buckets[bucket][header] = None
+        if bucket < self._lowest:
+            self._lowest = bucket
 
-    def choose_column(self) -> Optional[DLXColumnHeader]:
-        """Choose the column with the fewest 1s (S heuristic).
+    def _build_buckets(self) -> None:
+        """Put the small uncovered columns into their selection buckets.
+
+        Bucket 0 holds the columns without rows. The other buckets are ordered
+        by size, then rank, or by rank, then size.
+        """
+        sizes = self.small_size - 1  # Sizes of non-empty small columns
+        self._step = self._num_ranks if self.size_major else 1
+        self._buckets = [{} for _ in range(1 + self._num_ranks * sizes)]
+        self._rank_counts = [0] * self._num_ranks
+        self._lowest = 0
+        for header in self.column_headers:
+            header.bucket = -1
+            if self.size_major:
+                header.offset = 1 - self._num_ranks + header.rank
+            else:
+                header.offset = header.rank * sizes
+        j = self.root.right
+        while j is not self.root:
+            self._rank_counts[j.rank] += 1
+            self._add_to_bucket(j)
+            j = j.right
+
+    def _scan(self, rank: Optional[int] = None) -> Optional[DLXColumnHeader]:
+        """Find the column with the fewest rows, then lowest rank, by a scan.
+
+        Args:
+            rank: Only consider the columns of this rank, all if None.
 
         Returns:
-            The column header with the minimum size.
+            The column header, None if there is no such column.
         """
-        min_size = float("inf")
         chosen_col = None
-
         j = self.root.right
-        while j != self.root:
-            if isinstance(j, DLXColumnHeader) and j.size < min_size:
-                min_size = j.size
+        while j is not self.root:
+            if (rank is None or j.rank == rank) and (
+                chosen_col is None
+                or (j.size, j.rank) < (chosen_col.size, chosen_col.rank)
+            ):
                 chosen_col = j
             j = j.right
-
         return chosen_col
 
+    def choose_column(self) -> Optional[DLXColumnHeader]:
+        """Choose the next column to branch on.
+
+        With all ranks equal and size_major set, this is the column with the
+        fewest 1s (S heuristic).
+
+        Returns:
+            The chosen column header, None if all columns are covered.
+        """
+        if self._buckets is None:
+            self._build_buckets()
+        buckets = self._buckets
+        if self.size_major:
+            for bucket in range(self._lowest, len(buckets)):
+                if buckets[bucket]:
+                    self._lowest = bucket
+                    return next(iter(buckets[bucket]))
+            self._lowest = len(buckets)
+            return self._scan()
+
+        # Lowest rank first, columns without rows before all others
+        if buckets[0]:
+            return next(iter(buckets[0]))
+        for rank, count in enumerate(self._rank_counts):
+            if count:
+                sizes = self.small_size - 1
+                for bucket in range(1 + rank * sizes, 1 + (rank + 1) * sizes):
+                    if buckets[bucket]:
+                        return next(iter(buckets[bucket]))
+                return self._scan(rank)
+        return None
+
+
+class TreeSizeEstimate(NamedTuple):
+    """Estimated size of the complete DLX search tree of a puzzle state."""
+
+    nodes: float  # Mean of the per-probe node count estimates
+    variance: float  # Sample variance of the per-probe estimates
+    probes: int  # Number of random probes
+    seconds_per_node: float  # Measured cost of a search node
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the node count estimate."""
+        return math.sqrt(self.variance / self.probes) if self.probes else 0.0
+
+    @property
+    def eta(self) -> float:
+        """Estimated seconds to search the complete tree."""
+        return self.nodes * self.seconds_per_node
+
 
 class DLXSolver:
     """Solves the IQ Puzzler game using Dancing Links algorithm (DLX)."""
 
-    def __init__(self, state: PuzzleState, library: PieceLibrary):
+    def __init__(
+        self,
+        state: PuzzleState,
+        library: PieceLibrary,
+        index: Optional[SolutionIndex] = None,
+        catalog: Optional[PlacementCatalog] = None,
+        transposition_table: Optional[TranspositionTable] = None,
+        propagate: bool = True,
+        precheck: bool = True,
+        columns: Union[str, ColumnStrategy] = "mrv",
+        rows: Union[str, RowOrder] = "awkwardness",
+        optional_pieces: Union[bool, Collection[str]] = False,
+        region: Optional[Collection[int]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        progress_interval: int = 1000,
+    ):
         """Initialize the solver.
 
+        With optional pieces or a region, the cheap precheck and the solution
+        index do not apply and are skipped. Transposition tables must not be shared between searches
+        with different optional pieces, regions or color hints.
+
         Args:
             state: The initial puzzle state.
             library: Library containing all available pieces and their variants.
+            index: Optional precomputed solution index of the same library and
+                model, consulted before searching.
+            catalog: Placement catalog of the library in the state's model. It is
+                built on demand if not given.
+            transposition_table: Optional memo of explored sub-boards, consulted
+                before branching. It may be shared between solvers using the
+                same catalog.
+            propagate: Whether to apply forced placements and remove stranding
+                placements before the search, see :func:`reduce_exact_cover`.
+            precheck: Whether to reject states that fail the cheap necessary
+                conditions of :class:`FeasibilityChecker` before building the matrix.
+            columns: Strategy choosing the column to branch on, or its name in
+                ``branching.COLUMN_STRATEGIES``.
+            rows: Order in which the rows of a column are tried, or its name in
+                ``branching.ROW_ORDERS``.
+            optional_pieces: Pieces that may be left unused, True for all of
+                them. Their piece columns become secondary columns.
+            region: Position indices that must be covered, all empty positions
+                if None. The other empty positions may be covered by at most one
+                piece; their columns become secondary columns.
+            on_progress: Called with the number of iterations every
+                ``progress_interval`` search nodes. An exception raised by it
+                aborts the search and propagates to the caller, leaving the
+                solver unusable.
+            progress_interval: Number of search nodes between progress calls.
+
+        Raises:
+            ValueError: If a strategy name is unknown, the region holds
+                positions outside of the model or the progress interval is not
+                positive.
         """
+        from .branching import column_strategy, row_order
+
+        if progress_interval < 1:
+            raise ValueError("Progress interval must be positive")
         self.state = state
         self.library = library
+        self.index = index
+        self._catalog = catalog
+        self.transposition_table = transposition_table
+        self.propagate = propagate
+        self.reduction: Optional[Reduction] = None  # Set when the matrix is built
+        self.precheck = precheck
+        self.infeasibility: Optional[str] = None  # Reason the precheck failed
+        self.column_strategy = column_strategy(columns)
+        self.row_order = row_order(rows)
+        self.optional_pieces = optional_pieces
+        self.region = None if region is None else frozenset(region)
+        if self.region is not None and not self.region <= state.get_all_indices():
+            raise ValueError("Region holds positions outside of the model")
         self.logger = logging.getLogger(__name__)
         self.solution: List[Any] = []
         self.matrix: Optional[DLXMatrix] = None
         self.debug_level = 3  # 0: none, 1: basic, 2: detailed, 3: verbose
         self.iterations = 0
+        self.solution_count = 0
         self.start_time = 0
+        self.build_time = 0.0  # Seconds spent building the matrix
+        self._on_solution: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+        self._limit: Optional[int] = None
+        self._counting = False  # Count solutions without reporting them
+        self.pruned = 0  # Sub-boards answered by the transposition table
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        # Empty positions and remaining pieces of the current sub-board
+        self._empty_mask = 0
+        self._piece_mask = 0
+        self._piece_bits: Dict[str, int] = {}
+
+    @property
+    def catalog(self) -> PlacementCatalog:
+        """Placement catalog the matrix rows are taken from."""
+        if self._catalog is None:
+            self._catalog = PlacementCatalog(self.library, self.state._model)
+        return self._catalog
+
+    @property
+    def _generalized(self) -> bool:
+        """Whether pieces or positions may be left uncovered."""
+        return bool(self.optional_pieces) or self.region is not None
 
     def _log_debug(self, level: int, message: str) -> None:
         """Log a debug message if the debug level is high enough.
@@ -245,8 +562,181 @@ class DLXSolver:
         Returns:
             A solved puzzle state if a solution is found, None otherwise.
         """
+        if self.index is not None and not self._generalized:
+            solved = self.index.solve(self.state)
+            if solved is not None:
+                self.logger.info(
+                    "Solution found in index"
+                    if solved
+                    else "Index holds no solution for this state"
+                )
+                return self.state if solved else None
+            self.logger.info("No indexed solution, falling back to search")
+
+        self._prepare()
+
+        # Solve using Algorithm X
+        if self._solve_dlx():
+            self.logger.info(f"Solution found after {self.iterations} iterations!")
+            self._apply_solution()
+            return self.state
+        else:
+            self.logger.info(f"No solution found after {self.iterations} iterations")
+            return None
+
+    def solve_all(
+        self,
+        on_solution: Callable[[List[Dict[str, Any]]], None],
+        limit: Optional[int] = None,
+    ) -> int:
+        """Enumerate all solutions using DLX search.
+
+        The puzzle state is not modified. Each solution is reported as the list
+        of row data of the placements that complete the initial state.
+
+        Args:
+            on_solution: Called with the placements of every solution found.
+            limit: Stop after this many solutions, None to enumerate all of them.
+
+        Returns:
+            The number of solutions found.
+        """
+        self._prepare()
+        self._on_solution = on_solution
+        self._limit = limit
+        try:
+            self._solve_dlx()
+        finally:
+            self._on_solution = None
+            self._limit = None
+        self.logger.info(
+            f"Found {self.solution_count} solutions after {self.iterations} iterations"
+        )
+        return self.solution_count
+
+    def count_solutions(self) -> int:
+        """Count all solutions using DLX search.
+
+        The puzzle state is not modified. With a transposition table, the
+        counts of explored sub-boards are reused whenever they come up again.
+
+        Returns:
+            The number of solutions.
+        """
+        self._prepare()
+        self._counting = True
+        try:
+            self._solve_dlx()
+        finally:
+            self._counting = False
+        self.logger.info(
+            f"Counted {self.solution_count} solutions after {self.iterations} "
+            f"iterations, {self.pruned} sub-boards taken from the transposition table"
+        )
+        return self.solution_count
+
+    def build_zdd(self) -> SolutionZDD:
+        """Build a ZDD of all solutions using DLX search with memoization (DXZ).
+
+        The puzzle state is not modified. The search memoizes on the set of
+        remaining columns, so every distinct sub-board is solved only once.
+
+        Returns:
+            The diagram over the catalog placements completing the state.
+        """
+        from .solution_zdd import FALSE, SolutionZDD
+
+        self._prepare()
+        zdd = SolutionZDD(self.catalog)
+        root = self._build_zdd(zdd, {})
+        # Placements forced before the search are part of every solution
+        for row_data in reversed(self.solution):
+            root = zdd.add_node(row_data["placement_id"], FALSE, root)
+        zdd.root = root
+        self.logger.info(
+            f"Built ZDD with {len(zdd)} nodes after {self.iterations} iterations"
+        )
+        return zdd
+
+    def estimate_tree_size(
+        self, probes: int = 1000, rng: Optional[random.Random] = None
+    ) -> TreeSizeEstimate:
+        """Estimate the size of the complete search tree with random probes.
+
+        Uses Knuth's estimator: every probe follows a random path from the root
+        to a leaf, choosing columns like the search does. The product of the
+        branching factors along the path is an unbiased estimate of the number
+        of nodes on each level. The complete tree is what enumerating all
+        solutions searches; finding the first solution usually takes less.
+
+        The puzzle state is not modified.
+
+        Args:
+            probes: Number of random root-to-leaf probes.
+            rng: Random number generator, the module level one if None.
+
+        Returns:
+            The estimate, in search nodes as counted by ``iterations``.
+        """
+        self._prepare()
+        randrange = (rng or random).randrange
+        estimates = []
+        steps = 0
+        start = time.perf_counter()
+        for _ in range(probes):
+            estimate = 0
+            weight = 1
+            path = []
+            while self.matrix.root.right != self.matrix.root:
+                estimate += weight
+                steps += 1
+                col = self.matrix.choose_column()
+                if col.size == 0:
+                    break
+                weight *= col.size
+
+                # Follow a random row of the chosen column
+                r = col.down
+                for _ in range(randrange(col.size)):
+                    r = r.down
+                self.matrix.cover_column(col)
+                j = r.right
+                while j != r:
+                    self.matrix.cover_column(j.column_header)
+                    j = j.right
+                path.append((col, r))
+
+            # Restore the matrix in reverse order
+            for col, r in reversed(path):
+                j = r.left
+                while j != r:
+                    self.matrix.uncover_column(j.column_header)
+                    j = j.left
+                self.matrix.uncover_column(col)
+            estimates.append(estimate)
+        elapsed = time.perf_counter() - start
+
+        mean = sum(estimates) / probes if probes else 0.0
+        variance = (
+            sum((e - mean) ** 2 for e in estimates) / (probes - 1)
+            if probes > 1
+            else 0.0
+        )
+        result = TreeSizeEstimate(
+            mean, variance, probes, elapsed / steps if steps else 0.0
+        )
+        self.logger.info(
+            f"Estimated {result.nodes:.0f} ± {result.standard_error:.0f} search "
+            f"nodes, about {result.eta:.1f}s, from {probes} probes"
+        )
+        return result
+
+    def _prepare(self) -> None:
+        """Reset the search statistics and build the matrix for the current state."""
         self.start_time = time.time()
         self.iterations = 0
+        self.solution_count = 0
+        self.pruned = 0
         self.solution = []
 
         # Get all valid indices that need to be filled
@@ -265,17 +755,36 @@ class DLXSolver:
         )
         self.logger.info(f"Available pieces: {len(available_pieces)} pieces to place")
 
+        # Sub-board of the state, updated as placements are chosen
+        self._piece_bits = {
+            name: 1 << i for i, name in enumerate(self.catalog.piece_names)
+        }
+        self._empty_mask = 0
+        for idx in available_indices:
+            self._empty_mask |= 1 << idx
+        self._piece_mask = 0
+        for piece_name in available_pieces:
+            self._piece_mask |= self._piece_bits.get(piece_name, 0)
+
         # Build the exact cover matrix
-        self._build_matrix(available_indices, available_pieces)
+        build_start = time.time()
+        self.infeasibility = None
+        if self.precheck and not self._generalized:
+            from .feasibility import FeasibilityChecker
 
-        # Solve using Algorithm X
-        if self._solve_dlx():
-            self.logger.info(f"Solution found after {self.iterations} iterations!")
-            self._apply_solution()
-            return self.state
+            self.infeasibility = FeasibilityChecker.for_catalog(self.catalog).check(
+                self.state
+            )
+        if self.infeasibility is None:
+            self._build_matrix(available_indices, available_pieces)
         else:
-            self.logger.info(f"No solution found after {self.iterations} iterations")
-            return None
+            from .propagation import Reduction
+
+            # A column without rows makes every search mode fail immediately
+            self.logger.info(f"Puzzle cannot be solved: {self.infeasibility}")
+            self.matrix = DLXMatrix(1, ["infeasible"])
+            self.reduction = Reduction([], np.arange(0), np.arange(1), 0, 0, True)
+        self.build_time = time.time() - build_start
 
     def _build_matrix(
         self, available_indices: Set[int], available_pieces: Set[str]
@@ -287,94 +796,128 @@ class DLXSolver:
         - One column for each piece (piece constraint)
         - One row for each possible placement of each piece
 
+        The columns of positions outside the region and of optional pieces are
+        secondary columns, which follow the primary ones.
+
         Args:
             available_indices: Set of position indices that need to be filled.
             available_pieces: Set of piece names that are available to use.
         """
         self._log_debug(1, "Building exact cover matrix...")
 
-        # Create column names
+        # Positions and pieces that must be covered
+        required_indices = set(available_indices)
+        if self.region is not None:
+            required_indices &= self.region
+        required_pieces = set(available_pieces)
+        if self.optional_pieces is True:
+            required_pieces.clear()
+        elif self.optional_pieces:
+            required_pieces -= set(self.optional_pieces)
+
+        # Create column names and the position of every position column
         column_names = []
-
-        # Position constraint columns (one for each position that needs to be filled)
-        for idx in sorted(available_indices):
-            column_names.append(f"pos_{idx}")
-
-        # Piece constraint columns (one for each available piece)
-        for piece_name in sorted(available_pieces):
-            column_names.append(f"piece_{piece_name}")
-
-        # Create the matrix
-        self.matrix = DLXMatrix(len(column_names), column_names)
+        column_positions: List[Optional[int]] = []
+        for indices, pieces in [
+            (required_indices, required_pieces),
+            (available_indices - required_indices, available_pieces - required_pieces),
+        ]:
+            # Position constraint columns (one for each position to be filled)
+            for idx in sorted(indices):
+                column_names.append(f"pos_{idx}")
+                column_positions.append(idx)
+
+            # Piece constraint columns (one for each available piece)
+            for piece_name in sorted(pieces):
+                column_names.append(f"piece_{piece_name}")
+                column_positions.append(None)
+        primary = len(required_indices) + len(required_pieces)
 
         # Map from column name to column index
         col_map = {name: i for i, name in enumerate(column_names)}
 
-        # Add rows for each possible placement of each piece
-        row_count = 0
-        for piece_name in sorted(available_pieces):
-            piece_variants = self.library.pieces[piece_name]
-            self._log_debug(
-                1, f"Processing piece {piece_name} with {len(piece_variants)} variants"
+        # Candidate rows: catalog placements that fit into the free positions.
+        # Color hints fix the color of their positions before the search, like
+        # colored secondary columns of Knuth's Algorithm C purified at the root:
+        # placements covering a position hinted with another color are dropped.
+        available_mask = self._empty_mask
+        hint_masks = self.state.color_hint_masks(self.library)
+        rows = []
+        row_cols = []
+        for placement_id, entry in enumerate(self.catalog.entries):
+            if (
+                entry.piece_name not in available_pieces
+                or entry.mask & ~available_mask
+                or entry.mask & hint_masks[entry.piece_name]
+            ):
+                continue
+
+            # Position constraints followed by the piece constraint
+            cols = [col_map[f"pos_{idx}"] for idx in sorted(entry.indices)]
+            cols.append(col_map[f"piece_{entry.piece_name}"])
+
+            # Placement data of the row
+            rows.append(
+                {
+                    "piece_name": entry.piece_name,
+                    "anchor_idx": entry.anchor_index,
+                    "occupied_indices": set(entry.indices),
+                    "piece": self.library.pieces[entry.piece_name][entry.variant_index],
+                    "placement_id": placement_id,
+                    "mask": entry.mask,
+                    "piece_bit": self._piece_bits[entry.piece_name],
+                }
             )
+            row_cols.append(cols)
 
-            # For each variant of the piece
-            for piece_variant in piece_variants:
-                # For each possible starting position (only consider available positions)
-                for position_idx in sorted(available_indices):
-                    # Try to place the piece at this position
-                    origin = self.state._model.index_to_coord(position_idx)
-                    placed_piece = coordinate_transformations.translate(
-                        piece_variant, origin
-                    )
-
-                    # Check if all positions are valid
-                    if not all(
-                        self.state._model.is_valid_coord(coord)
-                        for coord in placed_piece.positions
-                    ):
-                        continue
-
-                    # Get the indices occupied by this placement
-                    occupied_indices = set()
-                    valid_placement = True
-
-                    for coord in placed_piece.positions:
-                        idx = self.state._model.coord_to_index(coord)
-                        if idx is None:
-                            valid_placement = False
-                            break
-                        occupied_indices.add(idx)
-
-                    if not valid_placement:
-                        continue
-
-                    # Skip if any position is not in the available indices
-                    if not occupied_indices.issubset(available_indices):
-                        continue
-
-                    # Create a row for this placement
-                    cols = []
-
-                    # Add position constraints
-                    for idx in occupied_indices:
-                        cols.append(col_map[f"pos_{idx}"])
-
-                    # Add piece constraint
-                    cols.append(col_map[f"piece_{piece_name}"])
-
-                    # Add the row to the matrix with placement data
-                    placement_data = {
-                        "piece_name": piece_name,
-                        "start_idx": position_idx,
-                        "occupied_indices": occupied_indices,
-                        "piece": piece_variant,
-                    }
-                    self.matrix.add_row(cols, placement_data)
-                    row_count += 1
+        from .propagation import Reduction, reduce_exact_cover
+
+        # Decide forced and impossible rows before the search
+        incidence = np.zeros((len(rows), len(column_names)), dtype=bool)
+        for row, cols in enumerate(row_cols):
+            incidence[row, cols] = True
+        if self.propagate:
+            self.reduction = reduce_exact_cover(incidence, primary)
+        else:
+            self.reduction = Reduction(
+                [], np.arange(len(rows)), np.arange(len(column_names)), 0, 0, False
+            )
+        for row in self.reduction.forced:
+            self.solution.append(rows[row])
+            self._empty_mask ^= rows[row]["mask"]
+            self._piece_mask ^= rows[row]["piece_bit"]
+
+        # Create the matrix from the remaining rows and columns
+        columns = self.reduction.columns.tolist()
+        remaining = self.reduction.rows.tolist()
+        positions = [column_positions[c] for c in columns]
+        ranks = self.column_strategy.ranks(
+            positions, incidence[np.ix_(remaining, columns)], self.catalog.model
+        )
+        self.matrix = DLXMatrix(
+            len(columns),
+            [column_names[c] for c in columns],
+            ranks,
+            self.column_strategy.size_major,
+            sum(1 for c in columns if c < primary),
+        )
+        new_col = {col: i for i, col in enumerate(columns)}
+        order = self.row_order.order(
+            [rows[row]["placement_id"] for row in remaining], self.catalog
+        )
+        for i in order:
+            row = remaining[i]
+            self.matrix.add_row([new_col[col] for col in row_cols[row]], rows[row])
 
+        self.logger.info(
+            f"Propagation forced {len(self.reduction.forced)} placements and "
+            f"removed {self.reduction.rows_removed} rows and "
+            f"{self.reduction.columns_removed} columns"
+        )
         self._log_debug(
-            1, f"Matrix built with {len(column_names)} columns and {row_count} rows"
+            1,
+            f"Matrix built with {len(columns)} columns and "
+            f"{len(self.reduction.rows)} rows",
         )
 
     def _solve_dlx(self) -> bool:
@@ -389,11 +932,33 @@ class DLXSolver:
 
         # Check if the matrix is empty (already solved)
         if self.matrix.root.right == self.matrix.root:
-            return True
+            if self._on_solution is None and not self._counting:
+                return True
+            # Enumeration mode: report the solution and keep searching
+            self.solution_count += 1
+            if self._on_solution is not None:
+                self._on_solution(list(self.solution))
+            return self.solution_count == self._limit
+
+        # Dead sub-boards are pruned in every mode, known counts when counting
+        table = self.transposition_table
+        if table is not None:
+            key = (self._empty_mask, self._piece_mask)
+            count = table.get(key)
+            if count is not None and (count == 0 or self._counting):
+                self.pruned += 1
+                self.solution_count += count
+                return False
+            start_count = self.solution_count
 
         self.iterations += 1
         if self.iterations % 10 == 0:
             self._log_debug(1, f"Iterations: {self.iterations}")
+        if (
+            self.on_progress is not None
+            and self.iterations % self.progress_interval == 0
+        ):
+            self.on_progress(self.iterations)
 
         # Choose a column to cover (S heuristic: column with fewest 1s)
         col = self.matrix.choose_column()
@@ -411,7 +976,10 @@ class DLXSolver:
             self._log_debug(3, f"Trying row {r.row}")
 
             # Add this row to the solution
-            self.solution.append(self.matrix.row_data[r.row])
+            row_data = self.matrix.row_data[r.row]
+            self.solution.append(row_data)
+            self._empty_mask ^= row_data["mask"]
+            self._piece_mask ^= row_data["piece_bit"]
 
             # Cover all columns that have a 1 in this row
             j = r.right
@@ -428,6 +996,8 @@ class DLXSolver:
 
             # Remove this row from the solution
             self.solution.pop()
+            self._empty_mask ^= row_data["mask"]
+            self._piece_mask ^= row_data["piece_bit"]
 
             # Uncover all columns that have a 1 in this row (in reverse order)
             j = r.left
@@ -440,21 +1010,77 @@ class DLXSolver:
         # Uncover the column we chose
         self.matrix.uncover_column(col)
 
+        # The sub-board is fully explored
+        if table is not None:
+            table.store(key, self.solution_count - start_count)
         return False
 
+    def _build_zdd(self, zdd: SolutionZDD, memo: Dict[Tuple[int, int], int]) -> int:
+        """Add the ZDD of the current sub-board to a diagram.
+
+        Args:
+            zdd: Diagram to add the nodes to.
+            memo: ZDD node of every sub-board built so far.
+
+        Returns:
+            The node holding all completions of the current sub-board.
+        """
+        from .solution_zdd import FALSE, TRUE
+
+        if self.matrix.root.right == self.matrix.root:
+            return TRUE
+        key = (self._empty_mask, self._piece_mask)
+        node = memo.get(key)
+        if node is not None:
+            return node
+
+        self.iterations += 1
+        col = self.matrix.choose_column()
+        self.matrix.cover_column(col)
+
+        # Every completion uses exactly one row of the chosen column
+        branches = []
+        r = col.down
+        while r != col:
+            row_data = self.matrix.row_data[r.row]
+            self._empty_mask ^= row_data["mask"]
+            self._piece_mask ^= row_data["piece_bit"]
+            j = r.right
+            while j != r:
+                self.matrix.cover_column(j.column_header)
+                j = j.right
+
+            branches.append((row_data["placement_id"], self._build_zdd(zdd, memo)))
+
+            j = r.left
+            while j != r:
+                self.matrix.uncover_column(j.column_header)
+                j = j.left
+            self._empty_mask ^= row_data["mask"]
+            self._piece_mask ^= row_data["piece_bit"]
+            r = r.down
+
+        self.matrix.uncover_column(col)
+
+        # Chain the branches, the last one ending in the empty set
+        node = FALSE
+        for placement_id, hi in reversed(branches):
+            node = zdd.add_node(placement_id, node, hi)
+        memo[key] = node
+        return node
+
     def _apply_solution(self) -> None:
         """Apply the found solution to the puzzle state."""
         self._log_debug(1, "Applying solution to puzzle state")
 
         for row_data in self.solution:
             piece_name = row_data["piece_name"]
-            piece = row_data["piece"]
-            position_idx = row_data["start_idx"]
+            position_idx = row_data["anchor_idx"]
 
             self._log_debug(2, f"Placing {piece_name} at index {position_idx}")
 
             # Place the piece in the puzzle state
-            placement = self.state.place_piece(piece, position_idx)
+            placement = self.state.place_by_id(row_data["placement_id"], self.catalog)
             if not placement:
                 self.logger.error(
                     f"Failed to place {piece_name} at index {position_idx}"
@@ -0,0 +1,271 @@
+"""Cheap necessary conditions for a puzzle state to be solvable.
+
+The checks run in well under a millisecond and reject many unsolvable boards
+before any solver builds its search structures:
+
+1. The empty positions must match the total ball count of the remaining pieces.
+2. Every remaining piece must fit somewhere into the empty positions.
+3. Pieces are connected, so each connected hole of empty positions has to be
+   filled by a subset of the pieces, and all holes together by all of them.
+4. Colouring invariants: for every 2-colouring of the lattice, the number of
+   colour-1 positions covered by each piece depends on where it is placed. The
+   sum over all remaining pieces must equal the colour-1 count of the holes.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import bitset
+from .coordinate_transformations import to_lattice_basis
+from .coordinates import LATTICE_STEP
+from .placement_catalog import PlacementCatalog
+from .puzzle_state import PuzzleState
+
+# Nonzero linear forms over GF(2) of the lattice basis coefficients (u, v, w)
+COLOURINGS = [
+    (1, 0, 0),
+    (0, 1, 0),
+    (0, 0, 1),
+    (1, 1, 0),
+    (1, 0, 1),
+    (0, 1, 1),
+    (1, 1, 1),
+]
+
+
+class FeasibilityChecker:
+    """Necessary solvability conditions of states in a catalog's model."""
+
+    def __init__(self, catalog: PlacementCatalog):
+        """Precompute the position adjacency and placement colour counts.
+
+        Args:
+            catalog: Placement catalog of the library in the model.
+        """
+        self.catalog = catalog
+        indices, lattice = catalog.model.get_lattice_table()
+
+        # Positions at the smallest distance touch each other
+        positions = lattice * LATTICE_STEP
+        distances = np.linalg.norm(
+            positions[:, np.newaxis, :] - positions[np.newaxis, :, :], axis=2
+        )
+        np.fill_diagonal(distances, np.inf)
+        touching = np.isclose(distances, distances.min())
+        # Bitmask of the touching positions of every position index
+        self.neighbours: Dict[int, int] = {}
+        for row, idx in enumerate(indices.tolist()):
+            mask = 0
+            for neighbour in indices[touching[row]].tolist():
+                mask |= 1 << neighbour
+            self.neighbours[idx] = mask
+
+        # Colour-1 positions of every colouring, as position bitmasks
+        try:
+            coefficients = to_lattice_basis(lattice)
+        except ValueError:
+            coefficients = lattice
+        parities = (coefficients @ np.array(COLOURINGS).T) % 2
+        self._colour_masks: List[int] = []
+        for colouring in range(len(COLOURINGS)):
+            mask = 0
+            for idx in indices[parities[:, colouring] == 1].tolist():
+                mask |= 1 << idx
+            self._colour_masks.append(mask)
+
+        # Colour-1 positions covered by every placement, per colouring
+        size = int(indices.max()) + 1
+        index_parities = np.zeros((size, len(COLOURINGS)), dtype=np.int64)
+        index_parities[indices] = parities
+        covered = np.zeros((len(catalog.entries), size), dtype=np.int64)
+        rows = [i for i, entry in enumerate(catalog.entries) for _ in entry.indices]
+        cells = [idx for entry in catalog.entries for idx in entry.indices]
+        covered[rows, cells] = 1
+        colour_counts = covered @ index_parities
+
+        # Placements per piece: masks and, per colouring, a bitset with bit k set
+        # if the placement covers k colour-1 positions
+        self._words = bitset.num_words(size)
+        self._piece_masks: Dict[str, np.ndarray] = {}
+        self._piece_colours: Dict[str, np.ndarray] = {}
+        names = np.array([entry.piece_name for entry in catalog.entries])
+        for name in catalog.piece_names:
+            ids = np.flatnonzero(names == name)
+            self._piece_masks[name] = bitset.to_words(
+                (catalog.entries[i].mask for i in ids.tolist()), self._words
+            )
+            self._piece_colours[name] = np.left_shift(
+                np.uint64(1), colour_counts[ids].astype(np.uint64)
+            )
+        self._sizes = {
+            name: len(catalog.library.pieces[name][0].positions)
+            for name in catalog.piece_names
+        }
+        # Rotations and translations keep distances, so every placement of a
+        # piece is connected if one of them is
+        first = {}
+        for entry in catalog.entries:
+            first.setdefault(entry.piece_name, entry.mask)
+        self._connected = all(self._is_connected(mask) for mask in first.values())
+
+    @classmethod
+    def for_catalog(cls, catalog: PlacementCatalog) -> FeasibilityChecker:
+        """Get the checker of a catalog, creating it on first use."""
+        checker = catalog.derived.get("feasibility")
+        if checker is None:
+            checker = catalog.derived["feasibility"] = cls(catalog)
+        return checker
+
+    def _is_connected(self, mask: int) -> bool:
+        """Check whether a set of positions is connected."""
+        return len(self._components(mask)) <= 1
+
+    def _components(self, mask: int) -> List[int]:
+        """Split a set of positions into connected components."""
+        components = []
+        while mask:
+            component = frontier = mask & -mask
+            while frontier:
+                grown = 0
+                rest = frontier
+                while rest:
+                    low = rest & -rest
+                    grown |= self.neighbours[low.bit_length() - 1]
+                    rest ^= low
+                frontier = grown & mask & ~component
+                component |= frontier
+            components.append(component)
+            mask &= ~component
+        return components
+
+    def check(self, state: PuzzleState) -> Optional[str]:
+        """Check the necessary conditions for a state to be solvable.
+
+        Args:
+            state: Puzzle state whose empty positions are to be filled with the
+                pieces of the catalog that are not placed yet.
+
+        Returns:
+            None if no condition rules the state out, otherwise the reason why it
+            cannot be solved.
+        """
+        empty = 0
+        for idx in state.get_all_indices() - state.get_occupied_indices():
+            empty |= 1 << idx
+        pieces = [
+            name for name in self.catalog.piece_names if not state.is_piece_placed(name)
+        ]
+
+        sizes = sorted(self._sizes[name] for name in pieces)
+
+        # 1. Ball count
+        cells = _popcount(empty)
+        if cells != sum(sizes):
+            return (
+                f"{cells} empty positions cannot hold the {sum(sizes)} remaining balls"
+            )
+
+        # 2. Every piece fits somewhere; collect the colour counts of its placements
+        all_bits = (1 << (self._words * bitset.WORD_BITS)) - 1
+        outside = bitset.to_words([~empty & all_bits], self._words)
+        piece_counts = []
+        for name in pieces:
+            fitting = bitset.disjoint(self._piece_masks[name], outside)
+            if not np.any(fitting):
+                return f"Piece {name} does not fit into the empty positions"
+            piece_counts.append(
+                np.bitwise_or.reduce(self._piece_colours[name][fitting], axis=0)
+            )
+
+        # 3. Hole sizes
+        if self._connected:
+            holes = sorted(_popcount(c) for c in self._components(empty))
+            if not _can_partition(holes, sizes):
+                return (
+                    f"Holes of sizes {holes} cannot be filled with pieces of sizes "
+                    f"{sizes}"
+                )
+
+        # 4. Colouring invariants
+        for colouring, colour_mask in enumerate(self._colour_masks):
+            target = _popcount(empty & colour_mask)
+            reachable = 1  # Bit k set if k colour-1 positions can be covered
+            for counts in piece_counts:
+                reachable = _shift_or(reachable, int(counts[colouring]))
+            if not reachable >> target & 1:
+                return (
+                    f"Colouring {COLOURINGS[colouring]} leaves {target} empty positions "
+                    "of one colour, which the remaining pieces cannot cover exactly"
+                )
+        return None
+
+
+def _popcount(mask: int) -> int:
+    """Count the set bits of a mask."""
+    return bin(mask).count("1")
+
+
+def _shift_or(reachable: int, counts: int) -> int:
+    """Add one of several counts to every reachable sum of a sum bitset.
+
+    Args:
+        reachable: Bitset with bit k set for every reachable sum k.
+        counts: Bitset with bit k set for every count k that can be added.
+    """
+    result = 0
+    while counts:
+        low = counts & -counts
+        result |= reachable << (low.bit_length() - 1)
+        counts ^= low
+    return result
+
+
+def _can_partition(holes: List[int], sizes: List[int]) -> bool:
+    """Check whether piece sizes can be split into groups summing to the holes.
+
+    Args:
+        holes: Sizes of the holes, summing to the total piece size.
+        sizes: Sizes of the pieces.
+
+    Returns:
+        True if every hole can be filled exactly by a separate group of pieces.
+    """
+    distinct = sorted(set(sizes))
+    available = tuple(sizes.count(size) for size in distinct)
+    memo: Dict[Tuple[int, Tuple[int, ...]], bool] = {}
+
+    def fill(hole: int, remaining: Tuple[int, ...]) -> bool:
+        # The remaining pieces exactly match the size of the last hole
+        if hole >= len(holes) - 1:
+            return True
+        key = (hole, remaining)
+        if key not in memo:
+            memo[key] = any(
+                fill(hole + 1, rest)
+                for rest in _fillings(holes[hole], distinct, remaining)
+            )
+        return memo[key]
+
+    return fill(0, available)
+
+
+def _fillings(
+    hole: int, distinct: List[int], remaining: Tuple[int, ...]
+) -> List[Tuple[int, ...]]:
+    """Get the remaining piece counts after every way of filling a hole exactly."""
+    results = []
+
+    def choose(i: int, left: int, rest: List[int]) -> None:
+        if i == len(distinct):
+            if left == 0:
+                results.append(tuple(rest))
+            return
+        for used in range(min(remaining[i], left // distinct[i]) + 1):
+            rest.append(remaining[i] - used)
+            choose(i + 1, left - used * distinct[i], rest)
+            rest.pop()
+
+    choose(0, hole, [])
+    return results
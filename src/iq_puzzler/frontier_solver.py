@@ -0,0 +1,383 @@
+"""Experimental solver expanding batches of partial states with NumPy.
+
+The recursive solvers pay interpreter overhead for every search node. This
+solver keeps the frontier of partial states as arrays instead: the occupied
+positions of every state as a multi-word bitset (see :mod:`bitset`) and its
+placed pieces as a uint64 mask. A batch of states is expanded in a few vectorized operations:
+
+1. Every state picks an empty position, see CELL_RULES.
+2. The placements covering it are gathered from a padded table.
+3. A bitwise AND with both masks keeps the placements that fit.
+4. Children leaving an empty position without empty neighbours are dropped.
+
+Children are pushed back onto a stack of batches, which is worked off depth
+first, so memory stays bounded by the depth times the batch size times the
+branching factor. When counting, identical children of a batch are merged
+and carry the number of paths leading to them.
+
+Without the propagation of the DLX solver, the search expands far more states
+than :class:`~iq_puzzler.dlx_solver.DLXSolver` visits nodes, so it is an
+experimental alternative for counting and enumerating rather than a
+replacement.
+"""
+
+from typing import Callable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from . import bitset
+from .feasibility import FeasibilityChecker
+from .piece_library import PieceLibrary
+from .placement_catalog import PlacementCatalog
+from .puzzle_state import PuzzleState
+
+# Piece bit of the padding of the placement table, held by every state
+_PADDING = 1 << 63
+
+# Empty position expanded in every state: the one with the fewest empty
+# neighbours, or the first one by position index. The first rule needs no
+# neighbour counts, but expands about ten times more states on boards with
+# few pieces placed (see benchmarks/frontier_cells.py).
+CELL_RULES = ("fewest", "first")
+
+# Occupied and used piece masks, paths of placement ids and path counts
+Batch = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class FrontierSolver:
+    """Solves the IQ Puzzler game by vectorized expansion of partial states."""
+
+    def __init__(
+        self,
+        state: PuzzleState,
+        library: PieceLibrary,
+        catalog: Optional[PlacementCatalog] = None,
+        batch_size: int = 4096,
+        precheck: bool = True,
+        on_progress: Optional[Callable[[int], None]] = None,
+        cells: str = "fewest",
+    ):
+        """Initialize the solver.
+
+        Args:
+            state: The initial puzzle state.
+            library: Library containing all available pieces and their variants.
+            catalog: Placement catalog of the library in the state's model. It is
+                built on demand if not given.
+            batch_size: Maximum number of states expanded at once.
+            precheck: Whether to reject states that fail the cheap necessary
+                conditions of :class:`FeasibilityChecker` before searching.
+            on_progress: Called with the number of iterations after every
+                expanded batch. An exception raised by it aborts the search and
+                propagates to the caller.
+            cells: Rule choosing the empty position every state is expanded
+                at, one of CELL_RULES.
+
+        Raises:
+            ValueError: If the batch size is not positive or the cell rule is
+                unknown.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        if cells not in CELL_RULES:
+            raise ValueError(f"Unknown cell rule: {cells}")
+        self.state = state
+        self.library = library
+        self._catalog = catalog
+        self.batch_size = batch_size
+        self.precheck = precheck
+        self.on_progress = on_progress
+        self.cells = cells
+        self.logger = logging.getLogger(__name__)
+        self.iterations = 0  # Expanded states
+        self.peak_frontier = 0  # Largest number of states waiting on the stack
+        self.solution_count = 0
+
+    @property
+    def catalog(self) -> PlacementCatalog:
+        """Placement catalog the placements are taken from."""
+        if self._catalog is None:
+            self._catalog = PlacementCatalog(self.library, self.state._model)
+        return self._catalog
+
+    def solve(self) -> Optional[PuzzleState]:
+        """Find a solution.
+
+        Returns:
+            A solved puzzle state if a solution is found, None otherwise.
+        """
+        solutions: List[List[int]] = []
+        self.solve_all(solutions.append, limit=1)
+        if not solutions:
+            self.logger.info(f"No solution found after {self.iterations} iterations")
+            return None
+        for placement_id in solutions[0]:
+            self.state.place_by_id(placement_id, self.catalog)
+        self.logger.info(f"Solution found after {self.iterations} iterations!")
+        return self.state
+
+    def solve_all(
+        self, on_solution: Callable[[List[int]], None], limit: Optional[int] = None
+    ) -> int:
+        """Enumerate all solutions.
+
+        The puzzle state is not modified.
+
+        Args:
+            on_solution: Called with the catalog placement ids completing the
+                initial state, for every solution found.
+            limit: Stop after this many solutions, None to enumerate all of them.
+
+        Returns:
+            The number of solutions found.
+        """
+        self._search(on_solution, limit)
+        self.logger.info(
+            f"Found {self.solution_count} solutions after {self.iterations} iterations"
+        )
+        return self.solution_count
+
+    def count_solutions(self) -> int:
+        """Count all solutions.
+
+        The puzzle state is not modified.
+
+        Returns:
+            The number of solutions.
+        """
+        self._search(None, None)
+        self.logger.info(
+            f"Counted {self.solution_count} solutions after {self.iterations} "
+            "iterations"
+        )
+        return self.solution_count
+
+    def _build_table(
+        self, cells: int, words: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Build the table of the placements fitting into the initial state.
+
+        Args:
+            cells: Number of rows of the table, the highest position index plus one.
+            words: Number of words of a position mask, see :mod:`bitset`.
+
+        Returns:
+            The placement masks (cells, K, words), piece masks (cells, K) and
+            placement ids (cells, K): row c holds the placements covering
+            position c, padded to the longest row with entries of the padding
+            piece. Followed by the number of placements of every row.
+
+        Raises:
+            ValueError: If the catalog has too many pieces for a uint64 mask.
+        """
+        if len(self.catalog.piece_names) >= 63:
+            raise ValueError("Frontier search needs fewer than 63 pieces")
+        empty = 0
+        for idx in self.state.get_all_indices() - self.state.get_occupied_indices():
+            empty |= 1 << idx
+        piece_bits = {name: 1 << i for i, name in enumerate(self.catalog.piece_names)}
+        placed = set(self.state.get_placements())
+        hint_masks = self.state.color_hint_masks(self.library)
+
+        by_cell: List[List[int]] = [[] for _ in range(cells)]
+        for placement_id, entry in enumerate(self.catalog.entries):
+            if (
+                entry.piece_name not in placed
+                and not entry.mask & ~empty
+                and not entry.mask & hint_masks[entry.piece_name]
+            ):
+                for idx in entry.indices:
+                    by_cell[idx].append(placement_id)
+
+        width = max(1, max(len(ids) for ids in by_cell))
+        masks = np.zeros((cells, width, words), dtype=np.uint64)
+        pieces = np.full((cells, width), _PADDING, dtype=np.uint64)
+        ids = np.zeros((cells, width), dtype=np.int64)
+        for cell, placement_ids in enumerate(by_cell):
+            if not placement_ids:
+                continue
+            count = len(placement_ids)
+            masks[cell, :count] = bitset.to_words(
+                (self.catalog[i].mask for i in placement_ids), words
+            )
+            pieces[cell, :count] = [
+                piece_bits[self.catalog[i].piece_name] for i in placement_ids
+            ]
+            ids[cell, :count] = placement_ids
+        lengths = np.array([len(ids) for ids in by_cell], dtype=np.int64)
+        return masks, pieces, ids, lengths
+
+    def _search(
+        self,
+        on_solution: Optional[Callable[[List[int]], None]],
+        limit: Optional[int],
+    ) -> None:
+        """Expand the frontier until it is exhausted or the limit is reached.
+
+        Args:
+            on_solution: Called with the placement ids of every solution, None to
+                only count the solutions.
+            limit: Stop after this many solutions, None for no limit.
+        """
+        self.iterations = 0
+        self.peak_frontier = 0
+        self.solution_count = 0
+        if self.precheck:
+            reason = FeasibilityChecker.for_catalog(self.catalog).check(self.state)
+            if reason is not None:
+                self.logger.info(f"Puzzle cannot be solved: {reason}")
+                return
+
+        cells = max(self.state.get_all_indices()) + 1
+        words = bitset.num_words(cells)
+        masks, pieces, ids, lengths = self._build_table(cells, words)
+        full = 0
+        for idx in self.state.get_all_indices():
+            full |= 1 << idx
+        all_pieces = _PADDING
+        for i, name in enumerate(self.catalog.piece_names):
+            if name in self.library.pieces:
+                all_pieces |= 1 << i
+        used = _PADDING
+        for i, name in enumerate(self.catalog.piece_names):
+            if self.state.is_piece_placed(name):
+                used |= 1 << i
+        full_mask = bitset.to_words([full], words)[0]
+        done_pieces = np.uint64(all_pieces)
+        # Empty neighbours of a position, counted by a product with the adjacency
+        adjacency = np.zeros((cells, cells), dtype=np.float32)
+        touching = FeasibilityChecker.for_catalog(self.catalog).neighbours
+        for idx, mask in touching.items():
+            for other in range(cells):
+                if mask >> other & 1:
+                    adjacency[other, idx] = 1
+        counting = on_solution is None
+
+        occupied = bitset.to_words([self.state.get_occupied_mask()], words)
+        stack: List[Batch] = [
+            (
+                occupied,
+                np.array([used], dtype=np.uint64),
+                np.zeros((1, 0), dtype=np.int64),
+                np.ones(1, dtype=np.int64),
+            )
+        ]
+        if bitset.equal(occupied[0], full_mask):
+            # Nothing left to place
+            stack = []
+            self._report(on_solution, [np.zeros(0, dtype=np.int64)], 1)
+
+        while stack:
+            occupied, used_pieces, paths, weights = stack.pop()
+            if len(occupied) > self.batch_size:
+                rest = self.batch_size
+                stack.append(
+                    (occupied[rest:], used_pieces[rest:], paths[rest:], weights[rest:])
+                )
+                occupied = occupied[:rest]
+                used_pieces = used_pieces[:rest]
+                paths = paths[:rest]
+                weights = weights[:rest]
+            self.iterations += len(occupied)
+            if self.on_progress is not None:
+                self.on_progress(self.iterations)
+
+            # Empty position to expand in every state
+            empty = bitset.unpack(~occupied & full_mask)[:, :cells]
+            if self.cells == "first":
+                choice = np.argmax(empty > 0, axis=1)
+            else:
+                empty = empty.astype(np.float32)
+                score = np.where(empty > 0, empty @ adjacency, np.inf)
+                choice = np.argmin(score, axis=1)
+
+            # Placements of that position fitting into the state
+            width = lengths[choice].max()
+            fits = bitset.disjoint(masks[choice, :width], occupied[:, np.newaxis]) & (
+                (pieces[choice, :width] & used_pieces[:, np.newaxis]) == 0
+            )
+            parent, k = np.nonzero(fits)
+            if not len(parent):
+                continue
+            cell = choice[parent]
+            child_occupied = occupied[parent] | masks[cell, k]
+            child_pieces = used_pieces[parent] | pieces[cell, k]
+            child_weights = weights[parent]
+            child_paths = None
+            if not counting:
+                child_paths = np.concatenate(
+                    [paths[parent], ids[cell, k][:, np.newaxis]], axis=1
+                )
+
+            complete = bitset.equal(child_occupied, full_mask)
+            solved = complete & (child_pieces == done_pieces)
+            if np.any(solved):
+                found = child_paths[solved] if not counting else []
+                if limit is not None:
+                    # One batch may complete more solutions than still wanted
+                    found = found[: limit - self.solution_count]
+                self._report(on_solution, found, int(child_weights[solved].sum()))
+                if limit is not None and self.solution_count >= limit:
+                    return
+            # A single empty position without empty neighbours cannot be filled
+            child_empty = bitset.unpack(~child_occupied & full_mask)[:, :cells]
+            child_empty = child_empty.astype(np.float32)
+            isolated = np.any(
+                (child_empty > 0) & (child_empty @ adjacency == 0), axis=1
+            )
+            open_states = ~complete & ~isolated
+            if not np.any(open_states):
+                continue
+            child_occupied = child_occupied[open_states]
+            child_pieces = child_pieces[open_states]
+            child_weights = child_weights[open_states]
+            if counting:
+                # Merge identical states, counting the paths leading to them
+                keys = np.column_stack([child_occupied, child_pieces])
+                order = np.lexsort(keys.T)
+                keys = keys[order]
+                starts = np.ones(len(order), dtype=bool)
+                starts[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+                merged = np.add.reduceat(child_weights[order], np.flatnonzero(starts))
+                stack.append(
+                    (
+                        keys[starts, :words],
+                        keys[starts, words],
+                        np.zeros((len(merged), 0), dtype=np.int64),
+                        merged,
+                    )
+                )
+            else:
+                stack.append(
+                    (
+                        child_occupied,
+                        child_pieces,
+                        child_paths[open_states],
+                        child_weights,
+                    )
+                )
+            self.peak_frontier = max(
+                self.peak_frontier, sum(len(batch[0]) for batch in stack)
+            )
+
+    def _report(
+        self,
+        on_solution: Optional[Callable[[List[int]], None]],
+        paths,
+        count: int,
+    ) -> None:
+        """Record found solutions.
+
+        Args:
+            on_solution: Called with the placement ids of every solution, None
+                when counting.
+            paths: Placement ids of the solutions, unused when counting.
+            count: Number of solutions found, including merged paths.
+        """
+        if on_solution is None:
+            self.solution_count += count
+            return
+        for path in paths:
+            on_solution([int(placement_id) for placement_id in path])
+            self.solution_count += 1
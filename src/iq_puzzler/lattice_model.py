@@ -0,0 +1,316 @@
+"""Puzzle model built from a data-driven shape definition."""
+
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .coordinates import Location3D, XY_DIST, Z_DIST, to_lattice
+from .puzzle_model import PuzzleModel
+from .pyramid_model import PyramidModel
+
+Rotation = Tuple[float, float, float]
+
+_STANDARD_ROTATIONS: List[Rotation] = PyramidModel().get_valid_rotations()
+
+# Named subsets of the standard rotations a shape may allow
+ROTATION_SETS: Dict[str, List[Rotation]] = {
+    # Pieces lying flat in a layer
+    "flat": [r for r in _STANDARD_ROTATIONS if r[1] == 0 and r[2] in (0, 180)],
+    # Flat and standing diagonally across layers
+    "all": list(_STANDARD_ROTATIONS),
+}
+
+
+class LatticeModel(PuzzleModel):
+    """Manages the positions of a custom shape on the pyramid lattice.
+
+    The shape is given as a list of positions, or layer by layer as a list of
+    (rows, cols) grids. Layers are stacked Z_DIST apart and centred on the
+    bottom layer, like the layers of :class:`PyramidModel`, so
+    ``LatticeModel.pyramid(5)`` has the same indices as the pyramid. Positions
+    must lie on the lattice: points of odd layers are shifted by XY_DIST / 2 in
+    x and y.
+
+    A shape definition is a JSON object with the keys:
+
+    - ``name``: Optional name of the shape.
+    - ``layers``: List of [rows, cols] grids from bottom to top, or
+    - ``positions``: List of [x, y, z] coordinates in index order.
+    - ``rotations``: Optional name of a set in ROTATION_SETS, or a list of
+      [yaw, pitch, roll] triples taken from it. Defaults to ``"all"``.
+    """
+
+    def __init__(
+        self,
+        positions: Iterable[Sequence[float]],
+        rotations: Union[str, Iterable[Sequence[float]]] = "all",
+        name: str = "lattice",
+    ):
+        """Build the index maps and neighbour graph of a shape.
+
+        Args:
+            positions: (x, y, z) coordinates of the positions, in index order.
+            rotations: Name of a set in ROTATION_SETS, or (yaw, pitch, roll)
+                rotations taken from the "all" set.
+            name: Name of the shape.
+
+        Raises:
+            ValueError: If the shape is empty, a position is duplicated or off
+                the lattice, or a rotation is unknown.
+        """
+        self.name = name
+        self._layers: Optional[List[Tuple[int, int]]] = None
+        self._index_to_coord: Dict[int, Location3D] = {}
+        self._coord_to_index: Dict[Location3D, int] = {}
+        for index, position in enumerate(positions):
+            coord = Location3D(*(float(value) for value in position))
+            if coord in self._coord_to_index:
+                raise ValueError(f"Duplicate position {tuple(coord)}")
+            self._index_to_coord[index] = coord
+            self._coord_to_index[coord] = index
+        if not self._index_to_coord:
+            raise ValueError("A shape needs at least one position")
+
+        lattice = to_lattice(list(self._index_to_coord.values()))
+        for (index, coord), point in zip(self._index_to_coord.items(), lattice):
+            x, y, z = point.tolist()
+            off_grid = not all(
+                abs(value - expected) < 1e-6
+                for value, expected in zip(
+                    coord, (x * XY_DIST / 2, y * XY_DIST / 2, z * Z_DIST)
+                )
+            )
+            if off_grid or (x - z) % 2 or (y - z) % 2:
+                raise ValueError(f"Position {index} {tuple(coord)} is off the lattice")
+
+        # Positions at distance XY_DIST touch: dx^2 + dy^2 + 2 dz^2 == 4 in
+        # lattice units
+        self._neighbours: Dict[int, Set[int]] = {i: set() for i in self._index_to_coord}
+        points = {tuple(point): i for i, point in enumerate(lattice.tolist())}
+        steps = [
+            (dx, dy, dz)
+            for dx in range(-2, 3)
+            for dy in range(-2, 3)
+            for dz in (-1, 0, 1)
+            if dx * dx + dy * dy + 2 * dz * dz == 4
+        ]
+        for point, index in points.items():
+            for dx, dy, dz in steps:
+                other = points.get((point[0] + dx, point[1] + dy, point[2] + dz))
+                if other is not None:
+                    self._neighbours[index].add(other)
+
+        self._rotations = _resolve_rotations(rotations)
+        self._rotation_spec = rotations if isinstance(rotations, str) else None
+
+    @classmethod
+    def from_layers(
+        cls,
+        layers: Iterable[Sequence[int]],
+        rotations: Union[str, Iterable[Sequence[float]]] = "all",
+        name: str = "lattice",
+    ) -> LatticeModel:
+        """Build a shape of stacked rectangular layers.
+
+        Args:
+            layers: (rows, cols) of every layer from bottom to top.
+            rotations: Allowed rotations, see :meth:`__init__`.
+            name: Name of the shape.
+
+        Returns:
+            The model, indexed layer by layer, row by row.
+
+        Raises:
+            ValueError: If a layer is empty or the shape is invalid.
+        """
+        layers = [(int(rows), int(cols)) for rows, cols in layers]
+        if not layers:
+            raise ValueError("A shape needs at least one layer")
+        base_rows, base_cols = layers[0]
+        positions = []
+        for layer, (rows, cols) in enumerate(layers):
+            if rows < 1 or cols < 1:
+                raise ValueError(f"Layer {layer} has no positions")
+            # Centre every layer on the bottom layer
+            x_offset = (base_cols - cols) * XY_DIST / 2
+            y_offset = (base_rows - rows) * XY_DIST / 2
+            for row in range(rows):
+                for col in range(cols):
+                    positions.append(
+                        (
+                            col * XY_DIST + x_offset,
+                            row * XY_DIST + y_offset,
+                            layer * Z_DIST,
+                        )
+                    )
+        model = cls(positions, rotations, name)
+        model._layers = layers
+        return model
+
+    @classmethod
+    def pyramid(cls, size: int) -> LatticeModel:
+        """Build a square pyramid.
+
+        Args:
+            size: Side length of the bottom layer, 5 for the standard pyramid.
+
+        Returns:
+            The model with ``size`` layers.
+        """
+        return cls.from_layers(
+            [(n, n) for n in range(size, 0, -1)], "all", f"pyramid-{size}"
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> LatticeModel:
+        """Build a model from a parsed shape definition.
+
+        Args:
+            data: Shape definition, see the class documentation.
+
+        Returns:
+            The model.
+
+        Raises:
+            ValueError: If the definition is invalid.
+        """
+        name = data.get("name", "lattice")
+        rotations = data.get("rotations", "all")
+        if ("layers" in data) == ("positions" in data):
+            raise ValueError("A shape needs either layers or positions")
+        if "layers" in data:
+            return cls.from_layers(data["layers"], rotations, name)
+        return cls(data["positions"], rotations, name)
+
+    @classmethod
+    def from_json(cls, path: Union[str, Path]) -> LatticeModel:
+        """Load a model from a shape definition file.
+
+        Args:
+            path: Path to the JSON file.
+
+        Returns:
+            The model.
+
+        Raises:
+            ValueError: If the definition is invalid.
+        """
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the shape definition of the model.
+
+        Returns:
+            A definition that :meth:`from_dict` turns into an equal model.
+        """
+        data: Dict[str, Any] = {"name": self.name}
+        if self._layers is not None:
+            data["layers"] = [list(layer) for layer in self._layers]
+        else:
+            data["positions"] = [
+                list(self._index_to_coord[i]) for i in range(len(self._index_to_coord))
+            ]
+        data["rotations"] = self._rotation_spec or [list(r) for r in self._rotations]
+        return data
+
+    def coord_to_index(self, coord: Location3D) -> Optional[int]:
+        """Convert 3D coordinates to a position index.
+
+        Args:
+            coord: (x, y, z) coordinates.
+
+        Returns:
+            Position index if the coordinates are valid, None otherwise.
+        """
+        return self._coord_to_index.get(Location3D(*coord))
+
+    def index_to_coord(self, index: int) -> Optional[Location3D]:
+        """Convert a position index to 3D coordinates.
+
+        Args:
+            index: Position index.
+
+        Returns:
+            (x, y, z) coordinates if the index is valid, None otherwise.
+        """
+        return self._index_to_coord.get(index)
+
+    def is_valid_index(self, index: int) -> bool:
+        """Check if a position index is valid.
+
+        Args:
+            index: Position index to validate.
+
+        Returns:
+            True if the index is valid, False otherwise.
+        """
+        return index in self._index_to_coord
+
+    def is_valid_coord(self, coord: Location3D) -> bool:
+        """Check if 3D coordinates are within the shape.
+
+        Args:
+            coord: (x, y, z) coordinates to validate.
+
+        Returns:
+            True if the coordinates are valid, False otherwise.
+        """
+        return Location3D(*coord) in self._coord_to_index
+
+    def get_all_indices(self) -> Set[int]:
+        """Get all valid position indices.
+
+        Returns:
+            Set of all valid position indices.
+        """
+        return set(self._index_to_coord.keys())
+
+    def get_valid_rotations(self) -> List[Rotation]:
+        """Get all valid rotation angle combinations.
+
+        Returns:
+            List of tuples (yaw, pitch, roll) in degrees.
+        """
+        return list(self._rotations)
+
+    def get_neighbours(self, index: int) -> Set[int]:
+        """Get the positions touching a position.
+
+        Args:
+            index: Position index.
+
+        Returns:
+            Indices of the positions at distance XY_DIST, empty for invalid
+            indices.
+        """
+        return set(self._neighbours.get(index, ()))
+
+
+def _resolve_rotations(
+    rotations: Union[str, Iterable[Sequence[float]]],
+) -> List[Rotation]:
+    """Resolve the rotations of a shape definition.
+
+    Args:
+        rotations: Name of a set in ROTATION_SETS, or rotations taken from the
+            "all" set.
+
+    Returns:
+        The rotations in the order of the standard rotations.
+
+    Raises:
+        ValueError: If the name or a rotation is unknown.
+    """
+    if isinstance(rotations, str):
+        if rotations not in ROTATION_SETS:
+            raise ValueError(f"Unknown rotation set: {rotations}")
+        return list(ROTATION_SETS[rotations])
+    requested = {tuple(float(angle) for angle in rotation) for rotation in rotations}
+    unknown = requested - {
+        tuple(float(angle) for angle in r) for r in _STANDARD_ROTATIONS
+    }
+    if unknown:
+        raise ValueError(f"Rotations {sorted(unknown)} are not standard rotations")
+    return [r for r in _STANDARD_ROTATIONS if tuple(float(a) for a in r) in requested]
@@ -2,8 +2,11 @@
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from .coordinates import LATTICE_STEP, to_lattice
 from .puzzle_piece import PuzzlePiece
 from .puzzle_model import PuzzleModel
 from . import coordinate_transformations
@@ -21,31 +24,41 @@ class PieceLibrary:
             model: The puzzle model to use for determining valid rotations.
         """
         self.pieces: Dict[str, List[PuzzlePiece]] = {}
+        # Indices of the variants of each piece with distinct positions
+        self.unique_variants: Dict[str, List[int]] = {}
         self._model = model
 
         # Load pieces from JSON if a path is provided
         if library_path is not None:
             with open(library_path, "r") as f:
-                piece_data = json.load(f)
-
-            # Create pieces and their rotated variants
-            for piece_info in piece_data:
-                name = piece_info["name"]
-                color = piece_info["color"]
-                if "positions" in piece_info:
-                    positions = piece_info["positions"]
-                else:
-                    # Convert grid to positions
-                    grid = piece_info["grid"]
-                    positions = []
-                    for i, cell in enumerate(grid):
-                        if cell:
-                            x = 3 - i // 4
-                            y = 3 - i % 4
-                            positions.append([float(x), float(y), 0.0])
-                    positions.reverse()
-                piece = PuzzlePiece(name, color, positions)
-                self.add_piece(piece)
+                self.add_pieces_from_json(json.load(f))
+
+    def add_pieces_from_json(self, piece_data: List[dict]) -> None:
+        """Add pieces and their variants from parsed library JSON data.
+
+        Args:
+            piece_data: List of piece definitions with name, color and either
+                positions or a 4x4 grid.
+        """
+        # Create pieces, then generate the variants of all of them at once
+        pieces = []
+        for piece_info in piece_data:
+            name = piece_info["name"]
+            color = piece_info["color"]
+            if "positions" in piece_info:
+                positions = piece_info["positions"]
+            else:
+                # Convert grid to positions
+                grid = piece_info["grid"]
+                positions = []
+                for i, cell in enumerate(grid):
+                    if cell:
+                        x = 3 - i // 4
+                        y = 3 - i % 4
+                        positions.append([float(x), float(y), 0.0])
+                positions.reverse()
+            pieces.append(PuzzlePiece(name, color, positions))
+        self.add_pieces(pieces)
 
     def add_piece(self, piece: PuzzlePiece) -> None:
         """Add a piece and its variants to the library.
@@ -53,9 +66,62 @@ class PieceLibrary:
         Args:
             piece: The piece to add.
         """
-        # Generate all valid variants of the piece
-        variants = self._generate_variants(piece)
-        self.pieces[piece.name] = variants
+        self.add_pieces([piece])
+
+    def add_pieces(self, pieces: Sequence[PuzzlePiece]) -> None:
+        """Add several pieces and their variants to the library.
+
+        Args:
+            pieces: The pieces to add.
+
+        Raises:
+            ValueError: If a piece is not aligned with the grid.
+        """
+        if not pieces:
+            return
+        variants, mask = self._generate_variant_table(pieces)
+        positions = variants * LATTICE_STEP
+        unique = _unique_variants(variants, mask)
+        for i, piece in enumerate(pieces):
+            num_balls = len(piece.positions)
+            self.pieces[piece.name] = [
+                PuzzlePiece(piece.name, piece.color, variant[:num_balls])
+                for variant in positions[i]
+            ]
+            self.unique_variants[piece.name] = unique[i]
+
+    def _generate_variant_table(
+        self, pieces: Sequence[PuzzlePiece]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rotate every piece by every valid rotation in one tensor operation.
+
+        Pieces are padded to the size of the largest piece.
+
+        Args:
+            pieces: The pieces to rotate.
+
+        Returns:
+            (pieces, rotations, balls, 3) array of variant lattice coordinates in
+            the order of the model's valid rotations, and the (pieces, balls)
+            mask of the balls that are not padding.
+
+        Raises:
+            ValueError: If a piece is not aligned with the grid.
+        """
+        num_balls = max(len(piece.positions) for piece in pieces)
+        positions = np.zeros((len(pieces), num_balls, 3))
+        mask = np.zeros((len(pieces), num_balls), dtype=bool)
+        for i, piece in enumerate(pieces):
+            positions[i, : len(piece.positions)] = piece.positions
+            mask[i, : len(piece.positions)] = True
+
+        lattice = to_lattice(positions.reshape(-1, 3)).reshape(positions.shape)
+        if not np.allclose(lattice * LATTICE_STEP, positions, atol=1e-10):
+            raise ValueError("Positions cannot be aligned to the grid")
+        variants = coordinate_transformations.rotate_lattice_batch(
+            lattice, self._model.get_lattice_rotations()
+        )
+        return variants, mask
 
     def _generate_variants(self, piece: PuzzlePiece) -> List[PuzzlePiece]:
         """Generate all valid rotated variants of a piece.
@@ -66,9 +132,34 @@ class PieceLibrary:
         Returns:
             List of all valid rotations of the piece.
         """
-        variants = []
-        for angles in self._model.get_valid_rotations():
-            rotation_matrix = coordinate_transformations.rotation_matrix(*angles)
-            rotated_piece = coordinate_transformations.rotate(piece, rotation_matrix)
-            variants.append(rotated_piece)
-        return variants
+        variants, _ = self._generate_variant_table([piece])
+        num_balls = len(piece.positions)
+        return [
+            PuzzlePiece(piece.name, piece.color, variant[:num_balls] * LATTICE_STEP)
+            for variant in variants[0]
+        ]
+
+
+def _unique_variants(variants: np.ndarray, mask: np.ndarray) -> List[List[int]]:
+    """Find the variants of each piece that cover distinct relative positions.
+
+    Args:
+        variants: (pieces, rotations, balls, 3) variant lattice coordinates.
+        mask: (pieces, balls) mask of the balls that are not padding.
+
+    Returns:
+        For every piece the ascending indices of the first variant of each
+        distinct position set.
+    """
+    # Order the balls of every variant canonically, padding last
+    low = variants.min(axis=(1, 2), keepdims=True)
+    span = int((variants - low).max()) + 1
+    keys = ((variants - low) @ np.array([span * span, span, 1])).astype(np.int64)
+    keys = np.where(mask[:, np.newaxis, :], keys, np.iinfo(np.int64).max)
+    keys.sort(axis=2)
+
+    unique = []
+    for piece_keys in keys:
+        _, first = np.unique(piece_keys, axis=0, return_index=True)
+        unique.append(sorted(first.tolist()))
+    return unique
@@ -0,0 +1,173 @@
+"""Precomputed table of every in-bounds placement of the pieces in a library.
+
+A placement is identified by the variant and the position its first ball
+lies on, its anchor. Variant origins are not used: they need not be a ball of
+the variant and may then lie outside the model.
+"""
+
+from __future__ import annotations
+import hashlib
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import coordinate_transformations
+from .coordinates import to_lattice
+from .piece_library import PieceLibrary
+from .puzzle_model import PuzzleModel
+from .puzzle_piece import PuzzlePiece
+
+
+def anchored(variant: PuzzlePiece, anchor: np.ndarray) -> PuzzlePiece:
+    """Translate a variant so that its first ball lies on a coordinate.
+
+    Args:
+        variant: The piece variant to translate.
+        anchor: Coordinate of the anchor position.
+
+    Returns:
+        The translated piece.
+    """
+    return coordinate_transformations.translate(variant, anchor - variant.positions[0])
+
+
+class CatalogEntry(NamedTuple):
+    """A single placement of a piece variant at an anchor position."""
+
+    piece_name: str
+    variant_index: int  # Index into PieceLibrary.pieces[piece_name]
+    anchor_index: int  # Position index the first ball of the variant lies on
+    indices: FrozenSet[int]  # Position indices covered by the placement
+    mask: int  # Bitmask with bit i set for every covered index i
+
+
+class PlacementCatalog:
+    """All distinct placements of every library piece that fit inside a model.
+
+    Placements are enumerated once per library and model. Variants of symmetric
+    pieces that cover the same cells are stored only once, keeping the first
+    (variant, anchor) pair in library order.
+    """
+
+    def __init__(
+        self,
+        library: PieceLibrary,
+        model: PuzzleModel,
+        entries: Optional[Iterable[Tuple[str, int, int, Iterable[int]]]] = None,
+    ):
+        """Enumerate all placements.
+
+        Args:
+            library: Library containing all pieces and their variants.
+            model: The puzzle model the pieces are placed in.
+            entries: Precomputed (piece_name, variant_index, anchor_index, indices)
+                tuples to use instead of enumerating the placements.
+        """
+        self.library = library
+        self.model = model
+        self.model_name = type(model).__name__
+        self.piece_names: List[str] = sorted(library.pieces.keys())
+        self.entries: List[CatalogEntry] = []
+        self._lookup: Dict[Tuple[str, FrozenSet[int]], int] = {}
+        self._fingerprint: Optional[bytes] = None
+        # Tables other modules derive from the catalog, freed with the catalog
+        self.derived: Dict[str, object] = {}
+
+        if entries is None:
+            self._enumerate()
+        else:
+            for piece_name, variant_index, anchor_index, indices in entries:
+                self._add(piece_name, variant_index, anchor_index, indices)
+
+    def _enumerate(self) -> None:
+        """Add the placements of every variant with any ball on any position.
+
+        Each variant is translated so that each of its balls in turn lies on
+        every position of the model, which also finds the placements whose
+        variant origin is outside the model.
+        """
+        indices, lattice = self.model.get_lattice_table()
+        low = lattice.min(axis=0)
+        shape = lattice.max(axis=0) - low + 1
+
+        # Dense lookup from shifted lattice coordinates to position index
+        grid = np.full(tuple(shape), -1, dtype=np.int64)
+        grid[tuple((lattice - low).T)] = indices
+
+        for piece_name in self.piece_names:
+            variants = self.library.pieces[piece_name]
+            # Variants with identical positions cannot add new placements
+            unique = self.library.unique_variants.get(piece_name, range(len(variants)))
+            for variant_index in unique:
+                balls = to_lattice(variants[variant_index].positions)
+                for ball in balls:
+                    # Cells of the variant with the ball on every position: (n, k, 3)
+                    cells = (
+                        lattice[:, np.newaxis, :]
+                        + (balls - ball)[np.newaxis, :, :]
+                        - low
+                    )
+                    inside = np.all((cells >= 0) & (cells < shape), axis=(1, 2))
+                    covered = np.full(cells.shape[:2], -1, dtype=np.int64)
+                    inner = cells[inside]
+                    covered[inside] = grid[inner[..., 0], inner[..., 1], inner[..., 2]]
+                    valid = np.all(covered >= 0, axis=1)
+
+                    for row in covered[valid]:
+                        self._add(piece_name, variant_index, int(row[0]), row.tolist())
+
+    def _add(
+        self,
+        piece_name: str,
+        variant_index: int,
+        anchor_index: int,
+        cells: Iterable[int],
+    ) -> None:
+        """Add a placement unless the piece already covers the same cells."""
+        indices = frozenset(cells)
+        key = (piece_name, indices)
+        if key in self._lookup:
+            return
+        mask = 0
+        for idx in indices:
+            mask |= 1 << idx
+        self._lookup[key] = len(self.entries)
+        self.entries.append(
+            CatalogEntry(piece_name, variant_index, anchor_index, indices, mask)
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, placement_id: int) -> CatalogEntry:
+        return self.entries[placement_id]
+
+    def find(self, piece_name: str, indices: Iterable[int]) -> Optional[int]:
+        """Find the placement id of a piece covering exactly the given indices.
+
+        Args:
+            piece_name: Name of the placed piece.
+            indices: Position indices covered by the piece.
+
+        Returns:
+            The placement id, or None if no variant of the piece covers these cells.
+        """
+        return self._lookup.get((piece_name, frozenset(indices)))
+
+    def fingerprint(self) -> bytes:
+        """Get a SHA-256 digest identifying the model and the placement table.
+
+        Placement ids are only meaningful for catalogs with the same fingerprint.
+
+        Returns:
+            The 32 byte digest.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256(self.model_name.encode())
+            for entry in self.entries:
+                digest.update(
+                    f"{entry.piece_name}|{entry.variant_index}|{entry.anchor_index}|"
+                    f"{sorted(entry.indices)}\n".encode()
+                )
+            self._fingerprint = digest.digest()
+        return self._fingerprint
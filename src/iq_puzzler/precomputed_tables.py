@@ -0,0 +1,263 @@
+"""Precomputed piece variant and placement tables.
+
+Generating the rotated variants of a library and enumerating its placements
+is the dominant startup cost of every solver run. The tables for the standard
+library are shipped with the package and used whenever the requested library
+and model match the ones they were generated from.
+
+To regenerate the packaged tables after changing the standard library or one
+of the packaged models run::
+
+    python -m iq_puzzler.precomputed_tables path/to/piece_library.json
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .coordinates import LATTICE_STEP, to_lattice
+from .piece_library import PieceLibrary
+from .placement_catalog import PlacementCatalog
+from .puzzle_model import PuzzleModel
+from .puzzle_piece import PuzzlePiece
+
+TABLES_VERSION = 2
+DATA_DIR = Path(__file__).parent / "data"
+STANDARD_LIBRARY = DATA_DIR / "piece_library.json"
+PACKAGED_TABLES = {
+    "DiamondsModel": DATA_DIR / "diamonds_tables.npz",
+    "PyramidModel": DATA_DIR / "pyramid_tables.npz",
+    "RectangleModel": DATA_DIR / "rectangle_tables.npz",
+}
+
+PathLike = Union[str, Path]
+
+
+def tables_key(piece_data: List[dict], model: PuzzleModel) -> str:
+    """Get the key identifying the tables of a library in a model.
+
+    Args:
+        piece_data: Parsed library JSON data.
+        model: The puzzle model the pieces are placed in.
+
+    Returns:
+        Hex digest over the table format version, the model and the library.
+    """
+    content = json.dumps(
+        [TABLES_VERSION, type(model).__name__, piece_data], sort_keys=True
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def table_arrays(
+    library: PieceLibrary, catalog: PlacementCatalog
+) -> Dict[str, np.ndarray]:
+    """Get the numeric arrays of the variants of a library and its catalog.
+
+    Pieces are numbered in library order, see :func:`tables_from_arrays`.
+
+    Args:
+        library: Library with the generated variants.
+        catalog: Placement catalog of the library.
+
+    Returns:
+        The arrays by name.
+    """
+    names = list(library.pieces.keys())
+    num_variants = max(len(library.pieces[name]) for name in names)
+    num_balls = max(len(library.pieces[name][0].positions) for name in names)
+
+    # Variant lattice coordinates, padded to the largest piece
+    variants = np.zeros((len(names), num_variants, num_balls, 3), dtype=np.int16)
+    sizes = np.zeros((len(names), 2), dtype=np.int16)  # variants and balls per piece
+    for i, name in enumerate(names):
+        for v, variant in enumerate(library.pieces[name]):
+            variants[i, v, : len(variant.positions)] = to_lattice(variant.positions)
+        sizes[i] = (len(library.pieces[name]), len(library.pieces[name][0].positions))
+
+    entry_cells = np.full((len(catalog), num_balls), -1, dtype=np.int16)
+    for i, entry in enumerate(catalog.entries):
+        entry_cells[i, : len(entry.indices)] = sorted(entry.indices)
+
+    return {
+        "variants": variants,
+        "sizes": sizes,
+        "entry_pieces": np.array(
+            [names.index(entry.piece_name) for entry in catalog.entries],
+            dtype=np.int16,
+        ),
+        "entry_variants": np.array(
+            [entry.variant_index for entry in catalog.entries], dtype=np.int16
+        ),
+        "entry_anchors": np.array(
+            [entry.anchor_index for entry in catalog.entries], dtype=np.int16
+        ),
+        "entry_cells": entry_cells,
+    }
+
+
+def tables_from_arrays(
+    arrays: Mapping[str, np.ndarray],
+    names: List[str],
+    colors: List[str],
+    model: PuzzleModel,
+) -> Tuple[PieceLibrary, PlacementCatalog]:
+    """Rebuild a library and its catalog from the arrays of :func:`table_arrays`.
+
+    Args:
+        arrays: The arrays by name.
+        names: Piece names in library order.
+        colors: Piece colors in library order.
+        model: The puzzle model the pieces are placed in.
+
+    Returns:
+        The library and its placement catalog.
+    """
+    positions = arrays["variants"] * LATTICE_STEP
+    sizes = arrays["sizes"].tolist()
+    entries = zip(
+        arrays["entry_pieces"].tolist(),
+        arrays["entry_variants"].tolist(),
+        arrays["entry_anchors"].tolist(),
+        arrays["entry_cells"].tolist(),
+    )
+
+    library = PieceLibrary(None, model)
+    for i, (name, color) in enumerate(zip(names, colors)):
+        num_variants, num_balls = sizes[i]
+        library.pieces[name] = [
+            PuzzlePiece(name, color, positions[i, v, :num_balls])
+            for v in range(num_variants)
+        ]
+    catalog = PlacementCatalog(
+        library,
+        model,
+        (
+            (names[piece], variant, anchor, [c for c in cells if c >= 0])
+            for piece, variant, anchor, cells in entries
+        ),
+    )
+    return library, catalog
+
+
+def save_tables(
+    path: PathLike, key: str, library: PieceLibrary, catalog: PlacementCatalog
+) -> None:
+    """Save the variants of a library and its placement catalog.
+
+    Args:
+        path: Path of the ``.npz`` file to write.
+        key: Key of the library, see :func:`tables_key`.
+        library: Library with the generated variants.
+        catalog: Placement catalog of the library.
+    """
+    names = list(library.pieces.keys())
+    np.savez(
+        path,
+        key=np.array(key),
+        piece_names=np.array(names),
+        piece_colors=np.array([library.pieces[name][0].color for name in names]),
+        **table_arrays(library, catalog),
+    )
+
+
+def load_tables(
+    path: PathLike, key: str, model: PuzzleModel
+) -> Optional[Tuple[PieceLibrary, PlacementCatalog]]:
+    """Load tables saved with :func:`save_tables`.
+
+    Args:
+        path: Path of the ``.npz`` file.
+        key: Expected key of the library, see :func:`tables_key`.
+        model: The puzzle model the pieces are placed in.
+
+    Returns:
+        The library and its placement catalog, or None if the file does not
+        exist or was generated for another library or model.
+    """
+    if not Path(path).exists():
+        return None
+    with np.load(path) as data:
+        if str(data["key"]) != key:
+            return None
+        return tables_from_arrays(
+            data, data["piece_names"].tolist(), data["piece_colors"].tolist(), model
+        )
+
+
+def load_library(
+    library_path: PathLike, model: PuzzleModel
+) -> Tuple[PieceLibrary, PlacementCatalog]:
+    """Load a piece library and its placement catalog.
+
+    The packaged precomputed tables are used if they match the library and
+    model, otherwise the variants and placements are generated.
+
+    Args:
+        library_path: Path to the JSON file containing piece definitions.
+        model: The puzzle model the pieces are placed in.
+
+    Returns:
+        The library and its placement catalog.
+    """
+    with open(library_path, "r") as f:
+        piece_data = json.load(f)
+
+    tables_path = PACKAGED_TABLES.get(type(model).__name__)
+    if tables_path is not None:
+        tables = load_tables(tables_path, tables_key(piece_data, model), model)
+        if tables is not None:
+            return tables
+
+    library = PieceLibrary(None, model)
+    library.add_pieces_from_json(piece_data)
+    return library, PlacementCatalog(library, model)
+
+
+def load_packaged_tables(
+    model: PuzzleModel,
+) -> Optional[Tuple[PieceLibrary, PlacementCatalog]]:
+    """Load the packaged tables of the standard library in a model.
+
+    Args:
+        model: The puzzle model the pieces are placed in.
+
+    Returns:
+        The library and its placement catalog, or None if no packaged tables
+        match the model and the standard library.
+    """
+    tables_path = PACKAGED_TABLES.get(type(model).__name__)
+    if tables_path is None:
+        return None
+    with open(STANDARD_LIBRARY, "r") as f:
+        piece_data = json.load(f)
+    return load_tables(tables_path, tables_key(piece_data, model), model)
+
+
+def build_packaged_tables(library_path: PathLike = STANDARD_LIBRARY) -> None:
+    """Regenerate the packaged tables of every model from a library."""
+    from .diamonds_model import DiamondsModel
+    from .pyramid_model import PyramidModel
+    from .rectangle_model import RectangleModel
+
+    with open(library_path, "r") as f:
+        piece_data = json.load(f)
+    for model in [PyramidModel(), RectangleModel(), DiamondsModel()]:
+        library = PieceLibrary(None, model)
+        library.add_pieces_from_json(piece_data)
+        catalog = PlacementCatalog(library, model)
+        save_tables(
+            PACKAGED_TABLES[type(model).__name__],
+            tables_key(piece_data, model),
+            library,
+            catalog,
+        )
+
+
+if __name__ == "__main__":
+    build_packaged_tables(*sys.argv[1:2])
@@ -3,7 +3,10 @@
 from __future__ import annotations
 from typing import List, Set, Optional, Tuple
 from abc import ABC, abstractmethod
-from .coordinates import Location3D
+
+import numpy as np
+
+from .coordinates import Location3D, to_lattice
 
 
 class PuzzleModel(ABC):
@@ -74,3 +77,40 @@ class PuzzleModel(ABC):
             List of tuples (yaw, pitch, roll) in degrees.
         """
         pass
+
+    def get_lattice_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get all valid indices together with their integer lattice coordinates.
+
+        The table is computed on first use and cached on the model.
+
+        Returns:
+            Tuple of the sorted position indices (N,) and their lattice
+            coordinates (N, 3), see :func:`coordinates.to_lattice`.
+        """
+        table = getattr(self, "_lattice_table", None)
+        if table is None:
+            indices = np.array(sorted(self.get_all_indices()), dtype=np.int64)
+            lattice = to_lattice([self.index_to_coord(int(i)) for i in indices])
+            table = self._lattice_table = (indices, lattice)
+        return table
+
+    def get_lattice_rotations(self) -> np.ndarray:
+        """Get the valid rotations as exact integer lattice matrices.
+
+        The stack is computed on first use and cached on the model.
+
+        Returns:
+            (R, 3, 3) int64 array in the order of :meth:`get_valid_rotations`,
+            see :func:`coordinate_transformations.lattice_rotation_matrix`.
+        """
+        rotations = getattr(self, "_lattice_rotations", None)
+        if rotations is None:
+            from .coordinate_transformations import lattice_rotation_matrix
+
+            rotations = self._lattice_rotations = np.stack(
+                [
+                    lattice_rotation_matrix(*angles)
+                    for angles in self.get_valid_rotations()
+                ]
+            )
+        return rotations
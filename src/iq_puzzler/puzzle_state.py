@@ -1,11 +1,15 @@
 from dataclasses import dataclass
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 import json
 
+import numpy as np
+
 from iq_puzzler import coordinate_transformations
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog, anchored
 from iq_puzzler.puzzle_model import PuzzleModel
 from iq_puzzler.puzzle_piece import PuzzlePiece
-from iq_puzzler.coordinates import Location3D
+from iq_puzzler.coordinates import FLOAT_TOLERANCE, LATTICE_STEP
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +33,11 @@ class PuzzleState:
             str, PiecePlacement
         ] = {}  # Map piece name to its placement
         self._occupied_indices: Set[int] = set()  # Set of all occupied position indices
+        self._occupied_mask = 0  # Bitmask with bit i set for every occupied index i
+        # Placements made by id that are not materialized yet: name -> (catalog, id)
+        self._pending: Dict[str, Tuple[PlacementCatalog, int]] = {}
+        # Color of the piece that has to cover an empty position, by position index
+        self.color_hints: Dict[int, str] = {}
 
     def place_piece(
         self,
@@ -45,28 +54,41 @@ class PuzzleState:
             bool: True if the piece was placed successfully, False if the placement would
                 cause an overlap or the piece is already placed.
         """
-        # Check if piece is already placed
-        if piece.name in self._placements:
-            logger.debug(f"Piece {piece.name} is already placed")
-            return None
-
         # Move piece to the specified position
         origin = self._model.index_to_coord(position_index)
-        placed_piece = coordinate_transformations.translate(piece, origin)
+        return self._place_translated(
+            coordinate_transformations.translate(piece, origin)
+        )
+
+    def _place_translated(self, placed_piece: PuzzlePiece) -> Optional[PiecePlacement]:
+        """Place a piece that is already translated to its final positions.
+
+        Args:
+            placed_piece: The piece at its final positions.
+
+        Returns:
+            The placement, or None if the piece is already placed, leaves the
+            puzzle or overlaps placed pieces.
+        """
+        # Check if piece is already placed
+        name = placed_piece.name
+        if self.is_piece_placed(name):
+            logger.debug(f"Piece {name} is already placed")
+            return None
 
         # Check if piece positions are valid
         if not all(
             self._model.is_valid_coord(coord) for coord in placed_piece.positions
         ):
-            logger.debug(f"Piece {piece.name} does not have valid coordinates")
+            logger.debug(f"Piece {name} does not have valid coordinates")
             return None
         piece_indices = set(
             self._model.coord_to_index(coord) for coord in placed_piece.positions
         )
 
-        # Check for overlap with existing pieces
-        if self._occupied_indices.intersection(piece_indices):
-            logger.debug(f"Piece {piece.name} overlaps with existing pieces")
+        # Check for overlap with existing pieces, including pending id placements
+        if self._occupied_mask & _mask_of(piece_indices):
+            logger.debug(f"Piece {name} overlaps with existing pieces")
             return None
 
         # Add the placement
@@ -74,10 +96,60 @@ class PuzzleState:
             piece=placed_piece,
             occupied_indices=piece_indices,
         )
-        self._placements[piece.name] = placement
+        self._placements[name] = placement
         self._occupied_indices.update(piece_indices)
+        self._occupied_mask |= _mask_of(piece_indices)
         return placement
 
+    def can_place_id(self, placement_id: int, catalog: PlacementCatalog) -> bool:
+        """Check whether a catalog placement fits into the puzzle.
+
+        Args:
+            placement_id: Id of the placement in the catalog.
+            catalog: Placement catalog of the library in this state's model.
+
+        Returns:
+            bool: True if the placement's cells are free and its piece is not placed.
+        """
+        entry = catalog.entries[placement_id]
+        return not entry.mask & self._occupied_mask and not self.is_piece_placed(
+            entry.piece_name
+        )
+
+    def place_by_id(self, placement_id: int, catalog: PlacementCatalog) -> bool:
+        """Place a piece given by its catalog placement id.
+
+        Only the occupied bitmask is updated; the PiecePlacement is built when
+        the placements are first accessed.
+
+        Args:
+            placement_id: Id of the placement in the catalog.
+            catalog: Placement catalog of the library in this state's model.
+
+        Returns:
+            bool: True if the piece was placed, False if the placement would
+                cause an overlap or the piece is already placed.
+        """
+        entry = catalog.entries[placement_id]
+        if entry.mask & self._occupied_mask or self.is_piece_placed(entry.piece_name):
+            return False
+        self._pending[entry.piece_name] = (catalog, placement_id)
+        self._occupied_mask |= entry.mask
+        return True
+
+    def _materialize(self) -> None:
+        """Build the PiecePlacements of all placements made by id."""
+        for name, (catalog, placement_id) in self._pending.items():
+            entry = catalog.entries[placement_id]
+            variant = catalog.library.pieces[name][entry.variant_index]
+            anchor = self._model.index_to_coord(entry.anchor_index)
+            self._placements[name] = PiecePlacement(
+                piece=anchored(variant, anchor),
+                occupied_indices=set(entry.indices),
+            )
+            self._occupied_indices.update(entry.indices)
+        self._pending.clear()
+
     def remove_piece(self, name: str) -> bool:
         """Remove a piece from the puzzle.
 
@@ -87,11 +159,18 @@ class PuzzleState:
         Returns:
             bool: True if the piece was removed, False if it wasn't placed.
         """
+        pending = self._pending.pop(name, None)
+        if pending is not None:
+            catalog, placement_id = pending
+            self._occupied_mask &= ~catalog.entries[placement_id].mask
+            return True
+
         placement = self._placements.get(name)
         if placement is None:
             return False
 
         self._occupied_indices.difference_update(placement.occupied_indices)
+        self._occupied_mask &= ~_mask_of(placement.occupied_indices)
         del self._placements[name]
         return True
 
@@ -104,18 +183,25 @@ class PuzzleState:
         Returns:
             The PiecePlacement if the piece is placed, None otherwise.
         """
+        self._materialize()
         return self._placements.get(name)
 
     def get_occupied_indices(self) -> Set[int]:
         """Return the set of all occupied position indices."""
+        self._materialize()
         return self._occupied_indices.copy()
 
+    def get_occupied_mask(self) -> int:
+        """Return a bitmask with bit i set for every occupied position index i."""
+        return self._occupied_mask
+
     def get_placements(self) -> Dict[str, PiecePlacement]:
         """Get all current piece placements.
 
         Returns:
             Dict of all piece placements.
         """
+        self._materialize()
         return self._placements.copy()
 
     def is_piece_placed(self, name: str) -> bool:
@@ -127,13 +213,44 @@ class PuzzleState:
         Returns:
             bool: True if the piece is placed, False otherwise.
         """
-        return name in self._placements
+        return name in self._placements or name in self._pending
 
     def get_all_indices(self) -> Set[int]:
         """Return the set of all possible position indices."""
         return self._model.get_all_indices()
 
-    def export_to_json(self, filepath: str) -> None:
+    def to_grid(self) -> Dict[str, Dict]:
+        """Build the grid representation of the current puzzle state.
+
+        The grid contains all possible position indices, their 3D coordinates,
+        and information about pieces occupying those positions. Empty positions
+        with a color hint carry the hinted color.
+
+        Returns:
+            Dict mapping the string position index to its position data.
+        """
+        self._materialize()
+        # Inverse index from position to the placement covering it
+        owners: Dict[int, Tuple[str, PiecePlacement]] = {}
+        for name, placement in self._placements.items():
+            for idx in placement.occupied_indices:
+                owners[idx] = (name, placement)
+
+        grid_data = {}
+        for idx in sorted(self._model.get_all_indices()):
+            x, y, z = self._model.index_to_coord(idx)
+            owner = owners.get(idx)
+            grid_data[str(idx)] = {
+                "coordinate": {"x": float(x), "y": float(y), "z": float(z)},
+                "occupied": owner is not None,
+                "piece_name": owner[0] if owner else None,
+                "piece_color": (
+                    owner[1].piece.color if owner else self.color_hints.get(idx)
+                ),
+            }
+        return grid_data
+
+    def export_to_json(self, filepath: str, indent: Optional[int] = 2) -> None:
         """Export the current puzzle state to a JSON file.
 
         The export contains all possible position indices, their 3D coordinates,
@@ -141,85 +258,241 @@ class PuzzleState:
 
         Args:
             filepath: Path where to save the JSON file
+            indent: Indentation of the JSON output, None for the most compact output.
         """
-        grid_data = {}
+        separators = None if indent is not None else (",", ":")
+        with open(filepath, "w") as f:
+            json.dump(self.to_grid(), f, indent=indent, separators=separators)
 
-        # Export all possible positions
-        for idx in self._model.get_all_indices():
-            coord = self._model.index_to_coord(idx)
-            position_data = {
-                "coordinate": {
-                    "x": float(coord.x),
-                    "y": float(coord.y),
-                    "z": float(coord.z),
-                },
-                "occupied": False,
-                "piece_name": None,
-                "piece_color": None,
-            }
+    def to_compact(self, catalog: PlacementCatalog) -> Dict:
+        """Build the compact representation of the current puzzle state.
 
-            # Check if position is occupied
-            for name, placement in self._placements.items():
-                if idx in placement.occupied_indices:
-                    position_data["occupied"] = True
-                    position_data["piece_name"] = name
-                    position_data["piece_color"] = placement.piece.color
-                    break
+        The compact form only stores the placements as
+        ``[piece_name, variant_index, anchor_index]`` triples, the anchor being
+        the position of the first ball of the variant; the grid form can
+        be derived from it on demand with :meth:`from_compact`. Color hints are
+        not part of the compact form.
 
-            grid_data[str(idx)] = position_data
+        Args:
+            catalog: Placement catalog of the library the pieces come from.
+
+        Returns:
+            Dict with the model name and the list of placements.
+
+        Raises:
+            ValueError: If a placement does not match any variant in the library.
+        """
+        self._materialize()
+        placements = []
+        for name in sorted(self._placements):
+            placement_id = catalog.find(name, self._placements[name].occupied_indices)
+            if placement_id is None:
+                raise ValueError(f"Placement of {name} matches no library variant")
+            entry = catalog[placement_id]
+            placements.append([name, entry.variant_index, entry.anchor_index])
+        return {"model": type(self._model).__name__, "placements": placements}
+
+    def from_compact(self, data: Dict, library: PieceLibrary) -> None:
+        """Restore the puzzle state from its compact representation.
+
+        Args:
+            data: Compact representation as produced by :meth:`to_compact`.
+            library: Library containing the referenced pieces and variants.
+
+        Raises:
+            ValueError: If the data belongs to another model or a placement is invalid.
+        """
+        model_name = type(self._model).__name__
+        if data.get("model", model_name) != model_name:
+            raise ValueError(
+                f"Compact state is for model {data['model']}, not {model_name}"
+            )
 
-        # Write to file
+        self._placements.clear()
+        self._occupied_indices.clear()
+        self._occupied_mask = 0
+        self._pending.clear()
+        self.color_hints = {}
+        for name, variant_index, anchor_index in data["placements"]:
+            variants = library.pieces.get(name)
+            if variants is None or not 0 <= variant_index < len(variants):
+                raise ValueError(f"Unknown variant {variant_index} of piece {name}")
+            anchor = self._model.index_to_coord(anchor_index)
+            if anchor is None or not self._place_translated(
+                anchored(variants[variant_index], anchor)
+            ):
+                raise ValueError(
+                    f"Cannot place {name} variant {variant_index} at index {anchor_index}"
+                )
+
+    def export_compact(self, filepath: str, catalog: PlacementCatalog) -> None:
+        """Export the current puzzle state to a compact JSON file.
+
+        Args:
+            filepath: Path where to save the JSON file.
+            catalog: Placement catalog of the library the pieces come from.
+        """
         with open(filepath, "w") as f:
-            json.dump(grid_data, f, indent=2)
+            json.dump(self.to_compact(catalog), f, separators=(",", ":"))
+
+    def load_compact(self, filepath: str, library: PieceLibrary) -> None:
+        """Load the puzzle state from a compact JSON file.
 
-    def load_from_json(self, filepath: str) -> None:
+        Args:
+            filepath: Path to the compact JSON file.
+            library: Library containing the referenced pieces and variants.
+        """
+        with open(filepath, "r") as f:
+            self.from_compact(json.load(f), library)
+
+    def load_from_json(
+        self, filepath: str, catalog: Optional[PlacementCatalog] = None
+    ) -> None:
         """Load the puzzle state from a JSON file.
 
         Args:
             filepath: Path to the JSON file containing the puzzle state.
+            catalog: Optional placement catalog used to check that every
+                pre-placed piece is a valid variant of its library piece.
+
+        Raises:
+            ValueError: If the file content is not a valid puzzle state.
         """
         with open(filepath, "r") as f:
-            data = json.load(f)
+            self.from_grid(json.load(f), catalog)
 
-        self._placements.clear()
-        self._occupied_indices.clear()
-        initial_constraints: Dict[str, Dict] = {}
-
-        # Load placements
-        for idx, position_data in data.items():
-            idx = int(idx)
-            assert idx in self._model.get_all_indices()
-            assert self._model.is_valid_coord(
-                Location3D(
-                    position_data["coordinate"]["x"],
-                    position_data["coordinate"]["y"],
-                    position_data["coordinate"]["z"],
+    def from_grid(self, data: Dict, catalog: Optional[PlacementCatalog] = None) -> None:
+        """Restore the puzzle state from its grid representation.
+
+        All entries are read in a single pass; their indices and coordinates are
+        then validated against the model in bulk. An empty position with a
+        piece color is a color hint: the position has to be covered by the
+        piece of that color, see :attr:`color_hints`.
+
+        Args:
+            data: Grid representation as produced by :meth:`to_grid`.
+            catalog: Optional placement catalog used to check that every
+                pre-placed piece is a valid variant of its library piece.
+
+        Raises:
+            ValueError: If the data is not a valid puzzle state.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Puzzle state must be an object keyed by position index")
+
+        indices = np.empty(len(data), dtype=np.int64)
+        coords = np.empty((len(data), 3), dtype=np.float64)
+        piece_rows: Dict[str, List[int]] = {}
+        piece_colors: Dict[str, Optional[str]] = {}
+        color_hints: Dict[int, str] = {}
+
+        for row, (key, position_data) in enumerate(data.items()):
+            try:
+                indices[row] = int(key)
+                coordinate = position_data["coordinate"]
+                coords[row] = (coordinate["x"], coordinate["y"], coordinate["z"])
+                occupied = position_data["occupied"]
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Position {key!r}: malformed entry ({e!r})") from None
+
+            if not occupied:
+                color = position_data.get("piece_color")
+                if color is not None:
+                    if not isinstance(color, str):
+                        raise ValueError(f"Position {key}: malformed color hint")
+                    color_hints[int(indices[row])] = color
+                continue
+            name = position_data.get("piece_name")
+            if not isinstance(name, str):
+                raise ValueError(f"Position {key}: occupied but has no piece name")
+            color = position_data.get("piece_color")
+            if piece_colors.setdefault(name, color) != color:
+                raise ValueError(
+                    f"Position {key}: piece {name} has color {color}, "
+                    f"expected {piece_colors[name]}"
                 )
+            piece_rows.setdefault(name, []).append(row)
+
+        # Validate indices and coordinates against the model in bulk
+        model_indices, model_lattice = self._model.get_lattice_table()
+        model_rows = np.searchsorted(model_indices, indices)
+        model_rows = np.minimum(model_rows, len(model_indices) - 1)
+        unknown = model_indices[model_rows] != indices
+        if np.any(unknown):
+            raise ValueError(f"Invalid position indices: {indices[unknown].tolist()}")
+        unique, counts = np.unique(indices, return_counts=True)
+        if np.any(counts > 1):
+            raise ValueError(
+                f"Duplicate position indices: {unique[counts > 1].tolist()}"
+            )
+        expected = model_lattice[model_rows] * LATTICE_STEP
+        mismatch = np.any(np.abs(coords - expected) >= FLOAT_TOLERANCE, axis=1)
+        if np.any(mismatch):
+            row = int(np.argmax(mismatch))
+            raise ValueError(
+                f"Position {indices[row]}: coordinate {tuple(coords[row])} does not "
+                f"match the model coordinate {tuple(expected[row])}"
             )
-            if position_data["occupied"]:
-                piece_name = position_data["piece_name"]
-                if piece_name not in initial_constraints:
-                    initial_constraints[piece_name] = {
-                        "color": position_data["piece_color"],
-                        "indices": set(),
-                        "positions": [],
-                    }
-                initial_constraints[piece_name]["indices"].add(idx)
-                initial_constraints[piece_name]["positions"].append(
-                    Location3D(
-                        position_data["coordinate"]["x"],
-                        position_data["coordinate"]["y"],
-                        position_data["coordinate"]["z"],
+
+        if catalog is not None:
+            library_colors = {
+                catalog.library.pieces[name][0].color for name in catalog.piece_names
+            }
+            for idx, color in color_hints.items():
+                if color not in library_colors:
+                    raise ValueError(
+                        f"Position {idx}: no piece of the library has color {color}"
                     )
-                )
 
-            for name, constraint in initial_constraints.items():
-                self._placements[name] = PiecePlacement(
-                    piece=PuzzlePiece(
-                        name=name,
-                        color=constraint["color"],
-                        shape=constraint["positions"],
-                    ),
-                    occupied_indices=constraint["indices"],
-                )
-                self._occupied_indices.update(constraint["indices"])
+        placements: Dict[str, PiecePlacement] = {}
+        for name, rows in piece_rows.items():
+            piece_indices = set(indices[rows].tolist())
+            if catalog is not None:
+                if name not in catalog.piece_names:
+                    raise ValueError(f"Piece {name} is not in the piece library")
+                if catalog.find(name, piece_indices) is None:
+                    raise ValueError(
+                        f"Piece {name} at positions {sorted(piece_indices)} does not "
+                        "match any variant of the library piece"
+                    )
+            placements[name] = PiecePlacement(
+                piece=PuzzlePiece(name, piece_colors[name], coords[rows]),
+                occupied_indices=piece_indices,
+            )
+
+        self._placements = placements
+        self._occupied_indices = set()
+        for placement in placements.values():
+            self._occupied_indices.update(placement.occupied_indices)
+        self._occupied_mask = _mask_of(self._occupied_indices)
+        self._pending.clear()
+        self.color_hints = color_hints
+
+    def color_hint_masks(self, library: PieceLibrary) -> Dict[str, int]:
+        """Get the hinted positions every piece must not cover.
+
+        A placement of a piece is compatible with the color hints if its
+        position mask does not intersect the mask of the piece.
+
+        Args:
+            library: Library containing the pieces.
+
+        Returns:
+            Bitmask of the positions hinted with another color, by piece name.
+        """
+        masks = {}
+        for name, variants in library.pieces.items():
+            mask = 0
+            for idx, color in self.color_hints.items():
+                if color != variants[0].color:
+                    mask |= 1 << idx
+            masks[name] = mask
+        return masks
+
+
+def _mask_of(indices: Set[int]) -> int:
+    """Get the bitmask with bit i set for every index i."""
+    mask = 0
+    for idx in indices:
+        mask |= 1 << idx
+    return mask
@@ -1,38 +1,85 @@
 """Rectangle model implementation."""
 
-from typing import List, Optional, Tuple
+from typing import Optional
 
-from .coordinates import Location3D
-from .puzzle_model import PuzzleModel
+import numpy as np
 
+from .coordinates import Location3D, XY_DIST
+from .lattice_model import LatticeModel
 
-class RectangleModel(PuzzleModel):
-    """Model for the rectangular game board configuration."""
+ROWS = 5
+COLS = 11
+
+# Integer lattice forms of the eight flat rotations, in the order of
+# ROTATION_SETS["flat"]. They equal lattice_rotation_matrix(*rotation), which
+# tests assert, but need no float rotation math.
+FLAT_LATTICE_ROTATIONS = np.array(
+    [
+        [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+        [[0, -1, -1], [1, 0, 0], [0, 0, 1]],
+        [[-1, 0, -1], [0, -1, -1], [0, 0, 1]],
+        [[0, 1, 0], [-1, 0, -1], [0, 0, 1]],
+        [[1, 0, 1], [0, -1, 0], [0, 0, -1]],
+        [[0, 1, 1], [1, 0, 1], [0, 0, -1]],
+        [[-1, 0, 0], [0, 1, 1], [0, 0, -1]],
+        [[0, -1, 0], [-1, 0, 0], [0, 0, -1]],
+    ],
+    dtype=np.int64,
+)
+FLAT_LATTICE_ROTATIONS.setflags(write=False)
+
+
+class RectangleModel(LatticeModel):
+    """Model for the flat 5x11 game board configuration.
+
+    Position ``row * 11 + col`` lies at (col * XY_DIST, row * XY_DIST, 0).
+    Pieces lie flat on the board, so only the eight flat rotations are valid.
+    Coordinates are converted by integer arithmetic and the rotations are
+    given as exact integer lattice matrices.
+    """
+
+    def __init__(self):
+        """Initialize the board with its 55 positions."""
+        super().__init__(
+            [
+                (col * XY_DIST, row * XY_DIST, 0.0)
+                for row in range(ROWS)
+                for col in range(COLS)
+            ],
+            "flat",
+            "rectangle",
+        )
+        self._layers = [(ROWS, COLS)]
+        self._lattice_rotations = FLAT_LATTICE_ROTATIONS
 
     def coord_to_index(self, coord: Location3D) -> Optional[int]:
-        """Convert coordinates to index."""
-        raise NotImplementedError("Rectangle mode not implemented yet")
+        """Convert 3D coordinates to a position index.
 
-    def index_to_coord(self, index: int) -> Optional[Location3D]:
-        """Convert index to coordinates."""
-        raise NotImplementedError("Rectangle mode not implemented yet")
+        Args:
+            coord: (x, y, z) coordinates.
 
-    def is_valid_index(self, index: int) -> bool:
-        """Check if index is valid."""
-        raise NotImplementedError("Rectangle mode not implemented yet")
+        Returns:
+            Position index if the coordinates are valid, None otherwise.
+        """
+        x, y, z = coord
+        col = round(x / XY_DIST)
+        row = round(y / XY_DIST)
+        if (
+            not (0 <= col < COLS and 0 <= row < ROWS)
+            or abs(x - col * XY_DIST) > 1e-6
+            or abs(y - row * XY_DIST) > 1e-6
+            or abs(z) > 1e-6
+        ):
+            return None
+        return row * COLS + col
 
     def is_valid_coord(self, coord: Location3D) -> bool:
-        """Check if coordinates are valid."""
-        raise NotImplementedError("Rectangle mode not implemented yet")
-
-    def get_all_indices(self) -> List[int]:
-        """Get all valid indices."""
-        raise NotImplementedError("Rectangle mode not implemented yet")
+        """Check if 3D coordinates are on the board.
 
-    def get_valid_rotations(self) -> List[Tuple[float, float, float]]:
-        """Get all valid rotation angle combinations.
+        Args:
+            coord: (x, y, z) coordinates to validate.
 
         Returns:
-            List of tuples (yaw, pitch, roll) in degrees.
+            True if the coordinates are valid, False otherwise.
         """
-        raise NotImplementedError("Rectangle mode not implemented yet")
+        return self.coord_to_index(coord) is not None
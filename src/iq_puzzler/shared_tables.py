@@ -0,0 +1,185 @@
+"""Placement tables in shared memory for pools of worker processes.
+
+Boards and libraries without packaged tables, e.g. custom shapes, would have
+every worker process generate the variants and placements on its own. With
+:class:`SharedTables`, the parent copies the numeric tables of
+:func:`~iq_puzzler.precomputed_tables.table_arrays` once into a
+:mod:`multiprocessing.shared_memory` block. Workers attach to the block by name
+and read the arrays in place instead of enumerating placements. The catalog
+objects the solvers work on are still built per worker, so for the packaged
+boards, loading the packaged tables is as fast and needs no shared block.
+
+Before Python 3.13, the resource tracker of a process attaching to a block may
+remove the block when that process exits. Attach only from processes started
+through :mod:`multiprocessing` by the owner on those versions.
+"""
+
+from __future__ import annotations
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from .piece_library import PieceLibrary
+from .placement_catalog import PlacementCatalog
+from .precomputed_tables import table_arrays, tables_from_arrays
+from .puzzle_model import PuzzleModel
+
+ALIGNMENT = 64  # Byte alignment of every array in the block
+
+
+class SharedTablesHandle(NamedTuple):
+    """Picklable description of a shared memory block holding tables."""
+
+    name: str  # Name of the shared memory block
+    model_name: str
+    fingerprint: bytes  # Fingerprint of the catalog the tables were taken from
+    piece_names: Tuple[str, ...]  # Pieces in library order
+    piece_colors: Tuple[str, ...]
+    # Name, dtype, shape and byte offset of every array
+    layout: Tuple[Tuple[str, str, Tuple[int, ...], int], ...]
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without handing it to the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+class SharedTables:
+    """Read-only variant and placement arrays in a shared memory block.
+
+    The process creating the tables owns the block and removes it on
+    :meth:`close`. Use the tables as a context manager::
+
+        with SharedTables.create(library, catalog) as shared:
+            start_workers(shared.handle)
+            ...
+
+        # In a worker
+        shared = SharedTables.attach(handle)
+        library, catalog = shared.load(model)
+        shared.close()
+    """
+
+    def __init__(
+        self,
+        handle: SharedTablesHandle,
+        memory: shared_memory.SharedMemory,
+        owner: bool,
+    ):
+        """Map the arrays of a block.
+
+        Args:
+            handle: Description of the block.
+            memory: The attached block.
+            owner: Whether closing the tables removes the block.
+        """
+        self.handle = handle
+        self.owner = owner
+        self._memory = memory
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, dtype, shape, offset in handle.layout:
+            array = np.ndarray(shape, dtype, buffer=memory.buf, offset=offset)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+    @classmethod
+    def create(cls, library: PieceLibrary, catalog: PlacementCatalog) -> SharedTables:
+        """Copy the tables of a library and its catalog into a new block.
+
+        Args:
+            library: Library with the generated variants.
+            catalog: Placement catalog of the library.
+
+        Returns:
+            The tables, owning the block.
+        """
+        arrays = table_arrays(library, catalog)
+        layout = []
+        size = 0
+        for name, array in arrays.items():
+            offset = -(-size // ALIGNMENT) * ALIGNMENT
+            layout.append((name, array.dtype.str, array.shape, offset))
+            size = offset + array.nbytes
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (_, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype, buffer=memory.buf, offset=offset)[...] = array
+
+        names = list(library.pieces.keys())
+        handle = SharedTablesHandle(
+            memory.name,
+            catalog.model_name,
+            catalog.fingerprint(),
+            tuple(names),
+            tuple(library.pieces[name][0].color for name in names),
+            tuple(layout),
+        )
+        return cls(handle, memory, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedTablesHandle) -> SharedTables:
+        """Attach to the block of tables created by another process.
+
+        Args:
+            handle: Handle of the tables, see :attr:`handle`.
+
+        Returns:
+            The tables, not owning the block.
+
+        Raises:
+            FileNotFoundError: If the block does not exist anymore.
+        """
+        return cls(handle, _open_block(handle.name), owner=False)
+
+    def load(self, model: PuzzleModel) -> Tuple[PieceLibrary, PlacementCatalog]:
+        """Build the library and catalog of the tables.
+
+        Placement ids of the catalog are those of the catalog the tables were
+        created from.
+
+        Args:
+            model: The puzzle model the tables were created for.
+
+        Returns:
+            The library and its placement catalog.
+
+        Raises:
+            ValueError: If the tables were created for another model.
+        """
+        if type(model).__name__ != self.handle.model_name:
+            raise ValueError(
+                f"Tables of {self.handle.model_name} cannot be used in "
+                f"{type(model).__name__}"
+            )
+        library, catalog = tables_from_arrays(
+            self.arrays,
+            list(self.handle.piece_names),
+            list(self.handle.piece_colors),
+            model,
+        )
+        if catalog.fingerprint() != self.handle.fingerprint:
+            raise ValueError("Shared tables do not match the model")
+        return library, catalog
+
+    def close(self) -> None:
+        """Detach from the block, removing it if this process owns it.
+
+        Arrays taken from :attr:`arrays` must not be used afterwards.
+        """
+        # The block cannot be closed while arrays still reference its buffer
+        self.arrays = {}
+        try:
+            self._memory.close()
+        finally:
+            if self.owner:
+                self.owner = False
+                self._memory.unlink()
+
+    def __enter__(self) -> SharedTables:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,180 @@
+"""Precomputed index over a set of solutions for instant lookups."""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .placement_catalog import PlacementCatalog
+from .puzzle_state import PuzzleState
+from .solution_store import EMPTY_SLOT, SolutionStore
+
+NO_PIECE = 0xFF  # Value in cell_pieces for cells not covered by any piece
+
+
+class SolutionIndex:
+    """Columnar index over solutions, filtered with vectorized bitmask tests.
+
+    For every solution the index stores three columns:
+
+    - ``placement_ids``: (N, pieces) uint16 catalog placement id per piece.
+    - ``piece_cells``: (N, pieces) uint64 mask of the cells covered by each piece.
+    - ``cell_pieces``: (N, cells) uint8 piece number covering each cell.
+
+    Pieces are numbered in the catalog's piece order. Lookups match the
+    placements of a state against ``piece_cells`` and its color hints against
+    ``cell_pieces``.
+    """
+
+    def __init__(
+        self,
+        catalog: PlacementCatalog,
+        placement_ids: np.ndarray,
+        complete: bool = False,
+    ):
+        """Build the index columns from placement ids.
+
+        Args:
+            catalog: Placement catalog the placement ids refer to.
+            placement_ids: (N, pieces) array of placement ids per solution.
+            complete: Whether the index holds every solution of the model, so that
+                a failed lookup proves a board unsolvable.
+
+        Raises:
+            ValueError: If the model has more positions than fit into a uint64 mask.
+        """
+        num_cells = int(catalog.model.get_lattice_table()[0].max()) + 1
+        if num_cells > 64:
+            raise ValueError(f"Cannot index a model with {num_cells} positions")
+
+        self.catalog = catalog
+        self.complete = complete
+        self.placement_ids = np.asarray(placement_ids, dtype=np.uint16)
+
+        entry_masks = np.array(
+            [entry.mask for entry in catalog.entries] + [0], dtype=np.uint64
+        )
+        # Empty slots map to the trailing zero mask
+        ids = np.where(
+            self.placement_ids == EMPTY_SLOT, len(catalog), self.placement_ids
+        )
+        self.piece_cells = entry_masks[ids]
+
+        self.cell_pieces = np.full(
+            (len(self.placement_ids), num_cells), NO_PIECE, dtype=np.uint8
+        )
+        for piece in range(self.piece_cells.shape[1]):
+            for cell in range(num_cells):
+                covered = (self.piece_cells[:, piece] >> np.uint64(cell)) & np.uint64(1)
+                self.cell_pieces[covered.astype(bool), cell] = piece
+
+    def __len__(self) -> int:
+        return len(self.placement_ids)
+
+    @classmethod
+    def from_store(
+        cls, store: SolutionStore, catalog: PlacementCatalog, complete: bool = False
+    ) -> SolutionIndex:
+        """Build an index over all solutions of a solution store.
+
+        Raises:
+            ValueError: If the store was written with another catalog.
+        """
+        store.header.check(catalog)
+        return cls(catalog, np.asarray(store.records), complete)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save the index to an ``.npz`` file."""
+        np.savez(
+            path,
+            placement_ids=self.placement_ids,
+            piece_cells=self.piece_cells,
+            cell_pieces=self.cell_pieces,
+            fingerprint=np.frombuffer(self.catalog.fingerprint(), dtype=np.uint8),
+            complete=self.complete,
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], catalog: PlacementCatalog) -> SolutionIndex:
+        """Load an index saved with :meth:`save`.
+
+        Raises:
+            ValueError: If the index was built with another catalog.
+        """
+        with np.load(path) as data:
+            if data["fingerprint"].tobytes() != catalog.fingerprint():
+                raise ValueError("Index was built for a different model or library")
+            index = cls.__new__(cls)
+            index.catalog = catalog
+            index.complete = bool(data["complete"])
+            index.placement_ids = data["placement_ids"]
+            index.piece_cells = data["piece_cells"]
+            index.cell_pieces = data["cell_pieces"]
+        return index
+
+    def lookup(self, state: PuzzleState) -> np.ndarray:
+        """Find all indexed solutions consistent with a state.
+
+        A solution is consistent if it keeps the placements of the state and
+        covers every position with a color hint by a piece of that color.
+
+        Args:
+            state: Partially filled puzzle state.
+
+        Returns:
+            Row numbers of the matching solutions.
+        """
+        columns = []
+        masks = []
+        for name, placement in state.get_placements().items():
+            if name not in self.catalog.piece_names:
+                return np.empty(0, dtype=np.int64)
+            mask = 0
+            for idx in placement.occupied_indices:
+                mask |= 1 << idx
+            columns.append(self.catalog.piece_names.index(name))
+            masks.append(mask)
+
+        matches = np.all(
+            self.piece_cells[:, columns] == np.array(masks, dtype=np.uint64), axis=1
+        )
+        if state.color_hints:
+            colors = [
+                self.catalog.library.pieces[name][0].color
+                for name in self.catalog.piece_names
+            ]
+            for idx, color in state.color_hints.items():
+                pieces = [piece for piece, c in enumerate(colors) if c == color]
+                matches &= np.isin(self.cell_pieces[:, idx], pieces)
+        return np.flatnonzero(matches)
+
+    def apply(self, state: PuzzleState, row: int) -> None:
+        """Place the pieces of an indexed solution that are missing in a state.
+
+        Args:
+            state: Puzzle state consistent with the solution.
+            row: Row number of the solution in the index.
+        """
+        for placement_id in self.placement_ids[row]:
+            if placement_id == EMPTY_SLOT:
+                continue
+            entry = self.catalog[int(placement_id)]
+            if not state.is_piece_placed(entry.piece_name):
+                state.place_by_id(int(placement_id), self.catalog)
+
+    def solve(self, state: PuzzleState) -> Optional[bool]:
+        """Complete a state with the first matching indexed solution.
+
+        Args:
+            state: Partially filled puzzle state, updated in place on success.
+
+        Returns:
+            True if the state was completed, False if the index is complete and
+            holds no matching solution, None if the index cannot decide.
+        """
+        rows = self.lookup(state)
+        if len(rows):
+            self.apply(state, int(rows[0]))
+            return True
+        return False if self.complete else None
@@ -0,0 +1,310 @@
+"""Binary, memory-mapped storage for large numbers of solutions.
+
+A store file consists of a fixed size header followed by one fixed width record
+per solution. A record holds one uint16 placement id (see
+:class:`PlacementCatalog`) per library piece, in the catalog's piece order.
+Pieces that are not placed are stored as ``EMPTY_SLOT``.
+"""
+
+from __future__ import annotations
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .placement_catalog import PlacementCatalog
+from .puzzle_state import PuzzleState
+
+MAGIC = b"IQPZSOL1"
+VERSION = 1
+# magic, version, record width, model name, catalog fingerprint, padding
+HEADER = struct.Struct("<8sHH32s32s52x")
+RECORD_DTYPE = np.dtype("<u2")
+EMPTY_SLOT = 0xFFFF
+
+PathLike = Union[str, Path]
+
+
+class StoreHeader:
+    """Header of a solution store file."""
+
+    def __init__(self, record_width: int, model_name: str, fingerprint: bytes):
+        """Initialize the header.
+
+        Args:
+            record_width: Number of placement ids per record.
+            model_name: Name of the puzzle model the solutions belong to.
+            fingerprint: Fingerprint of the placement catalog the ids refer to.
+        """
+        self.record_width = record_width
+        self.model_name = model_name
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def for_catalog(cls, catalog: PlacementCatalog) -> StoreHeader:
+        """Create the header for solutions expressed in a catalog's placement ids."""
+        if len(catalog) >= EMPTY_SLOT:
+            raise ValueError(
+                f"Catalog has {len(catalog)} placements, at most {EMPTY_SLOT - 1} "
+                "fit in a solution store"
+            )
+        return cls(len(catalog.piece_names), catalog.model_name, catalog.fingerprint())
+
+    def pack(self) -> bytes:
+        """Serialize the header."""
+        return HEADER.pack(
+            MAGIC,
+            VERSION,
+            self.record_width,
+            self.model_name.encode("ascii"),
+            self.fingerprint,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> StoreHeader:
+        """Deserialize a header.
+
+        Raises:
+            ValueError: If the data is not a supported solution store header.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("File is too short to be a solution store")
+        magic, version, record_width, model_name, fingerprint = HEADER.unpack(
+            data[: HEADER.size]
+        )
+        if magic != MAGIC:
+            raise ValueError("File is not a solution store")
+        if version != VERSION:
+            raise ValueError(f"Unsupported solution store version {version}")
+        return cls(record_width, model_name.rstrip(b"\0").decode("ascii"), fingerprint)
+
+    def check(self, catalog: PlacementCatalog) -> None:
+        """Check that the store's placement ids refer to the given catalog.
+
+        Raises:
+            ValueError: If the store was written for another model or library.
+        """
+        if self.model_name != catalog.model_name:
+            raise ValueError(
+                f"Store holds {self.model_name} solutions, not {catalog.model_name}"
+            )
+        if self.fingerprint != catalog.fingerprint() or self.record_width != len(
+            catalog.piece_names
+        ):
+            raise ValueError("Store was written for a different piece library")
+
+
+class SolutionStoreWriter:
+    """Append-only writer for solution store files."""
+
+    def __init__(self, path: PathLike, catalog: PlacementCatalog):
+        """Open a store for appending, creating it if it does not exist.
+
+        Args:
+            path: Path of the store file.
+            catalog: Placement catalog the written placement ids refer to.
+
+        Raises:
+            ValueError: If an existing store belongs to another catalog.
+        """
+        self.catalog = catalog
+        self.header = StoreHeader.for_catalog(catalog)
+        self._slots = {name: i for i, name in enumerate(catalog.piece_names)}
+        self.count = 0  # Records appended through this writer
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                StoreHeader.unpack(f.read(HEADER.size)).check(catalog)
+            self._file = open(path, "r+b")
+            # Drop a trailing partial record left by an interrupted writer
+            record_size = self.header.record_width * RECORD_DTYPE.itemsize
+            records = (os.path.getsize(path) - HEADER.size) // record_size
+            self._file.truncate(HEADER.size + records * record_size)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(self.header.pack())
+
+    def append(self, placement_ids: Iterable[int]) -> None:
+        """Append one solution.
+
+        Args:
+            placement_ids: Catalog placement ids of the placed pieces, in any order.
+        """
+        record = np.full(self.header.record_width, EMPTY_SLOT, dtype=RECORD_DTYPE)
+        for placement_id in placement_ids:
+            record[self._slots[self.catalog[placement_id].piece_name]] = placement_id
+        self._file.write(record.tobytes())
+        self.count += 1
+
+    def append_state(self, state: PuzzleState) -> None:
+        """Append the placements of a puzzle state.
+
+        Raises:
+            ValueError: If a placement does not match any catalog entry.
+        """
+        self.append(placement_ids_of(state, self.catalog))
+
+    def close(self) -> None:
+        """Flush and close the store file."""
+        self._file.close()
+
+    def __enter__(self) -> SolutionStoreWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SolutionStore:
+    """Read-only, memory-mapped view of a solution store file."""
+
+    def __init__(self, path: PathLike):
+        """Map a store file into memory.
+
+        Args:
+            path: Path of the store file.
+
+        Raises:
+            ValueError: If the file is not a valid solution store.
+        """
+        with open(path, "rb") as f:
+            self.header = StoreHeader.unpack(f.read(HEADER.size))
+
+        record_size = self.header.record_width * RECORD_DTYPE.itemsize
+        count = (os.path.getsize(path) - HEADER.size) // record_size
+        if count:
+            self.records = np.memmap(
+                path,
+                dtype=RECORD_DTYPE,
+                mode="r",
+                offset=HEADER.size,
+                shape=(count, self.header.record_width),
+            )
+        else:
+            self.records = np.empty((0, self.header.record_width), dtype=RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def to_compact(self, index: int, catalog: PlacementCatalog) -> dict:
+        """Get a record in the compact JSON representation.
+
+        Args:
+            index: Record number.
+            catalog: Placement catalog the store was written with.
+        """
+        placements = []
+        for placement_id in self.records[index]:
+            if placement_id != EMPTY_SLOT:
+                entry = catalog[int(placement_id)]
+                placements.append(
+                    [entry.piece_name, entry.variant_index, entry.anchor_index]
+                )
+        return {"model": catalog.model_name, "placements": placements}
+
+    def get_state(self, index: int, catalog: PlacementCatalog) -> PuzzleState:
+        """Materialize a record as a puzzle state.
+
+        Args:
+            index: Record number.
+            catalog: Placement catalog the store was written with.
+        """
+        state = PuzzleState(catalog.model)
+        state.from_compact(self.to_compact(index, catalog), catalog.library)
+        return state
+
+
+def placement_ids_of(state: PuzzleState, catalog: PlacementCatalog) -> List[int]:
+    """Get the catalog placement ids of all pieces placed in a state.
+
+    Raises:
+        ValueError: If a placement does not match any catalog entry.
+    """
+    placement_ids = []
+    for name, placement in state.get_placements().items():
+        placement_id = catalog.find(name, placement.occupied_indices)
+        if placement_id is None:
+            raise ValueError(f"Placement of {name} matches no library variant")
+        placement_ids.append(placement_id)
+    return placement_ids
+
+
+def convert_json_to_store(
+    json_paths: Sequence[PathLike], store_path: PathLike, catalog: PlacementCatalog
+) -> int:
+    """Append solutions from JSON files to a solution store.
+
+    Files ending in ``.jsonl`` hold one compact solution per line, all other
+    files hold a single solution in the grid format.
+
+    Args:
+        json_paths: Paths of the JSON files to convert.
+        store_path: Path of the store to append to.
+        catalog: Placement catalog of the solutions' library.
+
+    Returns:
+        The number of solutions written.
+    """
+    state = PuzzleState(catalog.model)
+    with SolutionStoreWriter(store_path, catalog) as writer:
+        for path in json_paths:
+            with open(path, "r") as f:
+                if Path(path).suffix == ".jsonl":
+                    for line in f:
+                        if line.strip():
+                            state.from_compact(json.loads(line), catalog.library)
+                            writer.append_state(state)
+                else:
+                    state.from_grid(json.load(f), catalog)
+                    writer.append_state(state)
+        return writer.count
+
+
+def convert_store_to_jsonl(
+    store_path: PathLike, output_path: PathLike, catalog: PlacementCatalog
+) -> int:
+    """Write all solutions of a store as compact JSON lines.
+
+    Returns:
+        The number of solutions written.
+    """
+    store = SolutionStore(store_path)
+    store.header.check(catalog)
+    with open(output_path, "w") as f:
+        for index in range(len(store)):
+            f.write(json.dumps(store.to_compact(index, catalog), separators=(",", ":")))
+            f.write("\n")
+    return len(store)
+
+
+def convert_store_to_json(
+    store_path: PathLike,
+    output_dir: PathLike,
+    catalog: PlacementCatalog,
+    limit: Optional[int] = None,
+) -> List[Path]:
+    """Write solutions of a store as grid JSON files, one file per solution.
+
+    Args:
+        store_path: Path of the store to read.
+        output_dir: Directory the ``solution-<n>.json`` files are written to.
+        catalog: Placement catalog the store was written with.
+        limit: Maximum number of solutions to write, None for all.
+
+    Returns:
+        The paths of the written files.
+    """
+    store = SolutionStore(store_path)
+    store.header.check(catalog)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(len(store) if limit is None else min(limit, len(store))):
+        path = output_dir / f"solution-{index}.json"
+        store.get_state(index, catalog).export_to_json(str(path))
+        paths.append(path)
+    return paths
@@ -0,0 +1,276 @@
+"""Vectorized verification of large batches of solutions.
+
+Solutions are verified as records of placement ids, one column per library
+piece in the catalog's piece order, like the records of a
+:class:`~iq_puzzler.solution_store.SolutionStore`. Compact JSON lines are
+converted to such records first. Every check runs as array operations over a
+chunk of records, and the result is one byte of failure flags per record.
+"""
+
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from . import bitset
+from .placement_catalog import PlacementCatalog, anchored
+from .puzzle_state import PuzzleState
+from .solution_store import EMPTY_SLOT, SolutionStore, placement_ids_of
+
+# Failure flags of a record
+COVERAGE = 1  # Some position is not covered
+OVERLAP = 2  # Some position is covered by more than one piece
+PIECES = 4  # A piece is missing, unknown or in the wrong column
+SHAPE = 8  # A placement is not a rotation of its library piece on the board
+INITIAL = 16  # The record contradicts the initial placements or color hints
+MALFORMED = 32  # The record could not be parsed
+
+FAILURE_NAMES = {
+    COVERAGE: "coverage",
+    OVERLAP: "overlap",
+    PIECES: "pieces",
+    SHAPE: "shape",
+    INITIAL: "initial",
+    MALFORMED: "malformed",
+}
+
+PathLike = Union[str, Path]
+
+
+def describe(flags: int) -> List[str]:
+    """Get the names of the failures of a record.
+
+    Args:
+        flags: Failure flags of the record.
+
+    Returns:
+        Names from FAILURE_NAMES, empty for a valid record.
+    """
+    return [name for flag, name in FAILURE_NAMES.items() if flags & flag]
+
+
+class SolutionVerifier:
+    """Verifies solutions against a placement catalog and an initial state.
+
+    A record is valid if every column holds a placement of its own piece, the
+    placements cover every position exactly once, and the record keeps the
+    placements of the initial state and respects its color hints. The
+    catalog holds every placement of every library variant, so a placement
+    id of the piece's column is congruent to the library piece. Compact
+    placements are resolved by translating the library variant to its
+    anchor and looking up the covered cells in the catalog.
+    """
+
+    def __init__(
+        self,
+        catalog: PlacementCatalog,
+        initial: Optional[PuzzleState] = None,
+        chunk_size: int = 1 << 16,
+    ):
+        """Build the per-placement tables of the checks.
+
+        Args:
+            catalog: Placement catalog the placement ids refer to.
+            initial: Optional initial state every solution has to complete.
+            chunk_size: Number of records verified at once.
+
+        Raises:
+            ValueError: If a placement of the initial state matches no catalog
+                entry.
+        """
+        self.catalog = catalog
+        self.chunk_size = chunk_size
+        num_entries = len(catalog)
+        indices = catalog.model.get_lattice_table()[0]
+        words = bitset.num_words(int(indices.max()) + 1)
+        slots = {name: i for i, name in enumerate(catalog.piece_names)}
+
+        # Row num_entries stands for empty and unknown ids: no cells, no piece
+        masks = [entry.mask for entry in catalog.entries] + [0]
+        self._masks = bitset.to_words(masks, words)
+        self._sizes = np.array(
+            [len(entry.indices) for entry in catalog.entries] + [0], dtype=np.int64
+        )
+        self._slots = np.array(
+            [slots[entry.piece_name] for entry in catalog.entries] + [-1],
+            dtype=np.int64,
+        )
+        full = 0
+        for index in indices.tolist():
+            full |= 1 << index
+        self._full = bitset.to_words([full], words)[0]
+
+        # Placements that cover a position hinted with another color
+        self._hint_conflicts = np.zeros(num_entries + 1, dtype=bool)
+        self._fixed: Dict[int, int] = {}
+        if initial is not None:
+            hint_masks = initial.color_hint_masks(catalog.library)
+            self._hint_conflicts[:num_entries] = [
+                bool(entry.mask & hint_masks[entry.piece_name])
+                for entry in catalog.entries
+            ]
+            for placement_id in placement_ids_of(initial, catalog):
+                self._fixed[slots[catalog[placement_id].piece_name]] = placement_id
+
+        self._compact_ids: Dict[Tuple, Tuple[int, int]] = {}
+
+    def verify(self, records: np.ndarray) -> np.ndarray:
+        """Verify records of placement ids.
+
+        Args:
+            records: (N, pieces) array of placement ids, EMPTY_SLOT for pieces
+                that are not placed.
+
+        Returns:
+            (N,) uint8 array of failure flags, zero for valid records.
+        """
+        records = np.asarray(records)
+        if records.ndim != 2 or records.shape[1] != len(self.catalog.piece_names):
+            raise ValueError(
+                f"Records need {len(self.catalog.piece_names)} columns, "
+                f"got shape {records.shape}"
+            )
+        flags = np.zeros(len(records), dtype=np.uint8)
+        for start in range(0, len(records), self.chunk_size):
+            stop = start + self.chunk_size
+            flags[start:stop] = self._verify_chunk(records[start:stop])
+        return flags
+
+    def _verify_chunk(self, records: np.ndarray) -> np.ndarray:
+        """Verify one chunk of records, see :meth:`verify`."""
+        num_entries = len(self.catalog)
+        ids = records.astype(np.int64)
+        known = (ids >= 0) & (ids < num_entries)
+        unknown = ~known & (ids != EMPTY_SLOT)
+        ids = np.where(known, ids, num_entries)
+        flags = np.zeros(len(records), dtype=np.uint8)
+
+        flags[unknown.any(axis=1)] |= SHAPE
+        columns = np.arange(records.shape[1])
+        flags[(self._slots[ids] != columns).any(axis=1)] |= PIECES
+
+        cells = np.bitwise_or.reduce(self._masks[ids], axis=1)
+        flags[~bitset.equal(cells, self._full)] |= COVERAGE
+        covered = self._sizes[ids].sum(axis=1)
+        flags[covered != bitset.popcount(cells)] |= OVERLAP
+
+        conflicts = self._hint_conflicts[ids].any(axis=1)
+        for slot, placement_id in self._fixed.items():
+            conflicts |= ids[:, slot] != placement_id
+        flags[conflicts] |= INITIAL
+        return flags
+
+    def records_from_compact(
+        self, solutions: Iterable[Union[str, dict]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert compact solutions to records of placement ids.
+
+        Args:
+            solutions: Compact solutions, parsed or as JSON text, see
+                :meth:`PuzzleState.to_compact`.
+
+        Returns:
+            The (N, pieces) uint16 records and (N,) uint8 failure flags of the
+            conversion. Failed placements are stored as unknown ids, so
+            :meth:`verify` reports the full set of failures of the record.
+        """
+        width = len(self.catalog.piece_names)
+        model_name = self.catalog.model_name
+        resolved = self._compact_ids
+        rows = []
+        flags = []
+        for solution in solutions:
+            row = [EMPTY_SLOT] * width
+            flag = 0
+            try:
+                if isinstance(solution, str):
+                    solution = json.loads(solution)
+                if solution.get("model", model_name) != model_name:
+                    raise ValueError("Solution of another model")
+                for placement in solution["placements"]:
+                    key = tuple(placement)
+                    slot_id = resolved.get(key)
+                    if slot_id is None:
+                        slot_id = resolved[key] = self._resolve(*key)
+                    slot, placement_id = slot_id
+                    if slot < 0 or row[slot] != EMPTY_SLOT:
+                        flag |= PIECES
+                    else:
+                        row[slot] = placement_id
+            except (ValueError, KeyError, TypeError, AttributeError):
+                row = [EMPTY_SLOT] * width
+                flag = MALFORMED
+            rows.append(row)
+            flags.append(flag)
+        records = np.array(rows, dtype=np.uint16).reshape(-1, width)
+        return records, np.array(flags, dtype=np.uint8)
+
+    def _resolve(
+        self, name: str, variant_index: int, anchor_index: int
+    ) -> Tuple[int, int]:
+        """Find the record column and placement id of a compact placement.
+
+        Returns:
+            The column of the piece, -1 for unknown pieces, and the placement
+            id. Variants that do not exist or do not fit on the board at the
+            anchor get the unknown id ``len(catalog)``; stores hold fewer than
+            EMPTY_SLOT placements, so it fits into a record.
+        """
+        catalog = self.catalog
+        if name not in catalog.library.pieces:
+            return -1, len(catalog)
+        placement_id = None
+        variants = catalog.library.pieces[name]
+        anchor = catalog.model.index_to_coord(anchor_index)
+        if 0 <= variant_index < len(variants) and anchor is not None:
+            placed = anchored(variants[variant_index], anchor)
+            indices = [catalog.model.coord_to_index(c) for c in placed.positions]
+            if None not in indices:
+                placement_id = catalog.find(name, indices)
+        return (
+            catalog.piece_names.index(name),
+            len(catalog) if placement_id is None else placement_id,
+        )
+
+    def verify_store(self, path: PathLike) -> np.ndarray:
+        """Verify all solutions of a solution store.
+
+        Args:
+            path: Path of the store file.
+
+        Returns:
+            (N,) uint8 array of failure flags.
+
+        Raises:
+            ValueError: If the store was written with another catalog.
+        """
+        store = SolutionStore(path)
+        store.header.check(self.catalog)
+        return self.verify(store.records)
+
+    def verify_jsonl(self, path: PathLike) -> np.ndarray:
+        """Verify all compact solutions of a JSON lines file.
+
+        Args:
+            path: Path of the file, one compact solution per non-empty line.
+
+        Returns:
+            (N,) uint8 array of failure flags, one per non-empty line.
+        """
+        with open(path, "r") as f:
+            records, flags = self.records_from_compact(
+                line for line in f if line.strip()
+            )
+        return flags | self.verify(records)
+
+    def verify_file(self, path: PathLike) -> np.ndarray:
+        """Verify a ``.jsonl`` file or, for any other suffix, a solution store.
+
+        Returns:
+            (N,) uint8 array of failure flags.
+        """
+        if Path(path).suffix == ".jsonl":
+            return self.verify_jsonl(path)
+        return self.verify_store(path)
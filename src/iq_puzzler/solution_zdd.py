@@ -0,0 +1,145 @@
+"""Zero-suppressed decision diagram over all solutions of a puzzle state.
+
+The diagram is built by :meth:`DLXSolver.build_zdd`, following Knuth's DXZ:
+Algorithm X memoizes on the set of remaining columns, so every distinct
+sub-board is explored once and shared by all partial solutions leading to it.
+
+Each node branches on one placement: its ``hi`` child holds the completions
+that use the placement, its ``lo`` child the completions that do not. Nodes are
+numbered children first, so counts are computed in a single forward pass.
+"""
+
+from __future__ import annotations
+import random
+from typing import Dict, List, Optional
+
+from .placement_catalog import PlacementCatalog
+
+FALSE = 0  # Terminal without solutions
+TRUE = 1  # Terminal of the empty solution
+
+
+class SolutionZDD:
+    """ZDD of all sets of catalog placements completing a puzzle state."""
+
+    def __init__(self, catalog: PlacementCatalog):
+        """Create a diagram holding only the two terminals.
+
+        Args:
+            catalog: Placement catalog the node placements refer to.
+        """
+        self.catalog = catalog
+        self.root = FALSE
+        # Placement id, lo and hi child of every node; terminals have no placement
+        self.placements: List[int] = [-1, -1]
+        self.lo: List[int] = [FALSE, TRUE]
+        self.hi: List[int] = [FALSE, TRUE]
+        self._counts: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        """Number of nodes, including the terminals."""
+        return len(self.placements)
+
+    def add_node(self, placement_id: int, lo: int, hi: int) -> int:
+        """Add a branch node.
+
+        Args:
+            placement_id: Catalog id of the placement the node branches on.
+            lo: Node of the completions without the placement.
+            hi: Node of the completions with the placement.
+
+        Returns:
+            The new node, or lo if hi holds no solutions.
+        """
+        if hi == FALSE:
+            return lo
+        self.placements.append(placement_id)
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self._counts = None
+        return len(self.placements) - 1
+
+    def counts(self) -> List[int]:
+        """Get the number of solutions below every node."""
+        if self._counts is None:
+            counts = [0, 1]
+            for node in range(2, len(self)):
+                counts.append(counts[self.lo[node]] + counts[self.hi[node]])
+            self._counts = counts
+        return self._counts
+
+    def count(self) -> int:
+        """Get the exact number of solutions."""
+        return self.counts()[self.root]
+
+    def sample(self, rng: Optional[random.Random] = None) -> List[int]:
+        """Draw a solution uniformly at random.
+
+        Args:
+            rng: Random number generator, the module level one if None.
+
+        Returns:
+            Catalog placement ids of the solution.
+
+        Raises:
+            ValueError: If there are no solutions.
+        """
+        counts = self.counts()
+        if counts[self.root] == 0:
+            raise ValueError("Cannot sample from a state without solutions")
+        randrange = (rng or random).randrange
+
+        placement_ids = []
+        node = self.root
+        while node != TRUE:
+            hi = self.hi[node]
+            if randrange(counts[node]) < counts[hi]:
+                placement_ids.append(self.placements[node])
+                node = hi
+            else:
+                node = self.lo[node]
+        return placement_ids
+
+    def placement_counts(self) -> Dict[int, int]:
+        """Count the solutions using each placement.
+
+        Returns:
+            Number of solutions per catalog placement id, for every placement
+            used by at least one solution.
+        """
+        counts = self.counts()
+        # Number of paths from the root into every node, in reverse node order
+        paths = [0] * len(self)
+        paths[self.root] = 1
+        result: Dict[int, int] = {}
+        for node in range(len(self) - 1, 1, -1):
+            if not paths[node]:
+                continue
+            paths[self.lo[node]] += paths[node]
+            paths[self.hi[node]] += paths[node]
+            placement_id = self.placements[node]
+            result[placement_id] = (
+                result.get(placement_id, 0) + paths[node] * counts[self.hi[node]]
+            )
+        return result
+
+    def cell_fraction(self, piece_name: str, position_index: int) -> float:
+        """Get the fraction of solutions where a piece covers a position.
+
+        Args:
+            piece_name: Name of the piece.
+            position_index: Index of the position.
+
+        Returns:
+            The fraction in [0, 1], 0 if there are no solutions.
+        """
+        total = self.count()
+        if not total:
+            return 0.0
+        covering = sum(
+            count
+            for placement_id, count in self.placement_counts().items()
+            if self.catalog[placement_id].piece_name == piece_name
+            and position_index in self.catalog[placement_id].indices
+        )
+        return covering / total
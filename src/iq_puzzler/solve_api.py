@@ -0,0 +1,520 @@
+"""Pure, thread-safe solve functions over shared read-only tables.
+
+The solver classes work on a caller's :class:`PuzzleState` and keep their
+search state on the instance. The functions of this module instead take an
+immutable :class:`Board` and return an immutable :class:`Solution`; every call
+builds its own state and solver. The library, catalog and model in
+:class:`SolverTables` are only read, so one instance can be shared by any
+number of threads, e.g. by :func:`solve_batch` on a free-threaded build.
+:func:`solve_process_batch` solves on worker processes instead, which load
+the packaged tables or share custom tables through shared memory.
+
+For asyncio servers, :func:`solve_async` and :class:`SolveJob` run a search on
+an executor thread. The search reports its progress every slice of search
+nodes, releasing the GIL to the event loop, and stops at the next slice once
+the awaiting task is cancelled.
+"""
+
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .branching import awkwardness
+from .feasibility import FeasibilityChecker
+from .piece_library import PieceLibrary
+from .placement_catalog import PlacementCatalog
+from .puzzle_model import PuzzleModel
+from .puzzle_state import PuzzleState
+from .shared_tables import SharedTables, SharedTablesHandle
+from .solution_store import placement_ids_of
+
+SOLVERS = ("dlx", "backtracking", "frontier")
+PROGRESS_SOLVERS = ("dlx", "frontier")  # Solvers reporting progress
+
+
+class SolverTables:
+    """Read-only library, placement catalog and model shared between solves.
+
+    Everything the solvers compute lazily per model or catalog is computed on
+    construction, so concurrent solves only read shared data.
+    """
+
+    def __init__(self, library: PieceLibrary, catalog: PlacementCatalog):
+        """Warm the shared caches of a library and its catalog.
+
+        Args:
+            library: Piece library the catalog was built from.
+            catalog: Placement catalog of the library in its model.
+        """
+        self.library = library
+        self.catalog = catalog
+        self.model: PuzzleModel = catalog.model
+        self.model.get_lattice_table()
+        self.model.get_lattice_rotations()
+        catalog.fingerprint()
+        FeasibilityChecker.for_catalog(catalog)
+        awkwardness(catalog)
+
+    @classmethod
+    def load(
+        cls, model: PuzzleModel, library_path: Union[str, Path, None] = None
+    ) -> SolverTables:
+        """Load the tables of a model, from the packaged tables when possible.
+
+        Args:
+            model: The puzzle model.
+            library_path: Piece library JSON file, the standard library if None.
+
+        Returns:
+            The warmed tables.
+        """
+        from .precomputed_tables import STANDARD_LIBRARY, load_library
+
+        return cls(*load_library(library_path or STANDARD_LIBRARY, model))
+
+
+class Board(NamedTuple):
+    """Immutable description of a board to solve."""
+
+    placements: Tuple[int, ...] = ()  # Catalog placement ids of placed pieces
+    color_hints: Tuple[Tuple[int, str], ...] = ()  # (position, color) pairs
+
+    @classmethod
+    def from_state(cls, state: PuzzleState, catalog: PlacementCatalog) -> Board:
+        """Describe the placements and color hints of a puzzle state.
+
+        Raises:
+            ValueError: If a placement does not match any catalog entry.
+        """
+        return cls(
+            tuple(sorted(placement_ids_of(state, catalog))),
+            tuple(sorted(state.color_hints.items())),
+        )
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any], tables: SolverTables) -> Board:
+        """Describe the placements of a compact state.
+
+        Raises:
+            ValueError: If the placements are invalid.
+        """
+        state = PuzzleState(tables.model)
+        state.from_compact(data, tables.library)
+        return cls.from_state(state, tables.catalog)
+
+    def to_state(self, tables: SolverTables) -> PuzzleState:
+        """Build a new puzzle state of the board.
+
+        Raises:
+            ValueError: If a placement is unknown or conflicts with another one.
+        """
+        state = PuzzleState(tables.model)
+        for placement_id in self.placements:
+            if not 0 <= placement_id < len(tables.catalog) or not state.place_by_id(
+                placement_id, tables.catalog
+            ):
+                raise ValueError(f"Cannot place placement {placement_id}")
+        state.color_hints = dict(self.color_hints)
+        return state
+
+
+class Solution(NamedTuple):
+    """Immutable solution of a board."""
+
+    placement_ids: Tuple[int, ...]  # Placement ids of all pieces, ascending
+    iterations: int  # Search iterations of the solver, 0 if not counted
+
+    def to_compact(self, catalog: PlacementCatalog) -> Dict[str, Any]:
+        """Get the solution in the compact JSON representation."""
+        placements = sorted(
+            [entry.piece_name, entry.variant_index, entry.anchor_index]
+            for entry in (catalog[i] for i in self.placement_ids)
+        )
+        return {"model": catalog.model_name, "placements": placements}
+
+    def to_state(self, tables: SolverTables) -> PuzzleState:
+        """Build a new puzzle state holding the solution."""
+        return Board(self.placement_ids).to_state(tables)
+
+
+def solve(
+    board: Board,
+    tables: SolverTables,
+    solver: str = "dlx",
+    on_progress: Optional[Callable[[int], None]] = None,
+    progress_interval: int = 1000,
+) -> Optional[Solution]:
+    """Solve a board without touching any caller state.
+
+    Args:
+        board: The board to solve.
+        tables: Shared tables of the board's model and library.
+        solver: ``dlx``, ``backtracking`` or ``frontier``.
+        on_progress: Called with the number of iterations during the search,
+            see ``PROGRESS_SOLVERS``. An exception raised by it aborts the
+            search and propagates to the caller.
+        progress_interval: Search nodes between progress calls of the dlx
+            solver. The frontier solver reports after every batch.
+
+    Returns:
+        The solution, or None if the board has no solution.
+
+    Raises:
+        ValueError: If the board or the solver is invalid, or the solver does
+            not report progress.
+    """
+    if on_progress is not None and solver not in PROGRESS_SOLVERS:
+        raise ValueError(f"Solver {solver} does not report progress")
+    state = board.to_state(tables)
+    found: List[List[int]] = []
+    if solver == "dlx":
+        from .dlx_solver import DLXSolver
+
+        search = DLXSolver(
+            state,
+            tables.library,
+            catalog=tables.catalog,
+            on_progress=on_progress,
+            progress_interval=progress_interval,
+        )
+        search.solve_all(
+            lambda rows: found.append([row["placement_id"] for row in rows]), 1
+        )
+    elif solver == "frontier":
+        from .frontier_solver import FrontierSolver
+
+        search = FrontierSolver(
+            state, tables.library, tables.catalog, on_progress=on_progress
+        )
+        search.solve_all(found.append, 1)
+    elif solver == "backtracking":
+        from .backtracking_solver import BacktrackingSolver
+
+        # The state is private to this call, so the solver may fill it
+        search = BacktrackingSolver(state, tables.library, tables.catalog)
+        if search.solve() is not None:
+            found.append(placement_ids_of(state, tables.catalog))
+    else:
+        raise ValueError(f"Unknown solver: {solver}")
+
+    if not found:
+        return None
+    placement_ids = sorted(set(board.placements) | set(found[0]))
+    return Solution(tuple(placement_ids), getattr(search, "iterations", 0))
+
+
+def solve_batch(
+    boards: Iterable[Board],
+    tables: SolverTables,
+    solver: str = "dlx",
+    max_workers: Optional[int] = None,
+) -> List[Optional[Solution]]:
+    """Solve boards on a thread pool sharing one set of tables.
+
+    Each board is solved by :func:`solve`. With the GIL, the pool interleaves
+    the searches; on free-threaded builds they run in parallel.
+
+    Args:
+        boards: The boards to solve.
+        tables: Shared tables of the boards' model and library.
+        solver: ``dlx``, ``backtracking`` or ``frontier``.
+        max_workers: Number of threads, the number of CPUs if None.
+
+    Returns:
+        The solution or None of every board, in input order.
+
+    Raises:
+        ValueError: If a board or the solver is invalid.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    with ThreadPoolExecutor(max_workers or os.cpu_count() or 1) as pool:
+        return list(pool.map(lambda board: solve(board, tables, solver), boards))
+
+
+# Tables of a worker process of solve_process_batch
+_worker_tables: Optional[SolverTables] = None
+
+
+def _init_worker(handle: Optional[SharedTablesHandle], model: PuzzleModel) -> None:
+    """Load the tables of a worker process.
+
+    Args:
+        handle: Shared tables to build the tables from, None to load the
+            packaged tables of the model.
+        model: The puzzle model of the tables.
+    """
+    global _worker_tables
+    if handle is None:
+        from .precomputed_tables import load_packaged_tables
+
+        _worker_tables = SolverTables(*load_packaged_tables(model))
+        return
+    shared = SharedTables.attach(handle)
+    try:
+        _worker_tables = SolverTables(*shared.load(model))
+    finally:
+        shared.close()
+
+
+def _solve_in_worker(board: Board, solver: str) -> Optional[Solution]:
+    return solve(board, _worker_tables, solver)
+
+
+def _has_packaged_tables(tables: SolverTables) -> bool:
+    """Check whether the packaged tables of the model hold the same catalog."""
+    from .precomputed_tables import load_packaged_tables
+
+    packaged = load_packaged_tables(tables.model)
+    return packaged is not None and (
+        packaged[1].fingerprint() == tables.catalog.fingerprint()
+    )
+
+
+def solve_process_batch(
+    boards: Iterable[Board],
+    tables: SolverTables,
+    solver: str = "dlx",
+    max_workers: Optional[int] = None,
+    mp_context: Optional[BaseContext] = None,
+) -> List[Optional[Solution]]:
+    """Solve boards on a pool of worker processes.
+
+    Workers load the packaged tables if they hold the catalog of the tables,
+    which is the fastest way to start. Otherwise, e.g. for custom shapes and
+    libraries, they build their tables from one copy in shared memory, see
+    :class:`~iq_puzzler.shared_tables.SharedTables`, instead of generating
+    them on their own.
+
+    Args:
+        boards: The boards to solve.
+        tables: Tables of the boards' model and library.
+        solver: ``dlx``, ``backtracking`` or ``frontier``.
+        max_workers: Number of processes, the number of CPUs if None.
+        mp_context: Multiprocessing context starting the workers, the default
+            context if None.
+
+    Returns:
+        The solution or None of every board, in input order.
+
+    Raises:
+        ValueError: If a board or the solver is invalid.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver}")
+    boards = list(boards)
+    shared = None
+    if not _has_packaged_tables(tables):
+        shared = SharedTables.create(tables.library, tables.catalog)
+    try:
+        with ProcessPoolExecutor(
+            max_workers,
+            mp_context,
+            initializer=_init_worker,
+            initargs=(shared and shared.handle, tables.model),
+        ) as pool:
+            workers = max_workers or os.cpu_count() or 1
+            chunk = max(1, len(boards) // (4 * workers))
+            return list(
+                pool.map(
+                    _solve_in_worker, boards, [solver] * len(boards), chunksize=chunk
+                )
+            )
+    finally:
+        if shared is not None:
+            shared.close()
+
+
+class Progress(NamedTuple):
+    """Progress of a running search."""
+
+    iterations: int  # Search iterations so far
+    elapsed: float  # Seconds since the search started
+
+
+class _Cancelled(Exception):
+    """Raised on the worker thread to abort the search of a cancelled job."""
+
+
+class SolveJob:
+    """Solve of a board on an executor thread, for asyncio code.
+
+    The job starts when it is first awaited or iterated. Iterating it yields
+    the latest :class:`Progress` whenever the search reports, skipping reports
+    made while the consumer was busy, until the search ends. Awaiting it gives
+    the solution, or None. Cancelling the task awaiting or iterating the job
+    stops the search at its next progress report::
+
+        job = SolveJob(board, tables)
+        async for progress in job:
+            print(progress.iterations)
+        solution = await job
+
+    A job is iterated by one consumer at a time and solves its board once.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        tables: SolverTables,
+        solver: str = "dlx",
+        slice_nodes: int = 1000,
+        executor: Optional[Executor] = None,
+    ):
+        """Initialize the job.
+
+        Args:
+            board: The board to solve.
+            tables: Shared tables of the board's model and library.
+            solver: ``dlx`` or ``frontier``, see ``PROGRESS_SOLVERS``.
+            slice_nodes: Search nodes of the dlx solver between progress
+                reports and cancellation checks.
+            executor: Executor running the search, the loop's default executor
+                if None.
+
+        Raises:
+            ValueError: If the solver does not report progress or the slice
+                is not positive.
+        """
+        if solver not in PROGRESS_SOLVERS:
+            raise ValueError(f"Solver {solver} does not report progress")
+        if slice_nodes < 1:
+            raise ValueError("Slice must hold at least one node")
+        self.board = board
+        self.tables = tables
+        self.solver = solver
+        self.slice_nodes = slice_nodes
+        self.executor = executor
+        self.progress = Progress(0, 0.0)  # Latest progress report
+        self._cancel = threading.Event()
+        self._future: Optional[asyncio.Future] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start = 0.0
+
+    def start(self) -> asyncio.Future:
+        """Start the search on the running event loop, if not started yet.
+
+        Returns:
+            Future of the solution.
+        """
+        if self._future is None:
+            self._loop = asyncio.get_running_loop()
+            self._changed = asyncio.Event()
+            self._start = time.perf_counter()
+            self._future = self._loop.run_in_executor(self.executor, self._run)
+            self._future.add_done_callback(self._finished)
+        return self._future
+
+    def cancel(self) -> None:
+        """Stop the search at its next progress report."""
+        self._cancel.set()
+
+    def done(self) -> bool:
+        """Whether the search has ended."""
+        return self._future is not None and self._future.done()
+
+    def __await__(self) -> Generator[Any, None, Optional[Solution]]:
+        return self._result().__await__()
+
+    async def __aiter__(self) -> AsyncIterator[Progress]:
+        future = self.start()
+        try:
+            while True:
+                await self._changed.wait()
+                self._changed.clear()
+                if future.done():
+                    return
+                yield self.progress
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    async def _result(self) -> Optional[Solution]:
+        """Wait for the solution, stopping the search if cancelled."""
+        future = self.start()
+        try:
+            # The shield keeps the future alive until the thread stops
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        except _Cancelled:
+            raise asyncio.CancelledError from None
+
+    def _run(self) -> Optional[Solution]:
+        """Solve the board. Runs on the executor thread."""
+        if self._cancel.is_set():
+            raise _Cancelled
+        return solve(
+            self.board,
+            self.tables,
+            self.solver,
+            on_progress=self._report,
+            progress_interval=self.slice_nodes,
+        )
+
+    def _report(self, iterations: int) -> None:
+        """Publish progress between slices. Runs on the executor thread."""
+        if self._cancel.is_set():
+            raise _Cancelled
+        progress = Progress(iterations, time.perf_counter() - self._start)
+        self._loop.call_soon_threadsafe(self._publish, progress)
+        # Hand the GIL to the event loop before the next slice
+        time.sleep(0)
+
+    def _publish(self, progress: Progress) -> None:
+        self.progress = progress
+        self._changed.set()
+
+    def _finished(self, future: asyncio.Future) -> None:
+        if not future.cancelled():
+            # Mark the exception of a cancelled search as retrieved
+            future.exception()
+        self._changed.set()
+
+
+async def solve_async(
+    board: Board,
+    tables: SolverTables,
+    solver: str = "dlx",
+    slice_nodes: int = 1000,
+    executor: Optional[Executor] = None,
+) -> Optional[Solution]:
+    """Solve a board without blocking the event loop.
+
+    Cancelling the awaiting task stops the search, see :class:`SolveJob`.
+
+    Args:
+        board: The board to solve.
+        tables: Shared tables of the board's model and library.
+        solver: ``dlx`` or ``frontier``.
+        slice_nodes: Search nodes of the dlx solver between cancellation checks.
+        executor: Executor running the search, the loop's default executor if
+            None.
+
+    Returns:
+        The solution, or None if the board has no solution.
+
+    Raises:
+        ValueError: If the board or the solver is invalid.
+    """
+    return await SolveJob(board, tables, solver, slice_nodes, executor)
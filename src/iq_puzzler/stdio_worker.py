@@ -0,0 +1,286 @@
+"""Persistent worker answering solve requests as JSON lines on stdin/stdout.
+
+The worker keeps one process, and the piece libraries and placement tables it
+has loaded, alive across requests. Every input line is a JSON request object:
+
+- ``id``: Optional request identifier, echoed in every event of the request.
+- ``mode``: Game mode, ``pyramid``, ``rectangle`` or ``diamonds``.
+- ``shape``: Optional shape definition object replacing the mode, see
+  :class:`~iq_puzzler.lattice_model.LatticeModel`.
+- ``library``: Optional path of the piece library JSON file.
+- ``initial``: Optional initial state, in the grid or the compact format.
+- ``solver``: ``dlx``, ``backtracking`` or ``frontier``.
+- ``count``: Count the solutions instead of solving (dlx or frontier solver).
+- ``output_format``: ``grid`` or ``compact`` representation of the solution.
+
+Omitted fields take the worker's defaults; a requested ``mode`` also replaces
+a default ``shape``. Every output line is a JSON event
+object with an ``event`` key:
+
+- ``ready``: The worker accepts requests. Sent once at startup.
+- ``progress``: The request reached a ``stage``: ``loaded`` or ``searching``.
+- ``log``: A log record of the solver, with ``level`` and ``message``.
+- ``result``: The request finished. Carries ``solved`` and the ``solution``,
+  or the ``count``, and the ``iterations`` and ``elapsed`` seconds.
+- ``error``: The request failed with a ``message``. The worker keeps running.
+
+The worker stops at the end of the input or on a ``{"command": "shutdown"}``
+request.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from .placement_catalog import PlacementCatalog
+from .piece_library import PieceLibrary
+from .puzzle_model import PuzzleModel
+from .puzzle_state import PuzzleState
+
+SOLVERS = ("dlx", "backtracking", "frontier")
+OUTPUT_FORMATS = ("grid", "compact")
+
+
+class _EventLogHandler(logging.Handler):
+    """Forwards log records as log events of the current request."""
+
+    def __init__(self, worker: "StdioWorker"):
+        super().__init__()
+        self.worker = worker
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.worker.emit(
+            "log", level=record.levelname.lower(), message=record.getMessage()
+        )
+
+
+class StdioWorker:
+    """Serves solve requests from a stream of JSON lines."""
+
+    def __init__(
+        self,
+        input_stream: TextIO,
+        output_stream: TextIO,
+        mode: str = "pyramid",
+        library: Optional[Path] = None,
+        solver: str = "dlx",
+        log_level: int = logging.INFO,
+        shape: Optional[Dict[str, Any]] = None,
+        initial: Optional[Dict[str, Any]] = None,
+        count: bool = False,
+        output_format: str = "grid",
+    ):
+        """Initialize the worker.
+
+        Args:
+            input_stream: Stream the requests are read from.
+            output_stream: Stream the events are written to.
+            mode: Default game mode of the requests.
+            library: Default piece library file, the packaged standard library
+                if None.
+            solver: Default solver of the requests.
+            log_level: Lowest level of forwarded solver log records.
+            shape: Default shape definition of the requests, replacing the mode.
+            initial: Default initial state of the requests.
+            count: Whether requests count the solutions by default.
+            output_format: Default representation of the solutions.
+        """
+        from .precomputed_tables import STANDARD_LIBRARY
+
+        self.input = input_stream
+        self.output = output_stream
+        self.defaults = {
+            "mode": mode,
+            "shape": shape,
+            "library": str(library or STANDARD_LIBRARY),
+            "initial": initial,
+            "solver": solver,
+            "count": count,
+            "output_format": output_format,
+        }
+        self.log_level = log_level
+        self.requests = 0  # Requests answered
+        self._request_id: Any = None
+        self._models: Dict[str, PuzzleModel] = {}
+        self._tables: Dict[Tuple[str, str], Tuple[PieceLibrary, PlacementCatalog]] = {}
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Write one event line for the current request.
+
+        Args:
+            event: Event type.
+            **fields: Fields of the event.
+        """
+        data = {"id": self._request_id, "event": event}
+        data.update(fields)
+        self.output.write(json.dumps(data, separators=(",", ":")) + "\n")
+        self.output.flush()
+
+    def serve(self) -> int:
+        """Answer requests until the input ends or a shutdown request.
+
+        Returns:
+            The number of requests answered.
+        """
+        logger = logging.getLogger("iq_puzzler")
+        handler = _EventLogHandler(self)
+        handler.setLevel(self.log_level)
+        previous = (logger.level, logger.propagate)
+        logger.addHandler(handler)
+        logger.setLevel(self.log_level)
+        # Records reach the client as events, never as text on the stream
+        logger.propagate = False
+        try:
+            self.emit("ready")
+            for line in self.input:
+                if not line.strip():
+                    continue
+                if not self.handle_line(line):
+                    break
+        finally:
+            logger.removeHandler(handler)
+            logger.level, logger.propagate = previous
+            self._request_id = None
+        return self.requests
+
+    def handle_line(self, line: str) -> bool:
+        """Answer one request line.
+
+        Args:
+            line: JSON request object.
+
+        Returns:
+            False if the request asks the worker to shut down, True otherwise.
+        """
+        self._request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+            self._request_id = request.get("id")
+            if request.get("command") == "shutdown":
+                return False
+            self.emit("result", **self.handle(request))
+        except Exception as e:
+            self.emit("error", message=f"{type(e).__name__}: {e}")
+        self.requests += 1
+        return True
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Solve a request.
+
+        Args:
+            request: Request object, see the module documentation.
+
+        Returns:
+            The fields of the result event.
+
+        Raises:
+            ValueError: If the request is invalid.
+        """
+        options = dict(self.defaults)
+        options.update({k: v for k, v in request.items() if v is not None})
+        if request.get("mode") is not None and request.get("shape") is None:
+            # A requested mode replaces the worker's default shape
+            options["shape"] = None
+        if options["solver"] not in SOLVERS:
+            raise ValueError(f"Unknown solver: {options['solver']}")
+        if options["output_format"] not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {options['output_format']}")
+
+        start = time.perf_counter()
+        shape = options.get("shape")
+        model_key = json.dumps(shape, sort_keys=True) if shape else options["mode"]
+        model = self._model(model_key, options["mode"], shape)
+        library, catalog = self._library(model_key, model, options["library"])
+        state = PuzzleState(model)
+        initial = options.get("initial")
+        if initial is not None:
+            if not isinstance(initial, dict):
+                raise ValueError("The initial state must be a JSON object")
+            if "placements" in initial:
+                state.from_compact(initial, library)
+            else:
+                state.from_grid(initial, catalog)
+        self.emit("progress", stage="loaded", elapsed=time.perf_counter() - start)
+
+        solver = self._solver(options["solver"], state, library, catalog)
+        self.emit("progress", stage="searching", elapsed=time.perf_counter() - start)
+        result: Dict[str, Any] = {}
+        if options["count"]:
+            if options["solver"] == "dlx":
+                result["count"] = solver.build_zdd().count()
+            elif options["solver"] == "frontier":
+                result["count"] = solver.count_solutions()
+            else:
+                raise ValueError("Counting requires the dlx or frontier solver")
+        else:
+            solved = solver.solve() is not None
+            result["solved"] = solved
+            if not solved:
+                result["solution"] = None
+            elif options["output_format"] == "compact":
+                result["solution"] = state.to_compact(catalog)
+            else:
+                result["solution"] = state.to_grid()
+        result["iterations"] = getattr(solver, "iterations", None)
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    def _model(
+        self, key: str, mode: str, shape: Optional[Dict[str, Any]]
+    ) -> PuzzleModel:
+        """Get the cached model of a mode or shape definition."""
+        model = self._models.get(key)
+        if model is None:
+            if shape:
+                from .lattice_model import LatticeModel
+
+                model = LatticeModel.from_dict(shape)
+            elif mode == "pyramid":
+                from .pyramid_model import PyramidModel
+
+                model = PyramidModel()
+            elif mode == "rectangle":
+                from .rectangle_model import RectangleModel
+
+                model = RectangleModel()
+            elif mode == "diamonds":
+                from .diamonds_model import DiamondsModel
+
+                model = DiamondsModel()
+            else:
+                raise ValueError(f"Invalid mode: {mode}")
+            self._models[key] = model
+        return model
+
+    def _library(
+        self, model_key: str, model: PuzzleModel, library_path: str
+    ) -> Tuple[PieceLibrary, PlacementCatalog]:
+        """Get the cached library and placement catalog of a model."""
+        key = (model_key, str(Path(library_path).resolve()))
+        tables = self._tables.get(key)
+        if tables is None:
+            from .precomputed_tables import load_library
+
+            tables = self._tables[key] = load_library(library_path, model)
+        return tables
+
+    @staticmethod
+    def _solver(
+        name: str, state: PuzzleState, library: PieceLibrary, catalog: PlacementCatalog
+    ):
+        """Create a solver for a state."""
+        if name == "dlx":
+            from .dlx_solver import DLXSolver
+
+            return DLXSolver(state, library, catalog=catalog)
+        if name == "frontier":
+            from .frontier_solver import FrontierSolver
+
+            return FrontierSolver(state, library, catalog)
+        from .backtracking_solver import BacktrackingSolver
+
+        return BacktrackingSolver(state, library, catalog)
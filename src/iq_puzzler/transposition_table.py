@@ -0,0 +1,81 @@
+"""Bounded memo of search results for identical sub-boards."""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# (empty position mask, remaining piece mask)
+TableKey = Tuple[int, int]
+
+
+class TranspositionTable:
+    """Least recently used cache of solution counts keyed by sub-board.
+
+    Different placement orders often leave the same empty positions with the
+    same remaining pieces. The solvers record the outcome of every fully
+    explored sub-board here and consult the table before branching:
+
+    - A count of 0 marks a proven-dead sub-board, which is pruned in every mode.
+    - A positive count is the exact number of completions, which lets counting
+      searches skip the sub-board entirely.
+
+    Piece bits follow the order of ``PlacementCatalog.piece_names``, so a table
+    must only be shared between searches over the same catalog.
+    """
+
+    def __init__(self, max_entries: int = 1 << 20):
+        """Initialize an empty table.
+
+        Args:
+            max_entries: Number of entries kept before the least recently used
+                entry is evicted.
+
+        Raises:
+            ValueError: If max_entries is not positive.
+        """
+        if max_entries < 1:
+            raise ValueError("Transposition table needs room for at least one entry")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[TableKey, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: TableKey) -> Optional[int]:
+        """Get the recorded solution count of a sub-board.
+
+        Args:
+            key: The (empty position mask, remaining piece mask) of the sub-board.
+
+        Returns:
+            The number of completions, or None if the sub-board is not recorded.
+        """
+        count = self._entries.get(key)
+        if count is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return count
+
+    def store(self, key: TableKey, count: int) -> None:
+        """Record the solution count of a fully explored sub-board.
+
+        Args:
+            key: The (empty position mask, remaining piece mask) of the sub-board.
+            count: Number of completions, 0 for a dead sub-board.
+        """
+        self._entries[key] = count
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -1,6 +1,7 @@
 """Common test fixtures."""
 
 import json
+from pathlib import Path
 import pytest
 
 import numpy as np
@@ -9,6 +10,8 @@ from iq_puzzler.puzzle_piece import PuzzlePiece, Location3D
 from iq_puzzler.puzzle_state import PuzzleState
 from iq_puzzler.puzzle_model import PuzzleModel
 
+DATA_DIR = Path(__file__).parent.parent / "puzzle_vis" / "public" / "data"
+
 
 class MockPuzzleModel(PuzzleModel):
     """Mock puzzle model for testing."""
@@ -99,6 +102,73 @@ def pyramid():
     return PyramidModel()
 
 
+@pytest.fixture
+def pyramid_library(pyramid):
+    """Load the standard piece library for the pyramid."""
+    from iq_puzzler.piece_library import PieceLibrary
+
+    return PieceLibrary(DATA_DIR / "piece_library.json", pyramid)
+
+
+@pytest.fixture
+def pyramid_catalog(pyramid_library, pyramid):
+    """Build the placement catalog of the standard library in the pyramid."""
+    from iq_puzzler.placement_catalog import PlacementCatalog
+
+    return PlacementCatalog(pyramid_library, pyramid)
+
+
+@pytest.fixture
+def pyramid_solution():
+    """A complete pyramid solution of the standard library in compact form."""
+    return {
+        "model": "PyramidModel",
+        "placements": [
+            ["Blue", 4, 22],
+            ["Dark Green", 15, 28],
+            ["Green", 2, 40],
+            ["Light Blue", 11, 41],
+            ["Mint Green", 0, 0],
+            ["Orange", 2, 17],
+            ["Pink", 15, 9],
+            ["Purple", 15, 27],
+            ["Red", 23, 20],
+            ["Turquise", 3, 29],
+            ["Wine Red", 4, 7],
+            ["Yellow", 0, 11],
+        ],
+    }
+
+
+@pytest.fixture
+def solved_state(pyramid, pyramid_library, pyramid_solution):
+    """A pyramid puzzle state with all pieces placed."""
+    state = PuzzleState(pyramid)
+    state.from_compact(pyramid_solution, pyramid_library)
+    return state
+
+
+@pytest.fixture
+def hinted_grid(solved_state):
+    """An empty pyramid grid with the color of every piece hinted at two positions."""
+    grid = solved_state.to_grid()
+    hinted = set()
+    for placement in solved_state.get_placements().values():
+        hinted.update(sorted(placement.occupied_indices)[:2])
+    for key, position in grid.items():
+        position["occupied"] = False
+        position["piece_name"] = None
+        if int(key) not in hinted:
+            position["piece_color"] = None
+    return grid
+
+
+@pytest.fixture
+def puzzle_120_json():
+    """Path of a pyramid initial state with one pre-placed piece."""
+    return DATA_DIR / "puzzle-120.json"
+
+
 @pytest.fixture
 def mock_piece_library_json(tmp_path):
     """Create a temporary JSON file with sample piece data."""
@@ -0,0 +1,63 @@
+"""Tests for the BacktrackingSolver class."""
+
+from iq_puzzler.backtracking_solver import BacktrackingSolver
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.transposition_table import TranspositionTable
+
+
+def test_solve_completes_partial_state(solved_state, pyramid_library, pyramid_catalog):
+    """Test that removing pieces from a solution leaves a solvable state."""
+    for name in ["Blue", "Red", "Yellow", "Pink"]:
+        solved_state.remove_piece(name)
+
+    solver = BacktrackingSolver(solved_state, pyramid_library, pyramid_catalog)
+    assert solver.solve() is solved_state
+    assert len(solved_state.get_placements()) == 12
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
+    # Id placements are materialized with pieces at their covered positions
+    for name, placement in solved_state.get_placements().items():
+        assert pyramid_catalog.find(name, placement.occupied_indices) is not None
+
+
+def test_solve_reports_unsolvable_state(pyramid, pyramid_library):
+    """Test that a single piece cannot fill the empty pyramid."""
+    library = PieceLibrary(None, pyramid)
+    library.add_piece(pyramid_library.pieces["Yellow"][0])
+    state = PuzzleState(pyramid)
+
+    assert BacktrackingSolver(state, library).solve() is None
+    assert not state.get_placements()
+    assert not state.get_occupied_indices()
+
+
+def test_transposition_table_prunes_dead_sub_boards(pyramid, pyramid_library):
+    """Test that a sub-board proven dead once is not searched again."""
+    library = PieceLibrary(None, pyramid)
+    for name in ["Yellow", "Blue"]:
+        library.add_piece(pyramid_library.pieces[name][0])
+    table = TranspositionTable()
+
+    # The precheck would reject the state before the search
+    solver = BacktrackingSolver(PuzzleState(pyramid), library, None, table, False)
+    assert solver.solve() is None
+    assert len(table) > 0
+    misses = table.misses
+
+    solver = BacktrackingSolver(PuzzleState(pyramid), library, None, table, False)
+    assert solver.solve() is None
+    assert table.misses == misses
+    assert table.hits == 1
+
+
+def test_solve_respects_color_hints(
+    pyramid, pyramid_library, pyramid_catalog, hinted_grid
+):
+    """Test that only placements matching the color hints are tried."""
+    state = PuzzleState(pyramid)
+    state.from_grid(hinted_grid, pyramid_catalog)
+
+    assert BacktrackingSolver(state, pyramid_library, pyramid_catalog).solve()
+    for placement in state.get_placements().values():
+        for idx in placement.occupied_indices & state.color_hints.keys():
+            assert state.color_hints[idx] == placement.piece.color
@@ -0,0 +1,35 @@
+"""Tests for the multi-word bitset helpers."""
+
+import numpy as np
+
+from iq_puzzler import bitset
+
+
+def test_num_words():
+    """Test the number of words holding a bitset."""
+    assert bitset.num_words(0) == 1
+    assert bitset.num_words(64) == 1
+    assert bitset.num_words(65) == 2
+    assert bitset.num_words(204) == 4
+
+
+def test_words_round_trip():
+    """Test converting masks wider than a word to words and back."""
+    masks = [0, 1, 1 << 63, (1 << 64) | 5, (1 << 130) - 1]
+    words = bitset.to_words(masks, 3)
+    assert words.shape == (5, 3)
+    assert words.dtype == np.uint64
+    assert [bitset.from_words(row) for row in words] == masks
+
+
+def test_operations():
+    """Test the vectorized operations across word boundaries."""
+    a = bitset.to_words([1 << 70, 1 | 1 << 70, 1 << 3], 2)
+    b = bitset.to_words([1 << 70], 2)
+
+    assert bitset.disjoint(a, b).tolist() == [False, False, True]
+    assert bitset.equal(a, b).tolist() == [True, False, False]
+    assert bitset.popcount(a).tolist() == [1, 2, 1]
+    bits = bitset.unpack(a)
+    assert bits.shape == (3, 128)
+    assert np.flatnonzero(bits[1]).tolist() == [0, 70]
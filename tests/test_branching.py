@@ -0,0 +1,128 @@
+"""Tests for the DLX branching strategies."""
+
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+from iq_puzzler.branching import (
+    COLUMN_STRATEGIES,
+    ROW_ORDERS,
+    AwkwardFirst,
+    BottomLayerFirst,
+    MostConstraining,
+    PositionsFirst,
+    awkwardness,
+    column_strategy,
+    row_order,
+)
+from iq_puzzler.dlx_solver import DLXMatrix, DLXSolver
+from iq_puzzler.placement_catalog import PlacementCatalog
+
+
+def test_lookup_by_name():
+    """Test that strategies are looked up by name and passed through."""
+    assert isinstance(column_strategy("bottom-layer"), BottomLayerFirst)
+    strategy = PositionsFirst()
+    assert column_strategy(strategy) is strategy
+    assert isinstance(row_order("awkwardness"), AwkwardFirst)
+
+    with pytest.raises(ValueError, match="Unknown column strategy"):
+        column_strategy("random")
+    with pytest.raises(ValueError, match="Unknown row order"):
+        row_order("random")
+
+
+def test_column_ranks(pyramid):
+    """Test the ranks of position and piece columns."""
+    # Positions 0 and 1 on the bottom layer, 54 at the top, then a piece column
+    positions = [0, 1, 54, None]
+    incidence = np.array(
+        [
+            [1, 1, 0, 1],
+            [0, 1, 1, 1],
+        ],
+        dtype=bool,
+    )
+
+    assert PositionsFirst().ranks(positions, incidence, pyramid) == [0, 0, 0, 1]
+    assert BottomLayerFirst().ranks(positions, incidence, pyramid) == [0, 0, 1, 2]
+    # Position 1 shares rows with all columns, the others with three
+    assert MostConstraining().ranks(positions, incidence, pyramid) == [1, 0, 1, 2]
+
+
+def test_awkwardness_is_a_ranking(pyramid_catalog):
+    """Test that every placement gets a distinct rank."""
+    ranks = awkwardness(pyramid_catalog)
+    assert sorted(ranks.tolist()) == list(range(len(pyramid_catalog)))
+    assert awkwardness(pyramid_catalog) is ranks
+
+
+def test_awkwardness_does_not_keep_catalog(pyramid, pyramid_library):
+    """Test that a catalog with cached ranks is garbage collected."""
+    catalog = PlacementCatalog(pyramid_library, pyramid)
+    awkwardness(catalog)
+    ref = weakref.ref(catalog)
+    del catalog
+    gc.collect()
+    assert ref() is None
+
+
+def test_choose_column_by_size_and_rank():
+    """Test the bucketed column selection while covering and uncovering."""
+    matrix = DLXMatrix(3, ["a", "b", "c"], ranks=[1, 0, 0])
+    matrix.add_row([0, 1], "r0")
+    matrix.add_row([0, 2], "r1")
+    matrix.add_row([1], "r2")
+    matrix.add_row([2], "r3")
+    matrix.add_row([2], "r4")
+
+    # a and b have two rows, b has the lower rank
+    assert matrix.choose_column().name == "b"
+    b = matrix.column_headers[1]
+    matrix.cover_column(b)
+    # r0 is gone, so a has a single row left
+    assert matrix.choose_column().name == "a"
+    matrix.uncover_column(b)
+    assert matrix.choose_column().name == "b"
+
+    # Lowest rank first: c with three rows before a with two
+    matrix = DLXMatrix(3, ["a", "b", "c"], ranks=[1, 1, 0], size_major=False)
+    for cols in [[0, 1], [0, 2], [2], [2]]:
+        matrix.add_row(cols, None)
+    assert matrix.choose_column().name == "c"
+    # An empty column always comes first
+    matrix.cover_column(matrix.column_headers[0])
+    assert matrix.choose_column().name == "b"
+
+
+def test_choose_column_of_large_columns():
+    """Test that the selection falls back to a scan while all columns are large."""
+    matrix = DLXMatrix(2, ["a", "b"])
+    for row in range(2 * DLXMatrix.small_size):
+        matrix.add_row([0, 1] if row % 2 else [0], None)
+
+    assert matrix.choose_column().name == "b"
+    matrix.cover_column(matrix.column_headers[1])
+    assert matrix.choose_column().name == "a"
+    matrix.cover_column(matrix.column_headers[0])
+    assert matrix.choose_column() is None
+
+
+@pytest.mark.parametrize("columns", sorted(COLUMN_STRATEGIES))
+@pytest.mark.parametrize("rows", sorted(ROW_ORDERS))
+def test_strategies_find_all_solutions(solved_state, pyramid_library, columns, rows):
+    """Test that every strategy combination finds the same solutions."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green"]:
+        solved_state.remove_piece(name)
+    expected = DLXSolver(solved_state, pyramid_library, propagate=False).solve_all(
+        lambda rows: None
+    )
+
+    solver = DLXSolver(
+        solved_state, pyramid_library, propagate=False, columns=columns, rows=rows
+    )
+    assert solver.count_solutions() == expected
+    assert solver.solve() is solved_state
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
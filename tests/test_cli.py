@@ -0,0 +1,240 @@
+"""Tests for the command line interface."""
+
+import json
+import logging
+
+import pytest
+from click.testing import CliRunner
+
+from iq_puzzler.cli import main
+from iq_puzzler.solution_store import SolutionStore, SolutionStoreWriter
+
+
+def test_solve_without_command(puzzle_120_json, tmp_path):
+    """Test that the solver runs when no command is given."""
+    output = tmp_path / "solution.json"
+    result = CliRunner().invoke(
+        main,
+        ["--solver", "dlx", "--initial", str(puzzle_120_json), "--output", str(output)],
+    )
+    assert result.exit_code == 0, result.output
+    grid = json.loads(output.read_text())
+    assert all(position["occupied"] for position in grid.values())
+
+
+def test_estimate_command(puzzle_120_json):
+    """Test that the estimate command reports the tree size and duration."""
+    result = CliRunner().invoke(
+        main,
+        [
+            "estimate",
+            "--initial",
+            str(puzzle_120_json),
+            "--probes",
+            "20",
+            "--seed",
+            "1",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "nodes:" in result.output
+    assert "eta:" in result.output
+
+
+def test_estimate_command_fails_on_invalid_puzzle(puzzle_120_json):
+    """Test that the estimate command exits with 1 if the puzzle cannot load."""
+    result = CliRunner().invoke(
+        main, ["estimate", "--mode", "rectangle", "--initial", str(puzzle_120_json)]
+    )
+    assert result.exit_code == 1
+
+
+def test_options_before_command_are_rejected(puzzle_120_json):
+    """Test that solver options given before a command are not ignored."""
+    result = CliRunner().invoke(
+        main, ["--mode", "rectangle", "--initial", str(puzzle_120_json), "estimate"]
+    )
+    assert result.exit_code == 2
+    assert "--initial, --mode must be given after the estimate command" in (
+        result.output
+    )
+
+
+def test_solve_region_with_optional_pieces(tmp_path):
+    """Test filling the bottom layer with any subset of the pieces."""
+    output = tmp_path / "solution.json"
+    result = CliRunner().invoke(
+        main,
+        [
+            "--solver",
+            "dlx",
+            "--optional-pieces",
+            "--region",
+            ",".join(str(i) for i in range(25)),
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    grid = json.loads(output.read_text())
+    assert all(grid[str(i)]["occupied"] for i in range(25))
+    assert not all(position["occupied"] for position in grid.values())
+
+
+@pytest.fixture
+def region_args(tmp_path, solved_state):
+    """Options keeping six pieces and requiring only the cells of a seventh."""
+    names = sorted(solved_state.get_placements())
+    region = solved_state.get_placement(names[6]).occupied_indices
+    for name in names[6:]:
+        solved_state.remove_piece(name)
+    initial = tmp_path / "initial.json"
+    solved_state.export_to_json(str(initial))
+    return [
+        "--solver",
+        "dlx",
+        "--initial",
+        str(initial),
+        "--optional-pieces",
+        "--region",
+        ",".join(map(str, sorted(region))),
+    ]
+
+
+def test_count_region_with_optional_pieces(region_args, caplog):
+    """Test that counting honours optional pieces and regions."""
+    caplog.set_level(logging.INFO, logger="iq_puzzler")
+    result = CliRunner().invoke(main, region_args + ["--count"])
+    assert result.exit_code == 0, result.output
+    assert "Found 17 solutions" in caplog.text
+
+    caplog.clear()
+    CliRunner().invoke(main, region_args + ["--count", "--solver", "frontier"])
+    assert "Optional pieces and regions require the dlx solver" in caplog.text
+    assert "Found" not in caplog.text
+
+
+def test_store_region_with_optional_pieces(region_args, tmp_path):
+    """Test that enumerating into a store honours optional pieces and regions."""
+    path = tmp_path / "solutions.bin"
+    result = CliRunner().invoke(main, region_args + ["--store", str(path)])
+    assert result.exit_code == 0, result.output
+    assert len(SolutionStore(path)) == 17
+
+
+def test_solve_custom_shape(puzzle_120_json, tmp_path):
+    """Test solving on a board given by a shape definition."""
+    shape = tmp_path / "shape.json"
+    shape.write_text(
+        json.dumps({"name": "pyramid", "layers": [[n, n] for n in range(5, 0, -1)]})
+    )
+    output = tmp_path / "solution.json"
+    result = CliRunner().invoke(
+        main,
+        [
+            "--solver",
+            "dlx",
+            "--shape",
+            str(shape),
+            "--initial",
+            str(puzzle_120_json),
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    grid = json.loads(output.read_text())
+    assert len(grid) == 55
+    assert all(position["occupied"] for position in grid.values())
+
+
+@pytest.mark.parametrize("mode", ["rectangle", "diamonds"])
+def test_solve_board_modes(tmp_path, mode):
+    """Test solving the rectangle and diamonds boards."""
+    output = tmp_path / "solution.json"
+    result = CliRunner().invoke(
+        main, ["--mode", mode, "--solver", "dlx", "--output", str(output)]
+    )
+    assert result.exit_code == 0, result.output
+    grid = json.loads(output.read_text())
+    assert len(grid) == 55
+    assert all(position["occupied"] for position in grid.values())
+
+
+def test_verify(tmp_path, pyramid_catalog, solved_state):
+    """Test that the verify command reports failed records and exits with 1."""
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+    result = CliRunner().invoke(main, ["verify", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "1 records, 0 failed" in result.output
+
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        solved_state.remove_piece("Blue")
+        writer.append_state(solved_state)
+    result = CliRunner().invoke(main, ["verify", str(path)])
+    assert result.exit_code == 1
+    assert f"{path}:1: coverage, pieces" in result.output
+
+
+def test_build_index(tmp_path, pyramid_catalog, solved_state):
+    """Test building a solution index from a store."""
+    from iq_puzzler.solution_index import SolutionIndex
+
+    store = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(store, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+    output = tmp_path / "index.npz"
+    result = CliRunner().invoke(
+        main, ["build-index", str(store), str(output), "--complete"]
+    )
+    assert result.exit_code == 0, result.output
+    assert f"{output}: 1 solutions indexed" in result.output
+    index = SolutionIndex.load(output, pyramid_catalog)
+    assert len(index) == 1 and index.complete
+
+    result = CliRunner().invoke(
+        main, ["build-index", str(store), str(output), "--mode", "rectangle"]
+    )
+    assert result.exit_code == 1
+
+
+def test_serve_stdio():
+    """Test that the worker mode answers requests on stdin."""
+    result = CliRunner().invoke(
+        main,
+        ["--serve-stdio", "--mode", "rectangle", "--solver", "dlx"],
+        input='{"id": 7, "output_format": "compact"}\n',
+    )
+    assert result.exit_code == 0, result.output
+    events = [json.loads(line) for line in result.output.splitlines()]
+    assert events[0]["event"] == "ready"
+    assert events[-1]["id"] == 7 and events[-1]["solved"] is True
+
+
+def test_serve_stdio_defaults(puzzle_120_json):
+    """Test that solve options become the defaults of the worker requests."""
+    result = CliRunner().invoke(
+        main,
+        [
+            "--serve-stdio",
+            "--solver",
+            "dlx",
+            "--output-format",
+            "compact",
+            "--initial",
+            str(puzzle_120_json),
+        ],
+        input='{"id": 1}\n{"id": 2, "output_format": "grid"}\n',
+    )
+    assert result.exit_code == 0, result.output
+    events = [json.loads(line) for line in result.output.splitlines()]
+    answers = {e["id"]: e for e in events if e["event"] == "result"}
+    assert answers[1]["solution"]["model"] == "PyramidModel"
+    assert len(answers[1]["solution"]["placements"]) == 12
+    assert len(answers[2]["solution"]) == 55
+
+    result = CliRunner().invoke(main, ["--serve-stdio", "--store", "out.bin"])
+    assert result.exit_code == 2
+    assert "--store cannot be combined with --serve-stdio" in result.output
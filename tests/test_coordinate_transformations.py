@@ -249,3 +249,37 @@ def test_rotate_invalid():
     )
     with pytest.raises(ValueError):
         coordinate_transformations.rotate(piece, invalid_matrix)
+
+
+def test_lattice_basis_roundtrip():
+    """Test converting lattice coordinates to basis coefficients and back."""
+    lattice = np.array([[0, 0, 0], [2, 4, 0], [1, 3, 1], [4, 4, 2], [-1, 1, -1]])
+    coefficients = coordinate_transformations.to_lattice_basis(lattice)
+    np.testing.assert_array_equal(
+        coordinate_transformations.from_lattice_basis(coefficients), lattice
+    )
+    with pytest.raises(ValueError):
+        coordinate_transformations.to_lattice_basis(np.array([[1, 0, 0]]))
+
+
+def test_lattice_rotation_matches_float_rotation(pyramid, mock_piece):
+    """Test that exact integer rotations agree with the float rotations."""
+    for yaw, pitch, roll in pyramid.get_valid_rotations():
+        matrix = coordinate_transformations.lattice_rotation_matrix(yaw, pitch, roll)
+        assert matrix.dtype == np.int64
+        assert round(np.linalg.det(matrix)) == 1
+
+        exact = coordinate_transformations.rotate_exact(mock_piece, yaw, pitch, roll)
+        approximate = coordinate_transformations.rotate(
+            mock_piece, coordinate_transformations.rotation_matrix(yaw, pitch, roll)
+        )
+        np.testing.assert_allclose(exact.positions, approximate.positions, atol=1e-12)
+
+
+def test_lattice_rotation_invalid(mock_piece):
+    """Test that rotations leaving the grid are rejected."""
+    with pytest.raises(ValueError, match="does not map the grid"):
+        coordinate_transformations.lattice_rotation_matrix(30, 0, 0)
+    off_grid = PuzzlePiece("Test", "rgb(255, 0, 0)", [Location3D(0.3, 0, 0)])
+    with pytest.raises(ValueError):
+        coordinate_transformations.rotate_exact(off_grid, 90, 0, 0)
@@ -0,0 +1,89 @@
+"""Tests for the DiamondsModel class."""
+
+import numpy as np
+import pytest
+
+from iq_puzzler.backtracking_solver import BacktrackingSolver
+from iq_puzzler.coordinate_transformations import lattice_rotation_matrix
+from iq_puzzler.coordinates import Location3D, XY_DIST, Z_DIST
+from iq_puzzler.diamonds_model import LATTICE_ROTATIONS, RADII, DiamondsModel
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.lattice_model import ROTATION_SETS, LatticeModel
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY, load_library
+from iq_puzzler.puzzle_state import PuzzleState
+
+
+@pytest.fixture
+def diamonds():
+    """Create a DiamondsModel instance."""
+    return DiamondsModel()
+
+
+def test_board_structure(diamonds):
+    """Test the positions of the diamond."""
+    assert diamonds.get_all_indices() == set(range(55))
+    assert diamonds.index_to_coord(0) == Location3D(3 * XY_DIST, 3 * XY_DIST, 0.0)
+    layers = [round(diamonds.index_to_coord(i).z / Z_DIST) for i in range(55)]
+    assert layers == sorted(layers)
+    assert [layers.count(layer) for layer in range(len(RADII))] == [1, 4, 13, 24, 13]
+    for index in diamonds.get_all_indices():
+        assert diamonds.coord_to_index(diamonds.index_to_coord(index)) == index
+    assert diamonds.get_neighbours(0) == {1, 2, 3, 4}
+
+
+def test_neighbours_match_generic_model(diamonds):
+    """Test that the adjacency graph equals the one of the generic shape."""
+    positions = [diamonds.index_to_coord(i) for i in range(55)]
+    generic = LatticeModel(positions)
+    for index in range(55):
+        assert diamonds.get_neighbours(index) == generic.get_neighbours(index)
+    np.testing.assert_array_equal(
+        diamonds.get_lattice_table()[1], generic.get_lattice_table()[1]
+    )
+
+
+@pytest.mark.parametrize(
+    "coord",
+    [(0.0, 0.0, 0.0), (3.5, 3.0, 0.0), (-1.0, 3.0, 0.0), (3.0, 3.0, 100.0), (3, 3, 1)],
+)
+def test_invalid_coords(diamonds, coord):
+    """Test that coordinates off the board are rejected."""
+    assert diamonds.coord_to_index(Location3D(*coord)) is None
+    assert not diamonds.is_valid_coord(Location3D(*coord))
+
+
+def test_all_rotations(diamonds):
+    """Test that the integer rotations match all standard rotations exactly."""
+    assert diamonds.get_valid_rotations() == ROTATION_SETS["all"]
+    expected = [lattice_rotation_matrix(*r) for r in ROTATION_SETS["all"]]
+    np.testing.assert_array_equal(diamonds.get_lattice_rotations(), expected)
+    assert diamonds.get_lattice_rotations() is LATTICE_ROTATIONS
+
+
+@pytest.fixture(scope="module")
+def diamonds_solution():
+    """Fill the board once with the DLX solver."""
+    model = DiamondsModel()
+    library, catalog = load_library(STANDARD_LIBRARY, model)
+    state = PuzzleState(model)
+    assert DLXSolver(state, library, catalog=catalog).solve() is state
+    return state.to_compact(catalog)
+
+
+def test_dlx_fills_the_board(diamonds, diamonds_solution):
+    """Test that the DLX solver fills the board with the standard library."""
+    library, _ = load_library(STANDARD_LIBRARY, diamonds)
+    state = PuzzleState(diamonds)
+    state.from_compact(diamonds_solution, library)
+    assert state.get_occupied_indices() == diamonds.get_all_indices()
+    assert len(state.get_placements()) == 12
+
+
+def test_backtracking_completes_the_board(diamonds, diamonds_solution):
+    """Test that the backtracking solver completes a partly filled board."""
+    library, catalog = load_library(STANDARD_LIBRARY, diamonds)
+    placements = diamonds_solution["placements"][:6]
+    state = PuzzleState(diamonds)
+    state.from_compact(dict(diamonds_solution, placements=placements), library)
+    assert BacktrackingSolver(state, library, catalog).solve() is state
+    assert state.get_occupied_indices() == diamonds.get_all_indices()
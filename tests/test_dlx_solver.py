@@ -0,0 +1,228 @@
+"""Tests for the DLXSolver class."""
+
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import iq_puzzler
+from iq_puzzler.dlx_solver import DLXMatrix, DLXSolver
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.transposition_table import TranspositionTable
+
+
+def test_solve_completes_partial_state(solved_state, pyramid_library):
+    """Test that removing pieces from a solution leaves a solvable state."""
+    for name in ["Blue", "Red", "Yellow"]:
+        solved_state.remove_piece(name)
+
+    solver = DLXSolver(solved_state, pyramid_library)
+    assert solver.solve() is solved_state
+    assert len(solved_state.get_placements()) == 12
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
+
+
+def test_solve_all(solved_state, pyramid_library):
+    """Test enumerating all completions of a partial state."""
+    for name in ["Blue", "Red", "Yellow", "Pink"]:
+        solved_state.remove_piece(name)
+    occupied = solved_state.get_occupied_indices()
+
+    solutions = []
+    solver = DLXSolver(solved_state, pyramid_library)
+    count = solver.solve_all(solutions.append)
+    assert count == len(solutions) >= 1
+    # The state itself is left untouched
+    assert solved_state.get_occupied_indices() == occupied
+    for rows in solutions:
+        assert sorted(row["piece_name"] for row in rows) == [
+            "Blue",
+            "Pink",
+            "Red",
+            "Yellow",
+        ]
+        covered = set().union(*(row["occupied_indices"] for row in rows))
+        assert covered == solved_state.get_all_indices() - occupied
+
+    assert DLXSolver(solved_state, pyramid_library).solve_all(lambda rows: None, 1) == 1
+
+
+def test_count_solutions_with_transposition_table(solved_state, pyramid_library):
+    """Test that memoized counting matches plain enumeration."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green", "Orange"]:
+        solved_state.remove_piece(name)
+    occupied = solved_state.get_occupied_indices()
+
+    expected = DLXSolver(solved_state, pyramid_library).solve_all(lambda rows: None)
+    assert DLXSolver(solved_state, pyramid_library).count_solutions() == expected
+
+    # Without propagation, so that the search has sub-boards to record
+    table = TranspositionTable()
+    solver = DLXSolver(
+        solved_state, pyramid_library, transposition_table=table, propagate=False
+    )
+    assert solver.count_solutions() == expected
+    assert len(table) > 0
+    assert solved_state.get_occupied_indices() == occupied
+
+    # A second search over the same sub-board is answered from the table
+    solver = DLXSolver(
+        solved_state, pyramid_library, transposition_table=table, propagate=False
+    )
+    assert solver.count_solutions() == expected
+    assert solver.iterations == 0
+    assert solver.pruned == 1
+
+
+def test_estimate_tree_size(solved_state, pyramid_library):
+    """Test that the probe estimate is close to the actual search tree size."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green", "Orange", "Purple"]:
+        solved_state.remove_piece(name)
+    occupied = solved_state.get_occupied_indices()
+
+    solver = DLXSolver(solved_state, pyramid_library, propagate=False)
+    solver.solve_all(lambda rows: None)
+    nodes = solver.iterations
+
+    estimate = solver.estimate_tree_size(2000, random.Random(0))
+    assert estimate.probes == 2000
+    assert abs(estimate.nodes - nodes) < 4 * estimate.standard_error + 1
+    assert estimate.eta > 0
+    assert solved_state.get_occupied_indices() == occupied
+
+
+def test_estimate_tree_size_of_forced_search(solved_state, pyramid_library):
+    """Test that a search without choices is estimated exactly."""
+    solved_state.remove_piece("Blue")
+    solver = DLXSolver(solved_state, pyramid_library)
+    solver.solve_all(lambda rows: None)
+    nodes = solver.iterations
+
+    estimate = solver.estimate_tree_size(10)
+    assert estimate.nodes == nodes
+    assert estimate.variance == 0
+
+
+def test_propagation_decides_forced_state(solved_state, pyramid_library):
+    """Test that forced placements complete a state without any search."""
+    for name in ["Blue", "Red"]:
+        solved_state.remove_piece(name)
+
+    solver = DLXSolver(solved_state, pyramid_library)
+    assert solver.solve() is solved_state
+    assert solver.iterations == 0
+    assert len(solver.reduction.forced) == 2
+    assert solver.reduction.columns_removed > 0
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
+
+    # Forced placements are part of every enumerated solution
+    for name in ["Blue", "Red"]:
+        solved_state.remove_piece(name)
+    solutions = []
+    DLXSolver(solved_state, pyramid_library).solve_all(solutions.append)
+    assert [sorted(row["piece_name"] for row in rows) for rows in solutions] == [
+        ["Blue", "Red"]
+    ]
+    assert DLXSolver(solved_state, pyramid_library).build_zdd().count() == 1
+
+
+def test_secondary_columns():
+    """Test that secondary columns are never chosen but exclude conflicting rows."""
+    matrix = DLXMatrix(3, ["a", "b", "s"], primary=2)
+    matrix.add_row([0, 2], "r0")
+    matrix.add_row([1, 2], "r1")
+    matrix.add_row([1], "r2")
+
+    # The secondary column with two rows is not linked into the header list
+    assert matrix.root.left.name == "b"
+    assert matrix.choose_column().name == "a"
+    matrix.cover_column(matrix.column_headers[0])
+    # Covering the row of a covers s, which removes the conflicting r1
+    matrix.cover_column(matrix.column_headers[2])
+    b = matrix.choose_column()
+    assert b.name == "b" and b.size == 1
+    assert matrix.row_data[b.down.row] == "r2"
+
+
+def test_optional_pieces(solved_state, pyramid_library):
+    """Test that optional pieces need not be used, but may fill the board."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green"]:
+        solved_state.remove_piece(name)
+    expected = DLXSolver(solved_state, pyramid_library).count_solutions()
+
+    # The removed pieces exactly fill the board, so all of them are still used
+    solver = DLXSolver(solved_state, pyramid_library, optional_pieces=True)
+    assert solver.count_solutions() == expected
+    solver = DLXSolver(solved_state, pyramid_library, optional_pieces=["Blue"])
+    assert solver.count_solutions() == expected
+
+
+def test_region(pyramid, pyramid_library, pyramid_catalog):
+    """Test filling a region with any subset of the pieces."""
+    bottom = {i for i in pyramid.get_all_indices() if pyramid.index_to_coord(i)[2] == 0}
+    state = PuzzleState(pyramid)
+    solver = DLXSolver(
+        state,
+        pyramid_library,
+        catalog=pyramid_catalog,
+        optional_pieces=True,
+        region=bottom,
+    )
+
+    assert solver.solve() is state
+    assert bottom <= state.get_occupied_indices()
+    assert len(state.get_placements()) < len(pyramid_library.pieces)
+
+    with pytest.raises(ValueError, match="outside of the model"):
+        DLXSolver(state, pyramid_library, region=[100])
+
+
+def test_color_hints(pyramid, pyramid_library, pyramid_catalog, hinted_grid):
+    """Test solving a board given only by the colors at some positions."""
+    state = PuzzleState(pyramid)
+    state.from_grid(hinted_grid, pyramid_catalog)
+
+    assert DLXSolver(state, pyramid_library, catalog=pyramid_catalog).solve()
+    assert state.get_occupied_indices() == state.get_all_indices()
+    colors = {
+        idx: placement.piece.color
+        for placement in state.get_placements().values()
+        for idx in placement.occupied_indices
+    }
+    for idx, color in state.color_hints.items():
+        assert colors[idx] == color
+
+    # A position hinted with the color of a piece that cannot reach it
+    state.from_grid(hinted_grid, pyramid_catalog)
+    blue = pyramid_library.pieces["Blue"][0].color
+    state.color_hints = {idx: blue for idx in range(25)}
+    solver = DLXSolver(state, pyramid_library, catalog=pyramid_catalog)
+    assert solver.solve() is None
+    assert solver.reduction.infeasible
+
+
+def test_import_defers_optional_modules():
+    """Test that importing the solver leaves the search helpers unloaded."""
+    deferred = [
+        "branching",
+        "feasibility",
+        "propagation",
+        "solution_zdd",
+        "transposition_table",
+    ]
+    code = (
+        "import sys, iq_puzzler.dlx_solver; "
+        f"print([m for m in {deferred} if 'iq_puzzler.' + m in sys.modules])"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(iq_puzzler.__file__).parents[1]))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    assert result.stdout.strip() == "[]"
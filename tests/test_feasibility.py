@@ -0,0 +1,121 @@
+"""Tests for the feasibility checks."""
+
+import gc
+import weakref
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.feasibility import FeasibilityChecker, _can_partition, _shift_or
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog
+from iq_puzzler.puzzle_piece import PuzzlePiece
+from iq_puzzler.puzzle_state import PuzzleState
+
+
+def spare_checker(pyramid_library, model, shapes):
+    """Create a checker for renamed copies of library pieces."""
+    library = PieceLibrary(None, model)
+    for i, shape in enumerate(shapes):
+        piece = pyramid_library.pieces[shape][0]
+        library.add_piece(PuzzlePiece(f"Spare {i}", piece.color, piece.positions))
+    return FeasibilityChecker(PlacementCatalog(library, model))
+
+
+def test_solvable_state_passes(solved_state, pyramid_catalog):
+    """Test that the empty positions of a partial solution pass all checks."""
+    for name in ["Blue", "Red", "Yellow", "Pink"]:
+        solved_state.remove_piece(name)
+
+    assert FeasibilityChecker(pyramid_catalog).check(solved_state) is None
+
+
+def test_ball_count_mismatch(pyramid, pyramid_library):
+    """Test that a single piece cannot fill the empty pyramid."""
+    library = PieceLibrary(None, pyramid)
+    library.add_piece(pyramid_library.pieces["Yellow"][0])
+    checker = FeasibilityChecker(PlacementCatalog(library, pyramid))
+
+    reason = checker.check(PuzzleState(pyramid))
+    assert reason == "55 empty positions cannot hold the 5 remaining balls"
+
+
+def test_piece_does_not_fit(solved_state, pyramid, pyramid_library):
+    """Test that a piece without any placement in the holes is reported."""
+    for name in ["Blue", "Turquise", "Green"]:
+        solved_state.remove_piece(name)
+    checker = spare_checker(
+        pyramid_library, pyramid, ["Blue", "Dark Green", "Wine Red"]
+    )
+
+    assert checker.check(solved_state) == (
+        "Piece Spare 1 does not fit into the empty positions"
+    )
+
+
+def test_holes_cannot_be_partitioned(solved_state, pyramid, pyramid_library):
+    """Test that separate holes must be filled by separate groups of pieces."""
+    # Holes of 3, 4 and 5 positions for three pieces of 4 balls each
+    for name in ["Blue", "Turquise", "Red"]:
+        solved_state.remove_piece(name)
+    checker = spare_checker(pyramid_library, pyramid, ["Blue"] * 3)
+
+    assert checker.check(solved_state) == (
+        "Holes of sizes [3, 4, 5] cannot be filled with pieces of sizes [4, 4, 4]"
+    )
+
+
+def test_colouring_rejects_fitting_pieces(solved_state, pyramid, pyramid_library):
+    """Test a colouring rejecting a board that passes the other checks."""
+    # Two holes of 4 positions for two pieces of 4 balls that fit into them
+    for name in ["Blue", "Dark Green"]:
+        solved_state.remove_piece(name)
+    checker = spare_checker(pyramid_library, pyramid, ["Blue"] * 2)
+
+    assert checker.check(solved_state) == (
+        "Colouring (1, 0, 0) leaves 3 empty positions of one colour, which the "
+        "remaining pieces cannot cover exactly"
+    )
+    solver = DLXSolver(solved_state, checker.catalog.library, precheck=False)
+    assert solver.solve() is None
+
+
+def test_checker_is_cached_per_catalog(pyramid_catalog):
+    """Test that the checker of a catalog is only built once."""
+    checker = FeasibilityChecker.for_catalog(pyramid_catalog)
+    assert FeasibilityChecker.for_catalog(pyramid_catalog) is checker
+
+
+def test_cached_checker_does_not_keep_catalog(pyramid, pyramid_library):
+    """Test that a catalog with a cached checker is garbage collected."""
+    catalog = PlacementCatalog(pyramid_library, pyramid)
+    checker = weakref.ref(FeasibilityChecker.for_catalog(catalog))
+    ref = weakref.ref(catalog)
+    del catalog
+    gc.collect()
+    assert ref() is None
+    assert checker() is None
+
+
+def test_dlx_solver_rejects_infeasible_state(pyramid, pyramid_library):
+    """Test that the DLX solver does not search an infeasible state."""
+    library = PieceLibrary(None, pyramid)
+    library.add_piece(pyramid_library.pieces["Yellow"][0])
+    solver = DLXSolver(PuzzleState(pyramid), library)
+
+    assert solver.solve() is None
+    assert solver.infeasibility.startswith("55 empty positions")
+    assert solver.iterations <= 1
+
+
+def test_can_partition():
+    """Test splitting piece sizes into groups matching the hole sizes."""
+    assert _can_partition([3, 9], [3, 4, 5])
+    assert _can_partition([4, 8], [4, 4, 4])
+    assert not _can_partition([3, 4, 5], [4, 4, 4])
+    assert not _can_partition([5, 5], [3, 3, 4])
+    assert _can_partition([], [])
+
+
+def test_shift_or():
+    """Test adding one of several counts to every reachable sum."""
+    # Sums {0, 2} plus one of {1, 3} gives {1, 3, 5}
+    assert _shift_or(0b101, 0b1010) == 0b101010
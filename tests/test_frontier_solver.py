@@ -0,0 +1,109 @@
+"""Tests for the FrontierSolver class."""
+
+import pytest
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.frontier_solver import FrontierSolver
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.puzzle_state import PuzzleState
+
+
+def test_solve_completes_partial_state(solved_state, pyramid_library):
+    """Test that removing pieces from a solution leaves a solvable state."""
+    for name in ["Blue", "Red", "Yellow"]:
+        solved_state.remove_piece(name)
+
+    solver = FrontierSolver(solved_state, pyramid_library)
+    assert solver.solve() is solved_state
+    assert len(solved_state.get_placements()) == 12
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
+
+
+@pytest.mark.parametrize("cells", ["fewest", "first"])
+@pytest.mark.parametrize("batch_size", [1, 7, 4096])
+def test_count_matches_dlx(
+    solved_state, pyramid_library, pyramid_catalog, batch_size, cells
+):
+    """Test that counting agrees with the DLX solver for any batch size and rule."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green", "Orange"]:
+        solved_state.remove_piece(name)
+    occupied = solved_state.get_occupied_indices()
+
+    expected = DLXSolver(solved_state, pyramid_library).count_solutions()
+    solver = FrontierSolver(
+        solved_state,
+        pyramid_library,
+        pyramid_catalog,
+        batch_size=batch_size,
+        cells=cells,
+    )
+    assert solver.count_solutions() == expected
+    assert solver.iterations > 0
+    assert solved_state.get_occupied_indices() == occupied
+
+
+def test_solve_all(solved_state, pyramid_library, pyramid_catalog):
+    """Test enumerating all completions as placement ids."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green"]:
+        solved_state.remove_piece(name)
+    empty = solved_state.get_all_indices() - solved_state.get_occupied_indices()
+
+    solutions = []
+    solver = FrontierSolver(solved_state, pyramid_library, pyramid_catalog)
+    count = solver.solve_all(solutions.append)
+    assert count == len(solutions) == solver.count_solutions()
+    assert len(set(map(tuple, solutions))) == count
+    for placement_ids in solutions:
+        entries = [pyramid_catalog[i] for i in placement_ids]
+        assert sorted(entry.piece_name for entry in entries) == [
+            "Blue",
+            "Green",
+            "Pink",
+            "Red",
+            "Yellow",
+        ]
+        assert set().union(*(entry.indices for entry in entries)) == empty
+
+    assert solver.solve_all(lambda ids: None, limit=1) == 1
+
+
+@pytest.mark.parametrize("limit", [1, 2])
+def test_solve_all_limit_within_a_batch(
+    solved_state, pyramid_library, pyramid_catalog, limit
+):
+    """Test that the limit holds when one batch completes several solutions."""
+    for name in sorted(solved_state.get_placements())[4:]:
+        solved_state.remove_piece(name)
+    assert FrontierSolver(solved_state, pyramid_library).count_solutions() > limit
+
+    solutions = []
+    solver = FrontierSolver(solved_state, pyramid_library, pyramid_catalog)
+    assert solver.solve_all(solutions.append, limit=limit) == limit
+    assert len(solutions) == limit
+
+
+def test_solved_state(solved_state, pyramid_library):
+    """Test that a complete state counts as its only solution."""
+    assert FrontierSolver(solved_state, pyramid_library).count_solutions() == 1
+
+
+def test_infeasible_state(pyramid, pyramid_library):
+    """Test that a state failing the precheck is not searched."""
+    library = PieceLibrary(None, pyramid)
+    library.add_piece(pyramid_library.pieces["Yellow"][0])
+    solver = FrontierSolver(PuzzleState(pyramid), library)
+
+    assert solver.solve() is None
+    assert solver.iterations == 0
+
+
+def test_invalid_batch_size(solved_state, pyramid_library):
+    """Test that the batch size must be positive."""
+    with pytest.raises(ValueError):
+        FrontierSolver(solved_state, pyramid_library, batch_size=0)
+
+
+def test_invalid_cell_rule(solved_state, pyramid_library):
+    """Test that unknown cell rules are rejected."""
+    with pytest.raises(ValueError, match="Unknown cell rule"):
+        FrontierSolver(solved_state, pyramid_library, cells="last")
@@ -0,0 +1,102 @@
+"""Tests for the LatticeModel class."""
+
+import json
+
+import pytest
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.frontier_solver import FrontierSolver
+from iq_puzzler.lattice_model import ROTATION_SETS, LatticeModel
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY
+from iq_puzzler.puzzle_state import PuzzleState
+
+
+def test_pyramid_matches_pyramid_model(pyramid, pyramid_catalog):
+    """Test that the five layer pyramid reproduces the pyramid model."""
+    model = LatticeModel.pyramid(5)
+    assert model.get_all_indices() == pyramid.get_all_indices()
+    for index in pyramid.get_all_indices():
+        assert model.index_to_coord(index) == pyramid.index_to_coord(index)
+        assert model.coord_to_index(pyramid.index_to_coord(index)) == index
+    assert model.get_valid_rotations() == pyramid.get_valid_rotations()
+
+    library = PieceLibrary(STANDARD_LIBRARY, model)
+    assert len(PlacementCatalog(library, model)) == len(pyramid_catalog)
+
+
+def test_taller_pyramids():
+    """Test the position counts and neighbours of taller pyramids."""
+    for size, positions in [(1, 1), (6, 91), (8, 204)]:
+        assert len(LatticeModel.pyramid(size).get_all_indices()) == positions
+
+    model = LatticeModel.pyramid(6)
+    # Corner: two neighbours in its layer and one in the layer above
+    assert model.get_neighbours(0) == {1, 6, 36}
+    # Apex: four neighbours in the layer below
+    assert len(model.get_neighbours(90)) == 4
+    assert model.get_neighbours(91) == set()
+
+
+def test_shape_definition_round_trip(tmp_path):
+    """Test loading and saving shape definitions."""
+    data = {"name": "board", "layers": [[2, 3], [1, 2]], "rotations": "flat"}
+    path = tmp_path / "shape.json"
+    path.write_text(json.dumps(data))
+
+    model = LatticeModel.from_json(path)
+    assert model.name == "board"
+    assert len(model.get_all_indices()) == 8
+    assert model.get_valid_rotations() == ROTATION_SETS["flat"]
+    assert model.to_dict() == data
+
+    positions = LatticeModel.from_dict(
+        {"positions": [[0, 0, 0], [1, 0, 0]], "rotations": [[90, 0, 0], [0, 0, 0]]}
+    )
+    assert positions.get_valid_rotations() == [(0, 0, 0), (90, 0, 0)]
+    assert LatticeModel.from_dict(positions.to_dict()).to_dict() == positions.to_dict()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"positions": []},
+        {"positions": [[0, 0, 0], [0, 0, 0]]},
+        {"positions": [[0.5, 0, 0]]},
+        {"layers": [[2, 2], [2, 2]]},
+        {"layers": [[1, 1]], "positions": [[0, 0, 0]]},
+        {"layers": [[1, 1]], "rotations": "spin"},
+        {"layers": [[1, 1]], "rotations": [[30, 0, 0]]},
+    ],
+)
+def test_invalid_shapes(data):
+    """Test that invalid shape definitions are rejected."""
+    with pytest.raises(ValueError):
+        LatticeModel.from_dict(data)
+
+
+def test_board_beyond_64_positions():
+    """Test that the solvers handle boards whose masks span several words."""
+    # 4 x 18 board for 18 straight pieces of 4 balls, all but three columns hinted
+    columns = 18
+    model = LatticeModel.from_layers([(4, columns)], "flat", "strip")
+    colors = [f"#0000{k:02x}" for k in range(columns)]
+    library = PieceLibrary(None, model)
+    library.add_pieces_from_json(
+        [
+            {"name": f"Line {k}", "color": color, "grid": [True] * 4 + [False] * 12}
+            for k, color in enumerate(colors)
+        ]
+    )
+    catalog = PlacementCatalog(library, model)
+    state = PuzzleState(model)
+    for index in model.get_all_indices():
+        if index % columns < columns - 3:
+            state.color_hints[index] = colors[index % columns]
+
+    # The last three lines stand in the free columns in any order
+    assert DLXSolver(state, library, catalog=catalog).count_solutions() == 6
+    assert FrontierSolver(state, library, catalog).count_solutions() == 6
+    assert FrontierSolver(state, library, catalog).solve() is state
+    assert state.get_occupied_indices() == model.get_all_indices()
@@ -1,6 +1,10 @@
 """Tests for the PieceLibrary class."""
 
+import numpy as np
+import pytest
+
 from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.puzzle_piece import PuzzlePiece
 
 
 def test_piece_manager_initialization(mock_piece_library_json, mocked_model):
@@ -32,3 +36,36 @@ def test_unique_variants(mock_piece_library_json, mocked_model, mock_piece):
     variant_positions = [tuple(map(tuple, v.positions)) for v in variants]
     # Check that there are no duplicates
     assert len(variant_positions) == len(set(variant_positions))
+
+
+def test_batched_variants_match_single_rotations(pyramid_library, pyramid):
+    """Test that the batched variant table matches rotating each piece alone."""
+    from iq_puzzler import coordinate_transformations
+
+    for name, variants in pyramid_library.pieces.items():
+        for variant, angles in zip(variants, pyramid.get_valid_rotations()):
+            expected = coordinate_transformations.rotate_exact(variants[0], *angles)
+            assert np.array_equal(variant.positions, expected.positions), name
+
+
+def test_unique_variants_skip_symmetric_rotations(mocked_model):
+    """Test that rotations mapping a piece onto itself are detected in bulk."""
+    line = PuzzlePiece("Line", "rgb(0, 0, 255)", [[0, 0, 0], [1, 0, 0], [2, 0, 0]])
+    library = PieceLibrary(None, mocked_model)
+    library.add_pieces([line])
+
+    variants = library.pieces["Line"]
+    assert len(variants) == len(mocked_model.get_valid_rotations())
+    distinct = {}
+    for i, variant in enumerate(variants):
+        distinct.setdefault(frozenset(map(tuple, variant.positions.tolist())), i)
+    assert library.unique_variants["Line"] == sorted(distinct.values())
+    assert len(library.unique_variants["Line"]) < len(variants)
+
+
+def test_add_pieces_rejects_misaligned_positions(mocked_model):
+    """Test that pieces off the grid are rejected."""
+    piece = PuzzlePiece("Off", "rgb(0, 0, 0)", [[0, 0, 0], [0.3, 0, 0]])
+    library = PieceLibrary(None, mocked_model)
+    with pytest.raises(ValueError, match="aligned"):
+        library.add_pieces([piece])
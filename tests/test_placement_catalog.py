@@ -0,0 +1,76 @@
+"""Tests for the PlacementCatalog class."""
+
+import pytest
+
+from iq_puzzler.diamonds_model import DiamondsModel
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog, anchored
+from iq_puzzler.pyramid_model import PyramidModel
+from iq_puzzler.rectangle_model import RectangleModel
+
+from .conftest import DATA_DIR
+
+
+def test_catalog_entries_fit_pyramid(pyramid_catalog, pyramid_library, pyramid):
+    """Test that every entry is a valid, distinct placement of its piece."""
+    assert len(pyramid_catalog) > 0
+    all_indices = pyramid.get_all_indices()
+    seen = set()
+    for entry in pyramid_catalog.entries:
+        variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+        assert len(entry.indices) == len(variant.positions)
+        assert entry.indices <= all_indices
+        assert entry.mask == sum(1 << idx for idx in entry.indices)
+        assert (entry.piece_name, entry.indices) not in seen
+        seen.add((entry.piece_name, entry.indices))
+
+
+def test_catalog_matches_anchored_variant(pyramid_catalog, pyramid_library, pyramid):
+    """Test that catalog entries cover the cells of their variant at the anchor."""
+    for entry in pyramid_catalog.entries[::50]:
+        variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+        placed = anchored(variant, pyramid.index_to_coord(entry.anchor_index))
+        indices = {pyramid.coord_to_index(coord) for coord in placed.positions}
+        assert indices == entry.indices
+
+
+@pytest.mark.parametrize("model_class", [PyramidModel, DiamondsModel, RectangleModel])
+def test_catalog_is_complete(model_class):
+    """Test that the catalog holds every placement found by brute force.
+
+    Some variants have no ball at their origin, so placements whose variant
+    origin lies outside the board have to be found as well.
+    """
+    model = model_class()
+    library = PieceLibrary(DATA_DIR / "piece_library.json", model)
+    coords = [model.index_to_coord(idx) for idx in model.get_all_indices()]
+
+    expected = set()
+    for name, variants in library.pieces.items():
+        # Skip variants with the same positions as another variant
+        shapes = {variant.positions.round(6).tobytes(): variant for variant in variants}
+        for variant in shapes.values():
+            positions = variant.positions
+            for coord in coords:
+                for ball in positions:
+                    indices = []
+                    for position in positions + (coord - ball):
+                        index = model.coord_to_index(position)
+                        if index is None:
+                            break
+                        indices.append(index)
+                    else:
+                        expected.add((name, frozenset(indices)))
+
+    catalog = PlacementCatalog(library, model)
+    assert {(entry.piece_name, entry.indices) for entry in catalog.entries} == expected
+    assert len(catalog) == len(expected)
+
+
+def test_catalog_find(pyramid_catalog):
+    """Test looking up placement ids by covered cells."""
+    for entry in pyramid_catalog.entries[::50]:
+        found = pyramid_catalog.find(entry.piece_name, sorted(entry.indices))
+        assert pyramid_catalog[found] == entry
+    assert pyramid_catalog.find("Blue", {0}) is None
+    assert pyramid_catalog.find("Unknown", {0, 1, 2}) is None
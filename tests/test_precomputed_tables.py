@@ -0,0 +1,87 @@
+"""Tests for the precomputed variant and placement tables."""
+
+import json
+
+import numpy as np
+import pytest
+
+from iq_puzzler.diamonds_model import DiamondsModel
+from iq_puzzler.lattice_model import LatticeModel
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog
+from iq_puzzler.precomputed_tables import (
+    PACKAGED_TABLES,
+    STANDARD_LIBRARY,
+    load_library,
+    load_packaged_tables,
+    load_tables,
+    save_tables,
+    tables_key,
+)
+from iq_puzzler.rectangle_model import RectangleModel
+
+
+def test_packaged_tables_are_current(pyramid, pyramid_catalog):
+    """Test that the packaged pyramid tables match the standard library."""
+    with open(STANDARD_LIBRARY) as f:
+        key = tables_key(json.load(f), pyramid)
+    tables = load_tables(PACKAGED_TABLES["PyramidModel"], key, pyramid)
+    assert tables is not None
+    library, catalog = tables
+    assert catalog.fingerprint() == pyramid_catalog.fingerprint()
+
+
+@pytest.mark.parametrize("model_class", [RectangleModel, DiamondsModel])
+def test_packaged_board_tables_are_current(model_class):
+    """Test that the packaged tables of the other boards match the library."""
+    model = model_class()
+    with open(STANDARD_LIBRARY) as f:
+        key = tables_key(json.load(f), model)
+    tables = load_tables(PACKAGED_TABLES[model_class.__name__], key, model)
+    assert tables is not None
+    library = PieceLibrary(STANDARD_LIBRARY, model)
+    assert tables[1].fingerprint() == PlacementCatalog(library, model).fingerprint()
+
+
+def test_load_library_matches_generated(pyramid, pyramid_library):
+    """Test that tables reproduce the generated variants exactly."""
+    library, catalog = load_library(STANDARD_LIBRARY, pyramid)
+    assert list(library.pieces) == list(pyramid_library.pieces)
+    for name, variants in pyramid_library.pieces.items():
+        assert len(library.pieces[name]) == len(variants)
+        for loaded, generated in zip(library.pieces[name], variants):
+            assert loaded.color == generated.color
+            np.testing.assert_array_equal(loaded.positions, generated.positions)
+
+
+def test_save_and_load_tables(tmp_path, mock_piece_library_json, mocked_model):
+    """Test the table roundtrip and that stale tables are ignored."""
+    library = PieceLibrary(mock_piece_library_json, mocked_model)
+    catalog = PlacementCatalog(library, mocked_model)
+    path = tmp_path / "tables.npz"
+    save_tables(path, "key", library, catalog)
+
+    loaded = load_tables(path, "key", mocked_model)
+    assert loaded is not None
+    assert loaded[1].fingerprint() == catalog.fingerprint()
+    assert load_tables(path, "other key", mocked_model) is None
+    assert load_tables(tmp_path / "missing.npz", "key", mocked_model) is None
+
+
+def test_load_library_without_tables(mock_piece_library_json, mocked_model):
+    """Test that libraries without packaged tables are generated."""
+    library, catalog = load_library(mock_piece_library_json, mocked_model)
+    assert sorted(library.pieces) == ["Blue Piece", "Red Piece"]
+    assert (
+        catalog.fingerprint()
+        == PlacementCatalog(
+            PieceLibrary(mock_piece_library_json, mocked_model), mocked_model
+        ).fingerprint()
+    )
+
+
+def test_load_packaged_tables(pyramid, pyramid_catalog):
+    """Test loading the packaged tables of a model without a library file."""
+    library, catalog = load_packaged_tables(pyramid)
+    assert catalog.fingerprint() == pyramid_catalog.fingerprint()
+    assert load_packaged_tables(LatticeModel.pyramid(5)) is None
@@ -0,0 +1,96 @@
+"""Tests for the exact cover reduction."""
+
+import numpy as np
+
+from iq_puzzler import propagation
+from iq_puzzler.propagation import reduce_exact_cover
+
+STRANDING = np.array(
+    [
+        [1, 1, 0, 0],
+        [0, 1, 1, 0],
+        [0, 0, 1, 1],
+        [1, 0, 0, 1],
+        [1, 0, 1, 0],  # Conflicts with both rows covering column 1
+    ],
+    dtype=bool,
+)
+
+
+def test_forced_rows_are_taken():
+    """Test that a column with a single row forces it and drops conflicts."""
+    incidence = np.array(
+        [
+            [1, 1, 0, 0],  # Only row covering column 0
+            [0, 1, 1, 0],  # Conflicts with row 0
+            [0, 0, 1, 1],
+            [0, 0, 0, 1],
+        ],
+        dtype=bool,
+    )
+    reduction = reduce_exact_cover(incidence)
+
+    # Row 0 is forced, which leaves row 2 as the only row for column 2
+    assert reduction.forced == [0, 2]
+    assert reduction.rows.tolist() == []
+    assert reduction.columns.tolist() == []
+    assert reduction.rows_removed == 4
+    assert reduction.columns_removed == 4
+    assert not reduction.infeasible
+
+
+def test_stranding_rows_are_removed():
+    """Test that a row leaving a column without compatible rows is removed."""
+    reduction = reduce_exact_cover(STRANDING)
+
+    assert reduction.rows.tolist() == [0, 1, 2, 3]
+    assert reduction.forced == []
+    assert reduction.columns.tolist() == [0, 1, 2, 3]
+    assert reduction.rows_removed == 1
+    assert not reduction.infeasible
+
+
+def test_stranding_rows_in_blocks(monkeypatch):
+    """Test that comparing the rows in small blocks finds the same rows."""
+    monkeypatch.setattr(propagation, "_BLOCK_ENTRIES", 7)
+    assert reduce_exact_cover(STRANDING).rows.tolist() == [0, 1, 2, 3]
+
+
+def test_stranding_skipped_above_row_limit():
+    """Test that the stranding rule is skipped for too many rows."""
+    reduction = reduce_exact_cover(STRANDING, stranding_row_limit=4)
+    assert reduction.rows.tolist() == [0, 1, 2, 3, 4]
+    assert reduction.rows_removed == 0
+
+
+def test_infeasible_columns_are_kept():
+    """Test that a column without rows is reported and kept."""
+    incidence = np.array([[1, 0, 0], [1, 1, 0]], dtype=bool)
+    reduction = reduce_exact_cover(incidence)
+
+    assert reduction.infeasible
+    assert 2 in reduction.columns.tolist()
+
+
+def test_secondary_columns_neither_force_nor_strand():
+    """Test that secondary columns may stay uncovered."""
+    incidence = np.array(
+        [
+            [1, 0, 1, 0],
+            [0, 1, 0, 0],
+            [1, 1, 0, 0],
+        ],
+        dtype=bool,
+    )
+    # Columns 2 and 3 are secondary: column 2 has a single row, column 3 none
+    reduction = reduce_exact_cover(incidence, primary=2)
+
+    assert reduction.forced == []
+    assert reduction.rows.tolist() == [0, 1, 2]
+    assert not reduction.infeasible
+
+    # As primary columns, the single row of column 2 is forced
+    reduction = reduce_exact_cover(incidence, primary=3)
+    assert reduction.forced == [0, 1]
+    assert reduction.columns.tolist() == [3]
+    assert not reduction.infeasible
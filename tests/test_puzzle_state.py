@@ -1,7 +1,9 @@
 """Tests for the PuzzleState class."""
 
 import numpy as np
+import pytest
 from iq_puzzler.puzzle_piece import PuzzlePiece
+from iq_puzzler.puzzle_state import PuzzleState
 import json
 
 
@@ -151,3 +153,205 @@ def test_export_to_json(mocked_state, mock_piece, tmp_path):
     assert pos_3["piece_color"] is None
     assert "coordinate" in pos_3
     assert all(isinstance(pos_3["coordinate"][k], float) for k in ["x", "y", "z"])
+
+
+def test_export_to_json_compact_whitespace(mocked_state, mock_piece, tmp_path):
+    """Test that exporting without indentation writes the same grid."""
+    mocked_state.place_piece(mock_piece, 0)
+
+    output_file = tmp_path / "test_export.json"
+    mocked_state.export_to_json(str(output_file), indent=None)
+
+    with open(output_file) as f:
+        content = f.read()
+    assert "\n" not in content
+    assert json.loads(content) == mocked_state.to_grid()
+
+
+def test_compact_roundtrip(pyramid, pyramid_library, pyramid_catalog, tmp_path):
+    """Test that the compact format restores the same grid."""
+    state = PuzzleState(pyramid)
+    entry = pyramid_catalog.entries[0]
+    variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+    assert state.place_piece(variant, entry.anchor_index)
+
+    compact = state.to_compact(pyramid_catalog)
+    assert compact == {
+        "model": "PyramidModel",
+        "placements": [[entry.piece_name, entry.variant_index, entry.anchor_index]],
+    }
+
+    output_file = tmp_path / "compact.json"
+    state.export_compact(str(output_file), pyramid_catalog)
+    restored = PuzzleState(pyramid)
+    restored.load_compact(str(output_file), pyramid_library)
+    assert restored.to_grid() == state.to_grid()
+
+
+def test_off_board_origin_roundtrip(pyramid, pyramid_library, pyramid_catalog):
+    """Test a placement whose variant origin lies outside the pyramid.
+
+    No Orange variant has a ball at its origin; covering these cells puts the
+    origin of the variant off the board.
+    """
+    cells = {6, 12, 30, 45, 50}
+    grid = PuzzleState(pyramid).to_grid()
+    for idx in cells:
+        grid[str(idx)].update(
+            occupied=True,
+            piece_name="Orange",
+            piece_color=pyramid_library.pieces["Orange"][0].color,
+        )
+    state = PuzzleState(pyramid)
+    state.from_grid(grid, pyramid_catalog)
+    assert pyramid_catalog.find("Orange", cells) is not None
+
+    restored = PuzzleState(pyramid)
+    restored.from_compact(state.to_compact(pyramid_catalog), pyramid_library)
+    assert restored.get_occupied_indices() == cells
+    assert restored.to_grid() == grid
+
+
+def test_place_by_id(pyramid, pyramid_library, pyramid_catalog):
+    """Test that placing by catalog id matches placing the variant."""
+    entry = pyramid_catalog.entries[0]
+    expected = PuzzleState(pyramid)
+    variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+    assert expected.place_piece(variant, entry.anchor_index)
+
+    state = PuzzleState(pyramid)
+    assert state.can_place_id(0, pyramid_catalog)
+    assert state.place_by_id(0, pyramid_catalog)
+    assert state.is_piece_placed(entry.piece_name)
+    assert state.to_grid() == expected.to_grid()
+
+    # The same piece cannot be placed twice
+    assert not state.can_place_id(0, pyramid_catalog)
+    assert not state.place_by_id(0, pyramid_catalog)
+
+
+def test_place_by_id_rejects_overlap(pyramid, pyramid_catalog):
+    """Test that overlapping id placements are rejected and removal frees cells."""
+    first = pyramid_catalog.entries[0]
+    overlapping = next(
+        i
+        for i, entry in enumerate(pyramid_catalog.entries)
+        if entry.piece_name != first.piece_name and entry.mask & first.mask
+    )
+    state = PuzzleState(pyramid)
+    assert state.place_by_id(0, pyramid_catalog)
+    assert state.get_occupied_mask() == first.mask
+    assert not state.can_place_id(overlapping, pyramid_catalog)
+    assert not state.place_by_id(overlapping, pyramid_catalog)
+
+    assert state.remove_piece(first.piece_name)
+    assert not state.get_placements()
+    assert state.get_occupied_mask() == 0
+    assert state.place_by_id(overlapping, pyramid_catalog)
+
+
+def test_place_by_id_respects_placed_pieces(pyramid, pyramid_library, pyramid_catalog):
+    """Test that id placements see pieces placed with place_piece."""
+    entry = pyramid_catalog.entries[0]
+    variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+    state = PuzzleState(pyramid)
+    assert state.place_piece(variant, entry.anchor_index)
+    assert not state.can_place_id(0, pyramid_catalog)
+
+    state.remove_piece(entry.piece_name)
+    assert state.can_place_id(0, pyramid_catalog)
+
+
+def test_place_piece_respects_id_placements(pyramid, pyramid_library, pyramid_catalog):
+    """Test that place_piece sees pending placements made with place_by_id."""
+    first = pyramid_catalog.entries[0]
+    entry = next(
+        e
+        for e in pyramid_catalog.entries
+        if e.piece_name != first.piece_name and e.mask & first.mask
+    )
+    variant = pyramid_library.pieces[entry.piece_name][entry.variant_index]
+    state = PuzzleState(pyramid)
+    assert state.place_by_id(0, pyramid_catalog)
+    assert state.place_piece(variant, entry.anchor_index) is None
+    assert state.get_occupied_indices() == set(first.indices)
+
+
+def test_from_compact_rejects_invalid(pyramid, pyramid_library):
+    """Test that invalid compact data is rejected."""
+    state = PuzzleState(pyramid)
+    with pytest.raises(ValueError):
+        state.from_compact(
+            {"model": "RectangleModel", "placements": []}, pyramid_library
+        )
+    with pytest.raises(ValueError):
+        state.from_compact({"placements": [["Blue", 99, 0]]}, pyramid_library)
+    with pytest.raises(ValueError):
+        state.from_compact({"placements": [["Blue", 0, 54]]}, pyramid_library)
+
+
+def test_load_from_json(pyramid, pyramid_catalog, puzzle_120_json):
+    """Test loading an initial state and validating it against the library."""
+    state = PuzzleState(pyramid)
+    state.load_from_json(str(puzzle_120_json), pyramid_catalog)
+
+    with open(puzzle_120_json) as f:
+        data = json.load(f)
+    occupied = {int(idx) for idx, pos in data.items() if pos["occupied"]}
+    assert list(state.get_placements()) == ["Yellow"]
+    assert state.get_occupied_indices() == occupied
+    for name, placement in state.get_placements().items():
+        assert pyramid_catalog.find(name, placement.occupied_indices) is not None
+    assert state.to_grid() == data
+
+
+@pytest.mark.parametrize(
+    "mutate, message",
+    [
+        (lambda data: data.update({"55": data["0"]}), "Invalid position indices"),
+        (lambda data: data.update({"00": data["0"]}), "Duplicate position indices"),
+        (lambda data: data["3"]["coordinate"].update(x=0.5), "Position 3: coordinate"),
+        (lambda data: data["3"].pop("occupied"), "Position '3': malformed"),
+        (lambda data: data["3"].update(occupied=True), "no piece name"),
+        (
+            lambda data: data["0"].update(
+                occupied=True, piece_name="Blue", piece_color="#0000ff"
+            ),
+            "does not match any variant",
+        ),
+        (
+            lambda data: data["0"].update(
+                occupied=True, piece_name="Gold", piece_color="#0000ff"
+            ),
+            "not in the piece library",
+        ),
+    ],
+)
+def test_from_grid_rejects_malformed(pyramid, pyramid_catalog, mutate, message):
+    """Test that malformed grids are rejected with a precise error."""
+    data = PuzzleState(pyramid).to_grid()
+    mutate(data)
+    state = PuzzleState(pyramid)
+    with pytest.raises(ValueError, match=message):
+        state.from_grid(data, pyramid_catalog)
+    assert not state.get_placements()
+
+
+def test_color_hints(pyramid, pyramid_library, pyramid_catalog, hinted_grid):
+    """Test reading, writing and applying color hints of empty positions."""
+    state = PuzzleState(pyramid)
+    state.from_grid(hinted_grid, pyramid_catalog)
+
+    assert not state.get_occupied_indices()
+    assert len(state.color_hints) == 2 * len(pyramid_library.pieces)
+    assert state.to_grid() == hinted_grid
+
+    # Every piece may only cover the positions hinted with its own color
+    masks = state.color_hint_masks(pyramid_library)
+    for name, variants in pyramid_library.pieces.items():
+        for idx, color in state.color_hints.items():
+            assert bool(masks[name] >> idx & 1) == (color != variants[0].color)
+
+    hinted_grid["0"]["piece_color"] = "rgb(1, 2, 3)"
+    with pytest.raises(ValueError, match="no piece of the library has color"):
+        state.from_grid(hinted_grid, pyramid_catalog)
@@ -0,0 +1,58 @@
+"""Tests for the RectangleModel class."""
+
+import numpy as np
+import pytest
+
+from iq_puzzler.backtracking_solver import BacktrackingSolver
+from iq_puzzler.coordinate_transformations import lattice_rotation_matrix
+from iq_puzzler.coordinates import Location3D, XY_DIST
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.lattice_model import ROTATION_SETS
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY, load_library
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.rectangle_model import FLAT_LATTICE_ROTATIONS, RectangleModel
+
+
+@pytest.fixture
+def rectangle():
+    """Create a RectangleModel instance."""
+    return RectangleModel()
+
+
+def test_board_structure(rectangle):
+    """Test the positions of the 5x11 board."""
+    assert rectangle.get_all_indices() == set(range(55))
+    assert rectangle.index_to_coord(0) == Location3D(0.0, 0.0, 0.0)
+    assert rectangle.index_to_coord(54) == Location3D(10 * XY_DIST, 4 * XY_DIST, 0.0)
+    for index in rectangle.get_all_indices():
+        assert rectangle.coord_to_index(rectangle.index_to_coord(index)) == index
+    assert rectangle.get_neighbours(0) == {1, 11}
+    assert rectangle.get_neighbours(12) == {1, 11, 13, 23}
+
+
+@pytest.mark.parametrize(
+    "coord",
+    [(-1.0, 0.0, 0.0), (11.0, 0.0, 0.0), (0.0, 5.0, 0.0), (0.5, 0.0, 0.0), (0, 0, 1)],
+)
+def test_invalid_coords(rectangle, coord):
+    """Test that coordinates off the board are rejected."""
+    assert rectangle.coord_to_index(Location3D(*coord)) is None
+    assert not rectangle.is_valid_coord(Location3D(*coord))
+
+
+def test_flat_rotations(rectangle):
+    """Test that the integer rotations match the flat rotations exactly."""
+    assert rectangle.get_valid_rotations() == ROTATION_SETS["flat"]
+    expected = [lattice_rotation_matrix(*r) for r in ROTATION_SETS["flat"]]
+    np.testing.assert_array_equal(rectangle.get_lattice_rotations(), expected)
+    assert rectangle.get_lattice_rotations() is FLAT_LATTICE_ROTATIONS
+
+
+@pytest.mark.parametrize("solver", [DLXSolver, BacktrackingSolver])
+def test_solvers_fill_the_board(rectangle, solver):
+    """Test that both solvers fill the board with the standard library."""
+    library, catalog = load_library(STANDARD_LIBRARY, rectangle)
+    state = PuzzleState(rectangle)
+    assert solver(state, library, catalog=catalog).solve() is state
+    assert state.get_occupied_indices() == rectangle.get_all_indices()
+    assert len(state.get_placements()) == 12
@@ -0,0 +1,35 @@
+"""Tests for the placement tables in shared memory."""
+
+import pytest
+
+from iq_puzzler.precomputed_tables import table_arrays
+from iq_puzzler.rectangle_model import RectangleModel
+from iq_puzzler.shared_tables import SharedTables
+
+
+def test_attached_tables_rebuild_the_catalog(pyramid_library, pyramid_catalog):
+    """Test that an attached block gives the catalog it was created from."""
+    with SharedTables.create(pyramid_library, pyramid_catalog) as shared:
+        attached = SharedTables.attach(shared.handle)
+        try:
+            arrays = table_arrays(pyramid_library, pyramid_catalog)
+            for name, array in arrays.items():
+                assert (attached.arrays[name] == array).all()
+                assert not attached.arrays[name].flags.writeable
+            library, catalog = attached.load(pyramid_catalog.model)
+        finally:
+            attached.close()
+    assert catalog.fingerprint() == pyramid_catalog.fingerprint()
+    assert catalog.entries == pyramid_catalog.entries
+    assert list(library.pieces) == list(pyramid_library.pieces)
+
+
+def test_owner_removes_the_block(pyramid_library, pyramid_catalog):
+    """Test that closing the owner removes the block and models are checked."""
+    shared = SharedTables.create(pyramid_library, pyramid_catalog)
+    with pytest.raises(ValueError):
+        shared.load(RectangleModel())
+    handle = shared.handle
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        SharedTables.attach(handle)
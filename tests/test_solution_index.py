@@ -0,0 +1,135 @@
+"""Tests for the SolutionIndex class."""
+
+import numpy as np
+import pytest
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.solution_index import NO_PIECE, SolutionIndex
+from iq_puzzler.solution_store import SolutionStore, SolutionStoreWriter
+
+
+@pytest.fixture
+def solution_index(tmp_path, solved_state, pyramid_library, pyramid_catalog):
+    """Index over all completions of a solution with five pieces removed."""
+    for name in ["Blue", "Red", "Yellow", "Pink", "Green"]:
+        solved_state.remove_piece(name)
+    fixed = [
+        pyramid_catalog.find(name, placement.occupied_indices)
+        for name, placement in solved_state.get_placements().items()
+    ]
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        DLXSolver(solved_state, pyramid_library).solve_all(
+            lambda rows: writer.append(
+                fixed
+                + [
+                    pyramid_catalog.find(row["piece_name"], row["occupied_indices"])
+                    for row in rows
+                ]
+            )
+        )
+    return SolutionIndex.from_store(SolutionStore(path), pyramid_catalog)
+
+
+def test_index_columns(solution_index, pyramid_catalog):
+    """Test that the signature columns agree with the placement ids."""
+    assert len(solution_index) >= 1
+    for row in range(len(solution_index)):
+        for piece, placement_id in enumerate(solution_index.placement_ids[row]):
+            entry = pyramid_catalog[int(placement_id)]
+            assert entry.piece_name == pyramid_catalog.piece_names[piece]
+            assert int(solution_index.piece_cells[row, piece]) == entry.mask
+            assert all(
+                solution_index.cell_pieces[row, idx] == piece for idx in entry.indices
+            )
+    assert not np.any(solution_index.cell_pieces == NO_PIECE)
+
+
+def test_lookup(solution_index, solved_state, pyramid):
+    """Test filtering solutions by the placements of a partial state."""
+    assert np.array_equal(
+        solution_index.lookup(PuzzleState(pyramid)), np.arange(len(solution_index))
+    )
+    assert len(solution_index.lookup(solved_state)) == len(solution_index)
+
+    state = PuzzleState(pyramid)
+    solution_index.apply(state, 0)
+    assert np.array_equal(solution_index.lookup(state), [0])
+
+
+def test_lookup_color_hints(solution_index, pyramid, pyramid_library, pyramid_catalog):
+    """Test filtering solutions by the color hints of a state."""
+    blue = pyramid_catalog.piece_names.index("Blue")
+    mask = int(solution_index.piece_cells[0, blue])
+    hinted = [idx for idx in range(55) if mask >> idx & 1]
+    color = pyramid_library.pieces["Blue"][0].color
+
+    state = PuzzleState(pyramid)
+    state.color_hints = {idx: color for idx in hinted}
+    expected = np.flatnonzero(solution_index.piece_cells[:, blue] == mask)
+    assert np.array_equal(solution_index.lookup(state), expected)
+
+    # A hint of another color selects the solutions with that piece there
+    for name in ["Red", "Yellow"]:
+        state.color_hints = {hinted[0]: pyramid_library.pieces[name][0].color}
+        piece = pyramid_catalog.piece_names.index(name)
+        covers = solution_index.piece_cells[:, piece] >> np.uint64(hinted[0]) & 1
+        expected = np.flatnonzero(covers)
+        assert np.array_equal(solution_index.lookup(state), expected)
+
+
+def test_dlx_solver_consults_index_with_hints(solution_index, pyramid, pyramid_library):
+    """Test that boards with color hints are answered from the index."""
+    state = PuzzleState(pyramid)
+    solution_index.apply(state, 0)
+    hints = {}
+    for name in ["Blue", "Red"]:
+        placement = state.get_placements()[name]
+        hints.update(dict.fromkeys(placement.occupied_indices, placement.piece.color))
+        state.remove_piece(name)
+    state.color_hints = hints
+
+    solver = DLXSolver(state, pyramid_library, solution_index)
+    assert solver.solve() is state
+    assert solver.iterations == 0
+    placements = state.get_placements()
+    assert all(
+        placements[name].piece.color == color
+        for name in placements
+        for idx, color in hints.items()
+        if idx in placements[name].occupied_indices
+    )
+
+
+def test_save_and_load(tmp_path, solution_index, pyramid_catalog):
+    """Test persisting the index."""
+    path = tmp_path / "index.npz"
+    solution_index.save(path)
+    loaded = SolutionIndex.load(path, pyramid_catalog)
+    assert np.array_equal(loaded.piece_cells, solution_index.piece_cells)
+    assert np.array_equal(loaded.cell_pieces, solution_index.cell_pieces)
+
+    pyramid_catalog._fingerprint = b"\0" * 32
+    with pytest.raises(ValueError):
+        SolutionIndex.load(path, pyramid_catalog)
+
+
+def test_dlx_solver_consults_index(solution_index, solved_state, pyramid_library):
+    """Test that the solver answers from the index without searching."""
+    solver = DLXSolver(solved_state, pyramid_library, solution_index)
+    assert solver.solve() is solved_state
+    assert solver.iterations == 0
+    assert solved_state.get_occupied_indices() == solved_state.get_all_indices()
+
+
+def test_complete_index_proves_unsolvable(solution_index, pyramid, pyramid_library):
+    """Test that a complete index rejects boards without matching solutions."""
+    solution_index.complete = True
+    state = PuzzleState(pyramid)
+    assert state.place_piece(pyramid_library.pieces["Turquise"][0], 0)
+    assert len(solution_index.lookup(state)) == 0
+    assert DLXSolver(state, pyramid_library, solution_index).solve() is None
+
+    solution_index.complete = False
+    assert solution_index.solve(state) is None
@@ -0,0 +1,90 @@
+"""Tests for the binary solution store."""
+
+import json
+
+import numpy as np
+import pytest
+
+from iq_puzzler.solution_store import (
+    EMPTY_SLOT,
+    HEADER,
+    SolutionStore,
+    SolutionStoreWriter,
+    convert_json_to_store,
+    convert_store_to_json,
+    convert_store_to_jsonl,
+    placement_ids_of,
+)
+
+
+def test_write_and_read(tmp_path, pyramid_catalog, solved_state):
+    """Test that written solutions are read back through the memory map."""
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+        solved_state.remove_piece("Blue")
+        writer.append_state(solved_state)
+    assert path.stat().st_size == HEADER.size + 2 * 12 * 2
+
+    store = SolutionStore(path)
+    store.header.check(pyramid_catalog)
+    assert len(store) == 2
+    assert isinstance(store.records, np.memmap)
+    assert store.records.shape == (2, 12)
+    assert store.records[1, pyramid_catalog.piece_names.index("Blue")] == EMPTY_SLOT
+    assert store.get_state(1, pyramid_catalog).to_grid() == solved_state.to_grid()
+    assert sorted(store.records[1][store.records[1] != EMPTY_SLOT]) == sorted(
+        placement_ids_of(solved_state, pyramid_catalog)
+    )
+
+
+def test_append_to_existing(tmp_path, pyramid_catalog, solved_state):
+    """Test that reopening a store appends and drops partial records."""
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+    store = SolutionStore(path)
+    assert len(store) == 2
+    assert np.array_equal(store.records[0], store.records[1])
+
+
+def test_rejects_other_catalog(tmp_path, pyramid_catalog, solved_state):
+    """Test that stores are bound to the catalog they were written with."""
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+    pyramid_catalog._fingerprint = b"\0" * 32
+    with pytest.raises(ValueError, match="different piece library"):
+        SolutionStoreWriter(path, pyramid_catalog)
+
+    (tmp_path / "other.bin").write_bytes(b"not a store")
+    with pytest.raises(ValueError):
+        SolutionStore(tmp_path / "other.bin")
+
+
+def test_json_conversion_roundtrip(tmp_path, pyramid_catalog, solved_state):
+    """Test converting between the JSON formats and the store."""
+    grid_path = tmp_path / "solution.json"
+    solved_state.export_to_json(str(grid_path))
+    compact_path = tmp_path / "solutions.jsonl"
+    compact_path.write_text(json.dumps(solved_state.to_compact(pyramid_catalog)) + "\n")
+
+    store_path = tmp_path / "solutions.bin"
+    assert convert_json_to_store([grid_path, compact_path], store_path, pyramid_catalog)
+    assert len(SolutionStore(store_path)) == 2
+
+    jsonl_path = tmp_path / "out.jsonl"
+    assert convert_store_to_jsonl(store_path, jsonl_path, pyramid_catalog) == 2
+    lines = jsonl_path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        solved_state.to_compact(pyramid_catalog)
+    ] * 2
+
+    paths = convert_store_to_json(store_path, tmp_path / "grids", pyramid_catalog)
+    assert len(paths) == 2
+    with open(paths[0]) as f:
+        assert json.load(f) == solved_state.to_grid()
@@ -0,0 +1,180 @@
+"""Tests for the vectorized solution verifier."""
+
+import json
+
+import numpy as np
+import pytest
+
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.solution_store import (
+    EMPTY_SLOT,
+    SolutionStoreWriter,
+    placement_ids_of,
+)
+from iq_puzzler.solution_verifier import (
+    COVERAGE,
+    INITIAL,
+    MALFORMED,
+    OVERLAP,
+    PIECES,
+    SHAPE,
+    SolutionVerifier,
+    describe,
+)
+
+
+@pytest.fixture
+def solution_record(pyramid_catalog, solved_state):
+    """The placement ids of the solved state in store record order."""
+    record = np.full(12, EMPTY_SLOT, dtype=np.uint16)
+    for placement_id in placement_ids_of(solved_state, pyramid_catalog):
+        name = pyramid_catalog[placement_id].piece_name
+        record[pyramid_catalog.piece_names.index(name)] = placement_id
+    return record
+
+
+def test_valid_records(pyramid_catalog, solution_record):
+    """Test that a complete solution passes, in small chunks too."""
+    verifier = SolutionVerifier(pyramid_catalog, chunk_size=2)
+    flags = verifier.verify(np.tile(solution_record, (5, 1)))
+    assert flags.tolist() == [0] * 5
+
+
+def test_detects_each_failure(pyramid_catalog, solution_record):
+    """Test the failure flags of broken records."""
+    blue = pyramid_catalog.piece_names.index("Blue")
+    red = pyramid_catalog.piece_names.index("Red")
+    missing = solution_record.copy()
+    missing[blue] = EMPTY_SLOT
+    swapped = solution_record.copy()
+    swapped[[blue, red]] = swapped[[red, blue]]
+    unknown = solution_record.copy()
+    unknown[blue] = len(pyramid_catalog)
+    # Another placement of Blue that overlaps a neighbour
+    moved = solution_record.copy()
+    moved[blue] = next(
+        i
+        for i, entry in enumerate(pyramid_catalog.entries)
+        if entry.piece_name == "Blue" and i != solution_record[blue]
+    )
+
+    verifier = SolutionVerifier(pyramid_catalog)
+    flags = verifier.verify(np.stack([missing, swapped, unknown, moved])).tolist()
+    assert flags[0] == PIECES | COVERAGE
+    assert flags[1] == PIECES
+    assert flags[2] == SHAPE | PIECES | COVERAGE
+    assert flags[3] == COVERAGE | OVERLAP
+    assert describe(flags[0]) == ["coverage", "pieces"]
+
+
+def test_initial_state(pyramid, pyramid_catalog, solved_state, solution_record):
+    """Test that records must keep initial placements and color hints."""
+    placements = solved_state.get_placements()
+    blue_id = int(solution_record[pyramid_catalog.piece_names.index("Blue")])
+    records = solution_record[np.newaxis, :]
+
+    kept = PuzzleState(pyramid)
+    kept.place_by_id(blue_id, pyramid_catalog)
+    kept.color_hints = {
+        index: placements["Red"].piece.color
+        for index in placements["Red"].occupied_indices
+    }
+    assert SolutionVerifier(pyramid_catalog, kept).verify(records).tolist() == [0]
+
+    moved = PuzzleState(pyramid)
+    moved.place_by_id(
+        next(
+            i
+            for i, entry in enumerate(pyramid_catalog.entries)
+            if entry.piece_name == "Blue" and i != blue_id
+        ),
+        pyramid_catalog,
+    )
+    assert SolutionVerifier(pyramid_catalog, moved).verify(records).tolist() == [
+        INITIAL
+    ]
+
+    wrong_hints = PuzzleState(pyramid)
+    wrong_hints.color_hints = {
+        index: placements["Red"].piece.color
+        for index in placements["Blue"].occupied_indices
+    }
+    flags = SolutionVerifier(pyramid_catalog, wrong_hints).verify(records)
+    assert flags.tolist() == [INITIAL]
+
+
+def test_verify_jsonl(tmp_path, pyramid_catalog, solved_state, pyramid_solution):
+    """Test compact solutions, including symmetric variants and broken lines."""
+    duplicated = dict(
+        pyramid_solution,
+        placements=pyramid_solution["placements"] + [["Blue", 4, 22]],
+    )
+    off_board = dict(
+        pyramid_solution,
+        placements=[["Blue", 4, 54]] + pyramid_solution["placements"][1:],
+    )
+    lines = [
+        json.dumps(pyramid_solution),
+        json.dumps(solved_state.to_compact(pyramid_catalog)),
+        json.dumps(duplicated),
+        json.dumps(off_board),
+        json.dumps({"model": "RectangleModel", "placements": []}),
+        "not json",
+        "",
+    ]
+    path = tmp_path / "solutions.jsonl"
+    path.write_text("\n".join(lines))
+
+    flags = SolutionVerifier(pyramid_catalog).verify_file(path).tolist()
+    assert flags[:2] == [0, 0]
+    assert flags[2] == PIECES
+    assert flags[3] & SHAPE
+    assert flags[4:] == [MALFORMED | PIECES | COVERAGE] * 2
+
+
+def test_off_board_origin(tmp_path, pyramid, pyramid_library, pyramid_catalog):
+    """Test a solution with an Orange variant whose origin lies off the board."""
+    solution = {
+        "model": "PyramidModel",
+        "placements": [
+            ["Blue", 0, 26],
+            ["Dark Green", 9, 53],
+            ["Green", 0, 41],
+            ["Light Blue", 3, 10],
+            ["Mint Green", 1, 4],
+            ["Orange", 10, 6],
+            ["Pink", 5, 25],
+            ["Purple", 11, 7],
+            ["Red", 23, 37],
+            ["Turquise", 9, 48],
+            ["Wine Red", 1, 11],
+            ["Yellow", 4, 21],
+        ],
+    }
+    state = PuzzleState(pyramid)
+    state.from_compact(solution, pyramid_library)
+    assert state.get_placements()["Orange"].occupied_indices == {6, 12, 30, 45, 50}
+    # No ball of the variant lies on its origin
+    orange = pyramid_library.pieces["Orange"][10]
+    assert not (orange.positions == 0).all(axis=1).any()
+
+    path = tmp_path / "solutions.jsonl"
+    path.write_text(json.dumps(solution))
+    verifier = SolutionVerifier(pyramid_catalog)
+    assert verifier.verify_file(path).tolist() == [0]
+    record = np.full((1, 12), EMPTY_SLOT, dtype=np.uint16)
+    for placement_id in placement_ids_of(state, pyramid_catalog):
+        name = pyramid_catalog[placement_id].piece_name
+        record[0, pyramid_catalog.piece_names.index(name)] = placement_id
+    assert verifier.verify(record).tolist() == [0]
+
+
+def test_verify_store(tmp_path, pyramid_catalog, solved_state):
+    """Test that stores are verified through their memory map."""
+    path = tmp_path / "solutions.bin"
+    with SolutionStoreWriter(path, pyramid_catalog) as writer:
+        writer.append_state(solved_state)
+        solved_state.remove_piece("Blue")
+        writer.append_state(solved_state)
+    flags = SolutionVerifier(pyramid_catalog).verify_file(path).tolist()
+    assert flags == [0, PIECES | COVERAGE]
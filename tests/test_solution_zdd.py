@@ -0,0 +1,101 @@
+"""Tests for the SolutionZDD class."""
+
+import random
+
+import pytest
+
+from iq_puzzler.dlx_solver import DLXSolver
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.puzzle_state import PuzzleState
+from iq_puzzler.solution_zdd import FALSE, TRUE, SolutionZDD
+
+KEPT_PIECES = ["Mint Green", "Purple", "Dark Green", "Light Blue"]
+
+
+@pytest.fixture
+def partial_state(solved_state):
+    """A pyramid state with several completions."""
+    for name in list(solved_state.get_placements()):
+        if name not in KEPT_PIECES:
+            solved_state.remove_piece(name)
+    return solved_state
+
+
+@pytest.fixture
+def solutions(partial_state, pyramid_library, pyramid_catalog):
+    """All completions of the partial state as sets of placement ids."""
+    found = []
+    DLXSolver(partial_state, pyramid_library, catalog=pyramid_catalog).solve_all(
+        lambda rows: found.append({row["placement_id"] for row in rows})
+    )
+    return found
+
+
+@pytest.fixture
+def zdd(partial_state, pyramid_library, pyramid_catalog):
+    """Diagram of all completions of the partial state."""
+    solver = DLXSolver(partial_state, pyramid_library, catalog=pyramid_catalog)
+    return solver.build_zdd()
+
+
+def test_count_matches_enumeration(zdd, solutions):
+    """Test that the diagram counts every solution exactly once."""
+    assert len(solutions) > 1
+    assert zdd.count() == len(solutions)
+
+
+def test_sample_draws_solutions(zdd, solutions, partial_state, pyramid_catalog):
+    """Test that samples are valid completions and cover all solutions."""
+    rng = random.Random(0)
+    samples = [set(zdd.sample(rng)) for _ in range(200)]
+    assert all(sample in solutions for sample in samples)
+    assert len({frozenset(sample) for sample in samples}) == len(solutions)
+
+    for placement_id in samples[0]:
+        assert partial_state.place_by_id(placement_id, pyramid_catalog)
+    assert partial_state.get_occupied_indices() == partial_state.get_all_indices()
+
+
+def test_placement_counts_and_cell_fraction(zdd, solutions, pyramid_catalog):
+    """Test placement statistics against the enumerated solutions."""
+    expected = {}
+    for solution in solutions:
+        for placement_id in solution:
+            expected[placement_id] = expected.get(placement_id, 0) + 1
+    assert zdd.placement_counts() == expected
+
+    entry = pyramid_catalog[next(iter(solutions[0]))]
+    cell = min(entry.indices)
+    covering = sum(
+        any(
+            pyramid_catalog[p].piece_name == entry.piece_name
+            and cell in pyramid_catalog[p].indices
+            for p in solution
+        )
+        for solution in solutions
+    )
+    assert zdd.cell_fraction(entry.piece_name, cell) == covering / len(solutions)
+
+
+def test_terminal_diagrams(pyramid_catalog):
+    """Test the diagrams of a solved and an unsolvable state."""
+    zdd = SolutionZDD(pyramid_catalog)
+    assert zdd.count() == 0
+    assert zdd.cell_fraction("Blue", 0) == 0.0
+    with pytest.raises(ValueError):
+        zdd.sample()
+
+    zdd.root = TRUE
+    assert zdd.count() == 1
+    assert zdd.sample() == []
+    assert zdd.add_node(0, TRUE, FALSE) == TRUE
+
+
+def test_build_zdd_without_solutions(pyramid, pyramid_library):
+    """Test that an unsolvable state yields the empty diagram."""
+    library = PieceLibrary(None, pyramid)
+    library.add_piece(pyramid_library.pieces["Yellow"][0])
+
+    zdd = DLXSolver(PuzzleState(pyramid), library).build_zdd()
+    assert zdd.root == FALSE
+    assert zdd.count() == 0
@@ -0,0 +1,169 @@
+"""Tests for the pure, thread-safe solve API."""
+
+import asyncio
+import multiprocessing
+import random
+
+import pytest
+
+from iq_puzzler.lattice_model import LatticeModel
+from iq_puzzler.piece_library import PieceLibrary
+from iq_puzzler.placement_catalog import PlacementCatalog
+from iq_puzzler.precomputed_tables import STANDARD_LIBRARY
+from iq_puzzler.solve_api import (
+    Board,
+    Solution,
+    SolveJob,
+    SolverTables,
+    _has_packaged_tables,
+    solve,
+    solve_async,
+    solve_batch,
+    solve_process_batch,
+)
+
+
+@pytest.fixture
+def tables(pyramid_library, pyramid_catalog):
+    """Shared tables of the standard library in the pyramid."""
+    return SolverTables(pyramid_library, pyramid_catalog)
+
+
+@pytest.fixture
+def partial_board(tables, pyramid_solution):
+    """A board keeping eight pieces of a known solution."""
+    kept = dict(pyramid_solution, placements=pyramid_solution["placements"][:8])
+    return Board.from_compact(kept, tables)
+
+
+@pytest.mark.parametrize("solver", ["dlx", "frontier", "backtracking"])
+def test_solve_completes_the_board(tables, partial_board, solver):
+    """Test that every solver returns a complete solution keeping the board."""
+    solution = solve(partial_board, tables, solver)
+    assert isinstance(solution, Solution)
+    assert len(solution.placement_ids) == 12
+    assert set(partial_board.placements) <= set(solution.placement_ids)
+    state = solution.to_state(tables)
+    assert state.get_occupied_indices() == tables.model.get_all_indices()
+    assert solution.to_compact(tables.catalog)["model"] == "PyramidModel"
+
+
+def test_solve_leaves_inputs_untouched(tables, partial_board):
+    """Test that solving does not change the board or the shared tables."""
+    fingerprint = tables.catalog.fingerprint()
+    entries = list(tables.catalog.entries)
+    solution = solve(partial_board, tables)
+    assert solve(partial_board, tables) == solution
+    assert tables.catalog.fingerprint() == fingerprint
+    assert tables.catalog.entries == entries
+    with pytest.raises(AttributeError):
+        solution.placement_ids = ()
+
+
+def test_unsolvable_and_invalid_boards(tables, pyramid_solution):
+    """Test that unsolvable boards give None and invalid ones raise."""
+    solved = Board.from_compact(pyramid_solution, tables)
+    hints = ((next(iter(tables.catalog[solved.placements[0]].indices)), "#000000"),)
+    assert solve(Board(color_hints=hints), tables) is None
+    with pytest.raises(ValueError):
+        solve(Board((len(tables.catalog),)), tables)
+    with pytest.raises(ValueError):
+        solve(Board(), tables, "unknown")
+
+
+def test_solve_batch_matches_sequential(tables, pyramid_solution):
+    """Test that threads sharing the tables give the sequential results."""
+    solved = Board.from_compact(pyramid_solution, tables)
+    rng = random.Random(0)
+    boards = [Board(tuple(sorted(rng.sample(solved.placements, 7)))) for _ in range(24)]
+    expected = [solve(board, tables) for board in boards]
+    assert solve_batch(boards, tables, max_workers=8) == expected
+    assert all(solution is not None for solution in expected)
+
+
+@pytest.fixture
+def lattice_tables():
+    """Tables of a pyramid shape definition, which has no packaged tables."""
+    model = LatticeModel.pyramid(5)
+    library = PieceLibrary(STANDARD_LIBRARY, model)
+    return SolverTables(library, PlacementCatalog(library, model))
+
+
+def test_packaged_tables_are_detected(tables, lattice_tables):
+    """Test that only catalogs of the packaged tables skip the shared memory."""
+    assert _has_packaged_tables(tables)
+    assert not _has_packaged_tables(lattice_tables)
+
+
+@pytest.mark.parametrize("source", ["packaged", "shared"])
+def test_solve_process_batch_matches_sequential(tables, lattice_tables, source):
+    """Test that spawned workers give the solutions of the parent."""
+    tables = tables if source == "packaged" else lattice_tables
+    solved = solve(Board(), tables)
+    rng = random.Random(1)
+    boards = [
+        Board(tuple(sorted(rng.sample(solved.placement_ids, 7)))) for _ in range(6)
+    ]
+    context = multiprocessing.get_context("spawn")
+    solutions = solve_process_batch(boards, tables, max_workers=2, mp_context=context)
+    assert solutions == [solve(board, tables) for board in boards]
+
+
+@pytest.mark.parametrize("solver", ["dlx", "frontier"])
+def test_solve_async_matches_solve(tables, partial_board, solver):
+    """Test that the async solve gives the solution of the blocking one."""
+    solution = asyncio.run(solve_async(partial_board, tables, solver))
+    assert solution == solve(partial_board, tables, solver)
+
+
+def test_solve_job_reports_progress(tables):
+    """Test that a job yields growing progress before its solution."""
+
+    async def run():
+        job = SolveJob(Board(), tables, slice_nodes=1)
+        reports = [progress async for progress in job]
+        return reports, await job, job
+
+    reports, solution, job = asyncio.run(run())
+    assert reports
+    iterations = [progress.iterations for progress in reports]
+    assert iterations == sorted(iterations) and iterations[0] >= 1
+    assert job.done() and job.progress == reports[-1]
+    assert solution == solve(Board(), tables)
+
+
+def test_cancelling_stops_the_search(tables):
+    """Test that cancelling the awaiting task stops the search thread."""
+
+    async def run():
+        job = SolveJob(Board(), tables, slice_nodes=1)
+
+        async def wait():
+            return await job
+
+        task = asyncio.ensure_future(wait())
+        async for _ in job:
+            break
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        for _ in range(500):
+            if job.done():
+                break
+            await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        return job
+
+    job = asyncio.run(run())
+    assert job.progress.iterations < solve(Board(), tables).iterations
+
+
+def test_progress_requires_a_reporting_solver(tables):
+    """Test that only the dlx and frontier solvers report progress."""
+    with pytest.raises(ValueError):
+        SolveJob(Board(), tables, "backtracking")
+    with pytest.raises(ValueError):
+        SolveJob(Board(), tables, slice_nodes=0)
+    with pytest.raises(ValueError):
+        solve(Board(), tables, "backtracking", on_progress=print)
@@ -0,0 +1,91 @@
+"""Tests for the JSON lines stdio worker."""
+
+import io
+import json
+
+from iq_puzzler.stdio_worker import StdioWorker
+
+
+def serve(*requests, **kwargs):
+    """Run a worker over request lines and parse its events."""
+    lines = [r if isinstance(r, str) else json.dumps(r) for r in requests]
+    output = io.StringIO()
+    worker = StdioWorker(io.StringIO("\n".join(lines) + "\n"), output, **kwargs)
+    worker.serve()
+    return worker, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def results(events):
+    """Get the result and error events by request id."""
+    return {e["id"]: e for e in events if e["event"] in ("result", "error")}
+
+
+def test_solves_requests_with_warm_tables(pyramid_solution):
+    """Test that one worker answers several requests from cached tables."""
+    kept = dict(pyramid_solution, placements=pyramid_solution["placements"][:9])
+    worker, events = serve(
+        {"id": 1, "initial": kept, "output_format": "compact"},
+        {"id": 2, "initial": kept},
+        {"id": "rect", "mode": "rectangle", "output_format": "compact"},
+    )
+    assert events[0] == {"id": None, "event": "ready"}
+    answers = results(events)
+    assert answers[1]["solved"] is True
+    assert len(answers[1]["solution"]["placements"]) == 12
+    assert answers[1]["solution"]["placements"][:9] == kept["placements"]
+    grid = answers[2]["solution"]
+    assert len(grid) == 55 and all(p["occupied"] for p in grid.values())
+    assert answers["rect"]["solution"]["model"] == "RectangleModel"
+    assert worker.requests == 3
+    assert len(worker._tables) == 2
+
+    stages = [e["stage"] for e in events if e["id"] == 1 and e["event"] == "progress"]
+    assert stages == ["loaded", "searching"]
+    assert any(e["event"] == "log" and e["id"] == 1 for e in events)
+
+
+def test_counts_solutions(pyramid_solution):
+    """Test counting the completions of a nearly solved board."""
+    kept = dict(pyramid_solution, placements=pyramid_solution["placements"][:10])
+    _, events = serve(
+        {"id": 1, "initial": kept, "count": True},
+        {"id": 2, "initial": kept, "count": True, "solver": "frontier"},
+        {"id": 3, "initial": kept, "count": True, "solver": "backtracking"},
+    )
+    answers = results(events)
+    assert answers[1]["count"] == answers[2]["count"] >= 1
+    assert answers[3]["event"] == "error"
+
+
+def test_errors_keep_the_worker_running():
+    """Test that invalid requests are answered with errors."""
+    worker, events = serve(
+        "not json",
+        {"id": 1, "solver": "unknown"},
+        {"id": 2, "mode": "hexagon"},
+        {"id": 3, "initial": {"placements": [["Blue", 0, 54]]}},
+        {"id": 4, "command": "shutdown"},
+        {"id": 5},
+    )
+    errors = [e for e in events if e["event"] == "error"]
+    assert [e["id"] for e in errors] == [None, 1, 2, 3]
+    assert "Unknown solver" in errors[1]["message"]
+    assert worker.requests == 4
+    assert not any(e["id"] == 5 for e in events)
+
+
+def test_worker_defaults(solved_state):
+    """Test that constructor defaults apply to requests omitting the fields."""
+    shape = {"name": "pyramid", "layers": [[n, n] for n in range(5, 0, -1)]}
+    for name in sorted(solved_state.get_placements())[:2]:
+        solved_state.remove_piece(name)
+    _, events = serve(
+        {"id": 1, "initial": solved_state.to_grid()},
+        {"id": 2, "mode": "rectangle", "count": False},
+        shape=shape,
+        count=True,
+    )
+    answers = results(events)
+    assert answers[1]["count"] >= 1
+    assert answers[2]["solved"] is True
+    assert len(answers[2]["solution"]) == 55
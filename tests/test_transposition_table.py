@@ -0,0 +1,37 @@
+"""Tests for the TranspositionTable class."""
+
+import pytest
+
+from iq_puzzler.transposition_table import TranspositionTable
+
+
+def test_store_and_get():
+    """Test that recorded counts are returned and misses are reported."""
+    table = TranspositionTable(4)
+    assert table.get((0b11, 0b1)) is None
+    table.store((0b11, 0b1), 0)
+    table.store((0b101, 0b1), 3)
+    assert table.get((0b11, 0b1)) == 0
+    assert table.get((0b101, 0b1)) == 3
+    assert (table.hits, table.misses) == (2, 1)
+
+
+def test_evicts_least_recently_used():
+    """Test that the table stays bounded and keeps recently used entries."""
+    table = TranspositionTable(2)
+    table.store((1, 0), 0)
+    table.store((2, 0), 0)
+    table.get((1, 0))
+    table.store((3, 0), 0)
+
+    assert len(table) == 2
+    assert table.evictions == 1
+    assert table.get((2, 0)) is None
+    assert table.get((1, 0)) == 0
+    assert table.get((3, 0)) == 0
+
+
+def test_rejects_empty_capacity():
+    """Test that a table must hold at least one entry."""
+    with pytest.raises(ValueError):
+        TranspositionTable(0)